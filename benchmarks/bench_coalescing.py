@@ -0,0 +1,89 @@
+"""Several users analysing the same company within seconds: stand-in calls and latency, fully offline.
+
+    python benchmarks/bench_coalescing.py [--scale 0.1] [--users 6] [--stagger 2] [--shared-research] [--json out.json]
+
+Each simulated user clicks "Analyze All" for the same company ``--stagger``
+seconds after the previous one, through the app's job manager. Reports how
+long each user waited for their three reports, the OpenAI and Firecrawl
+requests the stand-ins served, how many job slots were taken and how many
+requests were coalesced onto a run already in flight. Times are real-world seconds.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+POLL_SECONDS = 0.05
+
+
+def analyze_all(user: int, company: str, shared_research: bool, stagger: float, scale: float) -> float:
+    from launch_intel.jobs import job_manager
+    from launch_intel.pipeline import ANALYSIS_KINDS
+
+    time.sleep(user * stagger * scale)
+    started = time.perf_counter()
+    jobs = [job_manager().submit(company, kind, "sk-standin", "fc-standin", shared_research) for kind in ANALYSIS_KINDS]
+    while any(job_manager().get(job_id).active for job_id in jobs):
+        time.sleep(POLL_SECONDS)
+    failed = [job.error for job in map(job_manager().get, jobs) if job.error]
+    if failed:
+        raise RuntimeError(failed[0])
+    return (time.perf_counter() - started) / scale
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.1, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--users", type=int, default=6)
+    parser.add_argument("--stagger", type=float, default=2.0, help="seconds between one user's click and the next")
+    parser.add_argument("--shared-research", action="store_true")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = start_standins(Latency(scale=args.scale))
+    configure_environment(server.url)
+    # The rate limits run in real time, not --scale time
+    for limit in ("BI_OPENAI_RPM", "BI_OPENAI_TPM", "BI_FIRECRAWL_JOBS_PER_MIN"):
+        os.environ[limit] = "0"
+    from launch_intel.agents import build_agents
+
+    build_agents("sk-standin", "fc-standin")  # Pay the agno import before anything is timed
+    before = dict(server.stats)
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        waits = list(pool.map(
+            lambda user: analyze_all(user, "Launchpad", args.shared_research, args.stagger, args.scale), range(args.users)
+        ))
+    served = {key: value - before.get(key, 0) for key, value in server.stats.items() if value - before.get(key, 0)}
+    server.shutdown()
+    try:
+        from launch_intel.singleflight import analysis_flights
+    except ImportError:  # Trees without coalescing, for before/after runs
+        coalesced = None
+    else:
+        coalesced = analysis_flights.summary()
+
+    print(f"{args.users} users click Analyze All for the same company {args.stagger:g}s apart"
+          f"{' (shared research)' if args.shared_research else ''}")
+    print(f"wait per user: p50 {statistics.median(waits):.1f}s, max {max(waits):.1f}s "
+          f"({', '.join(f'{wait:.0f}s' for wait in waits)})")
+    print("stand-in requests: " + ", ".join(f"{key}={value}" for key, value in sorted(served.items())))
+    if coalesced is not None:
+        print(f"analyses run: {coalesced['led']}, requests coalesced onto one in flight: {coalesced['coalesced']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "waits": waits, "served": served, "coalescing": coalesced}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Comparing N competitors: one manual run after another vs comparison mode, fully offline.
+
+    python benchmarks/bench_compare.py [--scale 0.1] [--companies 5] [--shared-research] [--json out.json]
+
+The manual baseline runs the competitor analysis for each company in turn, as
+someone comparing them by hand would. Comparison mode submits them all to the
+job manager, where they share its concurrency limit, and builds the matrix as
+results arrive. Reports when the first and the last matrix row were ready, the
+Firecrawl calls each pass made, saved and shared with a concurrent identical
+fetch, and how many matrix cells the bullets filled. Times are real-world seconds.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+POLL_SECONDS = 0.05
+
+
+def manual(companies, shared_research: bool, scale: float) -> list:
+    from launch_intel.runner import run_cached_analysis
+
+    started, ready = time.perf_counter(), []
+    for company in companies:
+        run_cached_analysis(company, "competitor", "sk-standin", "fc-standin", shared_research)
+        ready.append((time.perf_counter() - started) / scale)
+    return ready
+
+
+def comparison(companies, shared_research: bool, scale: float) -> list:
+    from launch_intel.compare import cached_matrix_row
+    from launch_intel.jobs import job_manager
+
+    started = time.perf_counter()
+    jobs = {company: job_manager().submit(company, "competitor", "sk-standin", "fc-standin", shared_research)
+            for company in companies}
+    ready = {}
+    while len(ready) < len(jobs):
+        for company, job_id in jobs.items():
+            job = job_manager().get(job_id)
+            if company not in ready and not job.active:
+                if job.error:
+                    raise RuntimeError(f"{company}: {job.error}")
+                cached_matrix_row(company, shared_research)  # What the tab does once a company lands
+                ready[company] = (time.perf_counter() - started) / scale
+        time.sleep(POLL_SECONDS)
+    return sorted(ready.values())
+
+
+def fetch_delta(before: dict) -> dict:
+    from launch_intel.firecrawl_cache import page_cache_stats
+
+    return {name: value - before[name] for name, value in page_cache_stats().items() if name.startswith("calls_")}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.1, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--companies", type=int, default=5)
+    parser.add_argument("--shared-research", action="store_true")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = start_standins(Latency(scale=args.scale))
+    configure_environment(server.url)
+    # The rate limits run in real time, not --scale time
+    for limit in ("BI_OPENAI_RPM", "BI_OPENAI_TPM", "BI_FIRECRAWL_JOBS_PER_MIN"):
+        os.environ[limit] = "0"
+    from launch_intel.agents import build_agents
+    from launch_intel.compare import MATRIX_COLUMNS, cached_matrix_row
+    from launch_intel.firecrawl_cache import page_cache_stats
+    from launch_intel.jobs import MAX_CONCURRENT_JOBS
+
+    build_agents("sk-standin", "fc-standin")  # Pay the agno import before anything is timed
+    results = {}
+    for name, run in (("manual", manual), ("comparison", comparison)):
+        companies = [f"{name.title()} Rival {i}" for i in range(args.companies)]
+        before = page_cache_stats()
+        ready = run(companies, args.shared_research, args.scale)
+        rows = [cached_matrix_row(company, args.shared_research) for company in companies]
+        results[name] = {
+            "ready": ready,
+            "firecrawl": fetch_delta(before),
+            "cells_filled": sum(1 for row in rows if row for column in MATRIX_COLUMNS if row[column]),
+        }
+    server.shutdown()
+
+    print(f"{args.companies} competitors{' (shared research)' if args.shared_research else ''}, "
+          f"job limit {MAX_CONCURRENT_JOBS}")
+    for name, result in results.items():
+        calls = result["firecrawl"]
+        print(f"{name:<10} first row {result['ready'][0]:5.1f}s, full matrix {result['ready'][-1]:5.1f}s; "
+              f"Firecrawl {calls['calls_made']} made, {calls['calls_saved']} saved "
+              f"({calls['calls_shared']} shared in flight); "
+              f"{result['cells_filled']} of {args.companies * len(MATRIX_COLUMNS)} matrix cells filled")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
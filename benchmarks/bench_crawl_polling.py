@@ -0,0 +1,127 @@
+"""Fixed vs adaptive crawl polling against a local stand-in Firecrawl server.
+
+    python benchmarks/bench_crawl_polling.py [--scale 0.1]
+
+The stand-in answers ``POST /v2/crawl`` and ``GET /v2/crawl/<id>`` and reports
+each job as finished once its simulated duration has elapsed. Durations and
+poll intervals are multiplied by ``--scale`` so the run takes seconds, and the
+results are scaled back to real-world seconds.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firecrawl import FirecrawlApp  # noqa: E402
+
+from launch_intel.crawl import MAX_PARALLEL_CRAWLS, PollSchedule, crawl  # noqa: E402
+
+FIXED_POLL_INTERVAL = 10
+JOB_DURATIONS = (1, 3, 7, 15, 30)
+
+
+class StandInCrawlServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, scale: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.scale = scale
+        self.jobs = {}
+        self.status_checks = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInCrawlServer
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        duration = float(parse_qs(urlsplit(request["url"]).query)["duration"][0]) * self.server.scale
+        job_id = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.jobs[job_id] = (request["url"], time.monotonic() + duration)
+        self._reply({"success": True, "id": job_id, "url": f"{self.server.url}/v2/crawl/{job_id}"})
+
+    def do_GET(self):
+        job_id = self.path.rsplit("/", 1)[-1]
+        with self.server.lock:
+            url, done_at = self.server.jobs[job_id]
+            self.server.status_checks += 1
+        done = time.monotonic() >= done_at
+        self._reply({
+            "success": True,
+            "status": "completed" if done else "scraping",
+            "total": 1,
+            "completed": int(done),
+            "creditsUsed": int(done),
+            "data": [{"markdown": f"# {url}", "metadata": {"sourceURL": url}}] if done else [],
+        })
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.1, help="time compression factor (1 = real time)")
+    args = parser.parse_args(argv)
+    scale = args.scale
+
+    server = StandInCrawlServer(scale)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app = FirecrawlApp(api_key="fc-bench", api_url=server.url)
+    defaults = PollSchedule()
+    schedule = PollSchedule(defaults.first * scale, defaults.factor, defaults.cap * scale, defaults.deadline * scale)
+
+    print(f"Single crawl job, seconds (fixed poll_interval={FIXED_POLL_INTERVAL}s vs adaptive "
+          f"{defaults.first}s x{defaults.factor} capped at {defaults.cap}s)")
+    print(f"{'job':>6} {'fixed':>8} {'adaptive':>9} {'saved':>8} {'checks':>13}")
+    for duration in JOB_DURATIONS:
+        url = f"https://example.com/?duration={duration}"
+        server.status_checks = 0
+        fixed = _timed(lambda: app.crawl(url, poll_interval=FIXED_POLL_INTERVAL * scale)) / scale
+        fixed_checks, server.status_checks = server.status_checks, 0
+        adaptive = _timed(lambda: crawl(app, url, schedule)) / scale
+        print(f"{duration:>5}s {fixed:>7.1f}s {adaptive:>8.1f}s {fixed - adaptive:>7.1f}s "
+              f"{fixed_checks:>5} -> {server.status_checks:<5}")
+
+    urls = [f"https://example.com/{i}?duration={d}" for i, d in enumerate(JOB_DURATIONS)]
+    sequential = _timed(lambda: [app.crawl(url, poll_interval=FIXED_POLL_INTERVAL * scale) for url in urls]) / scale
+    # How the crawl_websites tool runs several crawls: a few at a time, each polled adaptively
+    with ThreadPoolExecutor(max_workers=min(len(urls), MAX_PARALLEL_CRAWLS)) as pool:
+        together = _timed(lambda: list(pool.map(lambda url: crawl(app, url, schedule), urls))) / scale
+    print(f"\n{len(urls)} crawls ({', '.join(f'{d}s' for d in JOB_DURATIONS)}): "
+          f"sequential fixed polling {sequential:.1f}s, side-by-side adaptive {together:.1f}s")
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""End-to-end benchmark of the competitor, sentiment and metrics pipelines, fully offline.
+
+    python benchmarks/bench_pipeline.py [--scale 0.1] [--companies Acme,Globex] [--json out.json]
+
+Starts the OpenAI and Firecrawl stand-ins (``benchmarks/standins.py``), points
+the app's clients at them and runs "Analyze All" for each company in both the
+per-analyst tool mode and the shared-research mode; ``--serial`` also runs each
+company's three analyses one after another and reports that wall-clock time
+against the parallel one. A discarded warm-up analysis first pays the one-time
+agno, OpenAI and Firecrawl imports, and every measured run starts from empty
+caches. Reports latency per
+analysis and stage, token and call counts and the share of prompt tokens
+served from the (emulated) provider prompt cache from the pipeline's own telemetry,
+the requests the stand-ins actually served and the connections the clients
+opened for them. Times are scaled back to real-world seconds; ``--fixtures``
+replays (or with ``--record`` records) real API responses instead of synthetic ones.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+MODES = {"tools": False, "shared": True}
+
+
+def configure_environment(server_url: str) -> None:
+    """Point every client at the stand-ins and isolate caches; must run before launch_intel is imported."""
+    os.environ["OPENAI_BASE_URL"] = f"{server_url}/v1"
+    os.environ["FIRECRAWL_API_URL"] = server_url
+    os.environ["BI_CACHE_DIR"] = tempfile.mkdtemp(prefix="bi-bench-")
+    os.environ.setdefault("BI_TELEMETRY_FILE", "")
+
+
+def reset_caches() -> None:
+    """Empty the page, research and report caches so the next run fetches everything again."""
+    cache_dir = os.environ["BI_CACHE_DIR"]
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(".sqlite3"):
+            conn = sqlite3.connect(os.path.join(cache_dir, filename))
+            with conn:
+                for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                    conn.execute(f"DELETE FROM {table}")
+            conn.close()
+
+
+def warm_up(openai_key: str, firecrawl_key: str) -> float:
+    """Run one analysis whose time is discarded, so one-off import and setup costs are not scaled into the results."""
+    from launch_intel.runner import run_cached_analysis
+
+    started = time.perf_counter()
+    for shared_research in MODES.values():
+        run_cached_analysis("Warmup", "competitor", openai_key, firecrawl_key, shared_research, force=True)
+    return time.perf_counter() - started
+
+
+def run_mode(companies, shared_research: bool, openai_key: str, firecrawl_key: str, scale: float,
+             serial: bool = False) -> dict:
+    """Analyze All for each company: the three analyses in parallel as the app runs them, or one after another."""
+    from launch_intel.pipeline import ANALYSIS_KINDS
+    from launch_intel.runner import run_cached_analysis
+    from launch_intel.telemetry import last_trace
+
+    reset_caches()
+    runs, walls = [], []
+    for company in companies:
+        def analyse(kind: str):
+            return run_cached_analysis(company, kind, openai_key, firecrawl_key, shared_research, force=True)
+
+        started = time.perf_counter()
+        if serial:
+            for kind in ANALYSIS_KINDS:
+                analyse(kind)
+        else:
+            with ThreadPoolExecutor(max_workers=len(ANALYSIS_KINDS)) as pool:
+                list(pool.map(analyse, ANALYSIS_KINDS))
+        walls.append((time.perf_counter() - started) / scale)
+        runs += [last_trace(company, kind) for kind in ANALYSIS_KINDS]
+
+    per_kind = {}
+    for kind in ANALYSIS_KINDS:
+        traces = [trace for trace in runs if trace.kind == kind]
+        stages = {}
+        for trace in traces:
+            for item in trace.stages:
+                entry = stages.setdefault(item.name, {"seconds": [], "prompt_tokens": 0, "cached_tokens": 0,
+                                                      "completion_tokens": 0, "model_calls": 0, "tool_calls": 0,
+                                                      "retries": 0})
+                entry["seconds"].append(item.seconds / scale)
+                entry["prompt_tokens"] += item.prompt_tokens
+                entry["cached_tokens"] += item.cached_tokens
+                entry["completion_tokens"] += item.completion_tokens
+                entry["model_calls"] += item.model_calls
+                entry["tool_calls"] += len(item.tool_calls)
+                entry["retries"] += item.retries
+        per_kind[kind] = {
+            "latency_p50": statistics.median(trace.seconds / scale for trace in traces),
+            "latency_max": max(trace.seconds / scale for trace in traces),
+            "stages": {name: {**entry, "seconds": statistics.median(entry["seconds"])} for name, entry in stages.items()},
+        }
+    return {"analyze_all_wall_p50": statistics.median(walls), "per_kind": per_kind}
+
+
+def connection_delta(before: dict) -> dict:
+    """Client-side requests, connections and handshake time per API since ``before``."""
+    from launch_intel.http_pool import connection_stats
+
+    delta = {}
+    for api, values in connection_stats().items():
+        requests = values["requests"] - before[api]["requests"]
+        connections = values["connections"] - before[api]["connections"]
+        handshake = values["handshake_seconds"] - before[api]["handshake_seconds"]
+        delta[api] = {"requests": requests, "connections": connections, "handshake_seconds": handshake,
+                      "reuse_rate": max(0, requests - connections) / requests if requests else 0.0}
+    return delta
+
+
+def print_mode(name: str, result: dict, served: dict) -> None:
+    print(f"\n== {name} mode: Analyze All p50 {result['analyze_all_wall_p50']:.1f}s ==")
+    print(f"{'analysis':<11} {'p50':>7}  {'stage':<9} {'time':>7} {'prompt':>8} {'cached':>7} {'compl.':>7} "
+          f"{'llm':>4} {'tools':>6}")
+    for kind, data in result["per_kind"].items():
+        for i, (stage_name, entry) in enumerate(data["stages"].items()):
+            head = f"{kind:<11} {data['latency_p50']:>6.1f}s" if i == 0 else " " * 19
+            cached = entry["cached_tokens"] / entry["prompt_tokens"] if entry["prompt_tokens"] else 0.0
+            print(f"{head}  {stage_name:<9} {entry['seconds']:>6.1f}s {entry['prompt_tokens']:>8} {cached:>7.0%} "
+                  f"{entry['completion_tokens']:>7} {entry['model_calls']:>4} {entry['tool_calls']:>6}")
+    print("stand-in requests: " + ", ".join(f"{key}={value}" for key, value in sorted(served.items())))
+    print("client connections: " + ", ".join(
+        f"{api} {values['requests']} requests over {values['connections']} connections ({values['reuse_rate']:.0%} reused)"
+        for api, values in result["connections"].items() if values["requests"]
+    ))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.1, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--companies", default="Acme,Globex,Initech", help="comma-separated company names")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of: " + ", ".join(MODES))
+    parser.add_argument("--fixtures", help="fixture file to replay from (or record into with --record)")
+    parser.add_argument("--record", action="store_true", help="forward to the real APIs and record fixtures")
+    parser.add_argument("--serial", action="store_true",
+                        help="also run each company's analyses one after another and compare wall-clock times")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.record and not args.fixtures:
+        parser.error("--record needs --fixtures")
+    scale = 1.0 if args.record else args.scale
+    server = start_standins(Latency(scale=scale), args.fixtures, "record" if args.record else "replay")
+    configure_environment(server.url)
+    if args.record:
+        openai_key, firecrawl_key = os.environ["OPENAI_API_KEY"], os.environ["FIRECRAWL_API_KEY"]
+    else:
+        openai_key, firecrawl_key = "sk-standin", "fc-standin"
+
+    companies = [name.strip() for name in args.companies.split(",") if name.strip()]
+    from launch_intel.http_pool import connection_stats
+
+    warm_up_seconds = warm_up(openai_key, firecrawl_key)
+    print(f"warm-up: {warm_up_seconds:.1f}s of imports and first requests, not counted")
+    results = {}
+    for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+        before, connections_before = dict(server.stats), connection_stats()
+        results[mode] = run_mode(companies, MODES[mode], openai_key, firecrawl_key, scale)
+        results[mode]["connections"] = connection_delta(connections_before)
+        served = {key: value - before.get(key, 0) for key, value in server.stats.items() if value - before.get(key, 0)}
+        results[mode]["served"] = served
+        print_mode(mode, results[mode], served)
+        if args.serial:
+            serial = run_mode(companies, MODES[mode], openai_key, firecrawl_key, scale, serial=True)
+            results[mode]["serial"] = serial
+            parallel_wall, serial_wall = results[mode]["analyze_all_wall_p50"], serial["analyze_all_wall_p50"]
+            print(f"Analyze All p50: {parallel_wall:.1f}s parallel vs {serial_wall:.1f}s serial "
+                  f"({serial_wall / parallel_wall:.1f}x)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": scale, "companies": companies, "results": results}, f, indent=2)
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
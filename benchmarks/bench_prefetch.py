@@ -0,0 +1,105 @@
+"""Speculative research prefetch: warm vs cold "Analyze All", hit rate and wasted prefetches, fully offline.
+
+    python benchmarks/bench_prefetch.py [--scale 0.1] [--users 4] [--think 5] [--max-active 2] [--json out.json]
+
+Each simulated user types a company name one keystroke at a time, looks at it
+for ``--think`` seconds and then runs "Analyze All" in shared-research mode.
+Every second user first types another company and changes their mind, so its
+prefetch is cancelled or wasted. The same flow without prefetch gives the
+cold baseline. Reports Analyze All latency both ways (real-world seconds),
+the share of prefetched searches an analysis used, and the Firecrawl time
+spent on prefetches nobody used.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+KEYSTROKE_SECONDS = 0.15
+DEBOUNCE_SECONDS = 0.8
+
+
+def type_name(prefetch, slot: str, name: str, scale: float) -> None:
+    for end in range(1, len(name) + 1):
+        if prefetch is not None:
+            prefetch.schedule(slot, name[:end], "sk-standin", "fc-standin")
+        time.sleep(KEYSTROKE_SECONDS * scale)
+
+
+def user_flow(prefetch, user: int, label: str, think: float, scale: float) -> float:
+    from launch_intel.pipeline import ANALYSIS_KINDS
+    from launch_intel.runner import run_cached_analysis
+
+    slot, company = f"{label}-{user}", f"{label.title()} Company {user}"
+    if user % 2:
+        type_name(prefetch, slot, f"{label.title()} Detour {user}", scale)
+        time.sleep(think * scale)
+    type_name(prefetch, slot, company, scale)
+    time.sleep(think * scale)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(ANALYSIS_KINDS)) as pool:
+        list(pool.map(
+            lambda kind: run_cached_analysis(company, kind, "sk-standin", "fc-standin", shared_research=True),
+            ANALYSIS_KINDS,
+        ))
+    return (time.perf_counter() - started) / scale
+
+
+def run(prefetch, label: str, users: int, think: float, scale: float) -> list:
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        return list(pool.map(lambda user: user_flow(prefetch, user, label, think, scale), range(users)))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.1, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--think", type=float, default=5.0, help="seconds between typing the name and clicking")
+    parser.add_argument("--max-active", type=int, default=2, help="prefetches allowed to run at once")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = start_standins(Latency(scale=args.scale))
+    configure_environment(server.url)
+    # The rate limits run in real time, not --scale time; the second pass would otherwise queue behind the first
+    for limit in ("BI_OPENAI_RPM", "BI_OPENAI_TPM", "BI_FIRECRAWL_JOBS_PER_MIN"):
+        os.environ[limit] = "0"
+    from launch_intel.agents import build_agents
+    from launch_intel.prefetch import Prefetcher
+
+    build_agents("sk-standin", "fc-standin")  # Pay the agno import before either pass is timed
+    cold = run(None, "cold", args.users, args.think, args.scale)
+    ttl = 60 * args.scale
+    prefetch = Prefetcher(args.max_active, debounce_seconds=DEBOUNCE_SECONDS * args.scale, ttl_seconds=ttl)
+    warm = run(prefetch, "warm", args.users, args.think, args.scale)
+    time.sleep(ttl)  # Let unused prefetches expire so they are counted as wasted
+    summary = prefetch.summary()
+    server.shutdown()
+
+    print(f"{args.users} users, {args.think:.0f}s between typing a name and Analyze All (shared research), "
+          f"{args.max_active} prefetches at a time")
+    print(f"Analyze All p50: cold {statistics.median(cold):.1f}s, with prefetch {statistics.median(warm):.1f}s")
+    print(f"prefetches: {summary['scheduled']} scheduled, {summary['started']} started, "
+          f"{summary['cancelled']} cancelled by a newer name")
+    print(f"prefetched searches: {summary['calls_made']} made, {summary['calls_used']} used by an analysis, "
+          f"{summary['calls_wasted']} wasted -> hit rate {summary['hit_rate']:.0%}; "
+          f"{summary['seconds_wasted'] / args.scale:.1f}s of Firecrawl time wasted, "
+          f"{summary['seconds_used'] / args.scale:.1f}s taken off analyses")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "cold": cold, "warm": warm, "prefetch": summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
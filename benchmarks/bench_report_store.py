@@ -0,0 +1,105 @@
+"""Memory held for sessions' reports: raw strings in session state vs the compressed report store.
+
+    python benchmarks/bench_report_store.py [--sessions 200] [--companies 40] [--report-kb 40] [--cap-mb 64]
+
+Simulates ``--sessions`` sessions that each open all three analyses for one of
+``--companies`` companies, and measures with ``tracemalloc`` what their reports
+hold in memory when every session keeps its own decoded strings (as session
+state used to) and when the sessions keep handles into one ``ReportStore``.
+Also times the decompression a tab pays per render and shows the cap at work.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launch_intel.report_store import ReportStore  # noqa: E402
+
+KINDS = ("competitor", "sentiment", "metrics")
+WORDS = ("launch", "pricing", "adoption", "enterprise", "competitor", "review", "growth", "feature", "churn",
+         "positioning", "integration", "community", "onboarding", "roadmap", "partner", "retention", "signal")
+
+
+def report(company: str, kind: str, size_kb: int, rng: random.Random) -> str:
+    """Markdown with the structure and vocabulary of a real report, so compression ratios are realistic."""
+    parts = [f"# {company} -- {kind.title()} Review\n"]
+    length, section = 0, 0
+    while length < size_kb * 1024:
+        section += 1
+        lines = [f"\n## {section}. {rng.choice(WORDS).title()} {rng.choice(WORDS)}\n",
+                 "| Signal | Evidence |\n|---|---|\n"]
+        lines += [f"| {rng.choice(WORDS).title()} | {' '.join(rng.choices(WORDS, k=12))} [{rng.randint(1, 30)}] |\n"
+                  for _ in range(6)]
+        lines += [f"- {' '.join(rng.choices(WORDS, k=16)).capitalize()} ({rng.randint(5, 95)}%) [{rng.randint(1, 30)}]\n"
+                  for _ in range(5)]
+        parts += lines
+        length += sum(len(line) for line in lines)
+    return "".join(parts)
+
+
+def measure(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, size
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--companies", type=int, default=40, help="distinct companies the sessions look at")
+    parser.add_argument("--report-kb", type=int, default=40)
+    parser.add_argument("--cap-mb", type=float, default=64, help="report store cap")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(7)
+    companies = [f"Company {i}" for i in range(args.companies)]
+    # What the report cache hands back: bytes, decoded by every session that loads them
+    cached = {(c, kind): report(c, kind, args.report_kb, rng).encode("utf-8") for c in companies for kind in KINDS}
+    picks = [rng.choice(companies) for _ in range(args.sessions)]
+
+    def raw_sessions():
+        return [{kind: cached[(company, kind)].decode("utf-8") for kind in KINDS} for company in picks]
+
+    store = ReportStore(max_bytes=int(args.cap_mb * 1_048_576))
+
+    def store_sessions():
+        return [{kind: store.put(cached[(company, kind)].decode("utf-8")) for kind in KINDS} for company in picks]
+
+    _, raw_bytes = measure(raw_sessions)
+    sessions, store_bytes = measure(store_sessions)
+    usage = store.usage()
+
+    render_ms = []
+    for session in sessions[:50]:
+        for handle in session.values():
+            started = time.perf_counter()
+            store.get(handle)
+            render_ms.append((time.perf_counter() - started) * 1000)
+
+    print(f"{args.sessions} sessions x 3 reports of {args.report_kb} KB, {args.companies} distinct companies")
+    print(f"raw strings in session state: {raw_bytes / 1_048_576:7.1f} MB")
+    print(f"report store + handles:       {store_bytes / 1_048_576:7.1f} MB "
+          f"({usage['entries']} reports, {usage['raw_bytes'] / max(usage['compressed_bytes'], 1):.1f}x compression)")
+    print(f"decompress per tab render:    {statistics.median(render_ms):.2f} ms p50, {max(render_ms):.2f} ms max")
+
+    capped = ReportStore(max_bytes=usage["compressed_bytes"] // 4)
+    for company in picks:
+        for kind in KINDS:
+            capped.put(cached[(company, kind)].decode("utf-8"))
+    capped_usage = capped.usage()
+    print(f"with a cap of a quarter of that: {capped_usage['entries']} reports kept in "
+          f"{capped_usage['compressed_bytes'] / 1_048_576:.1f} MB, {capped_usage['evictions']} evicted "
+          "(evicted sessions reload from the SQLite report cache)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
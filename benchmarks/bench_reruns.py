@@ -0,0 +1,148 @@
+"""Rerun cost of the app with three large reports loaded, fully offline.
+
+    python benchmarks/bench_reruns.py [--report-kb 40] [--clicks 10] [--scale 0.25] [--json out.json]
+
+Seeds the report cache with a large report for each analysis of one company,
+starts the stand-ins and a real ``streamlit run`` of the app, and drives one
+browser session over the websocket (``load_test.BrowserSession``): "Analyze
+All" loads the three reports from the cache, then
+
+- ``tab click``: one tab's analyze button, which reloads that report,
+- ``app rerun``: a rerun of the whole script, as any sidebar widget causes,
+- ``job polling``: a forced re-analysis of one report, followed until done.
+
+For each it reports the script runs the server made, their median and total
+time and the bytes it sent. The session advertises the elements it already
+has, as a browser does, so unchanged reports come back as short references
+and the bytes show what actually had to be re-rendered.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.load_test import BrowserSession, RunTracker, free_port, start_server  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+import websockets  # noqa: E402  (load_test has already checked it is installed)
+
+COMPANY = "Rerunbench"
+TAB_BUTTONS = {
+    "competitor": "Analyze Competitor Strategy",
+    "sentiment": "Analyze Market Sentiment",
+    "metrics": "Analyze Launch Metrics",
+}
+
+
+def large_report(kind: str, size_kb: int) -> str:
+    """Markdown shaped like a real report (headings, tables, bullets) of about ``size_kb`` KB."""
+    parts = [f"# {COMPANY} -- {kind.title()} Review\n"]
+    section = 0
+    while sum(len(part) for part in parts) < size_kb * 1024:
+        section += 1
+        parts.append(f"\n## {section}. Findings\n\n| Signal | Evidence / Rationale |\n|---|---|\n")
+        parts += [f"| Signal {section}.{row} | Observed in launch coverage, reviews and pricing pages [{row}] |\n"
+                  for row in range(8)]
+        parts += [f"- Point {section}.{row}: concise, evidence-backed takeaway for product managers\n"
+                  for row in range(6)]
+    return "".join(parts)
+
+
+async def measure(session: BrowserSession, action) -> dict:
+    runs_before, bytes_before = len(session.script_runs), session.bytes_received
+    started = time.perf_counter()
+    await action()
+    await session.settle()
+    runs = session.script_runs[runs_before:]
+    return {
+        "script_runs": len(runs),
+        "run_ms_p50": round(statistics.median(runs) * 1000, 1) if runs else 0.0,
+        "run_ms_total": round(sum(runs) * 1000, 1),
+        "bytes": session.bytes_received - bytes_before,
+        "wall_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+async def drive(url: str, clicks: int) -> dict:
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=60) as ws:
+        session = BrowserSession(ws, RunTracker())
+        await session.rerun()
+        session.set("OpenAI API Key", "sk-standin")
+        session.set("Firecrawl API Key", "fc-standin")
+        session.set("Company Name", COMPANY)
+        await session.rerun()
+        await session.rerun(trigger=session.widget_id("Analyze All"))
+        await session.settle()
+        if session.errors:
+            raise RuntimeError(f"loading the reports failed: {session.errors[0]}")
+
+        async def click_tab():
+            await session.rerun(trigger=session.widget_id(TAB_BUTTONS["competitor"]))
+
+        tab_clicks = [await measure(session, click_tab) for _ in range(clicks)]
+        app_reruns = [await measure(session, session.rerun) for _ in range(clicks)]
+
+        session.set("Force refresh", True)
+        await session.rerun()
+        polling = await measure(session, click_tab)
+        session.set("Force refresh", False)
+        await session.rerun()
+        if session.errors:
+            raise RuntimeError(f"the forced re-analysis failed: {session.errors[0]}")
+    return {"tab click": summarise(tab_clicks), "app rerun": summarise(app_reruns), "job polling": polling}
+
+
+def summarise(samples: list) -> dict:
+    return {
+        "script_runs": statistics.median(s["script_runs"] for s in samples),
+        "run_ms_p50": statistics.median(s["run_ms_p50"] for s in samples),
+        "run_ms_total": statistics.median(s["run_ms_total"] for s in samples),
+        "bytes": int(statistics.median(s["bytes"] for s in samples)),
+        "wall_seconds": statistics.median(s["wall_seconds"] for s in samples),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--report-kb", type=int, default=40, help="size of each seeded report")
+    parser.add_argument("--clicks", type=int, default=10, help="tab clicks and app reruns to measure")
+    parser.add_argument("--scale", type=float, default=0.25, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    stand_ins = start_standins(Latency(scale=args.scale))
+    configure_environment(stand_ins.url)
+    from launch_intel.report_cache import store_report
+
+    for kind in TAB_BUTTONS:
+        store_report(COMPANY, kind, large_report(kind, args.report_kb))
+    port = free_port()
+    server = start_server(port, job_limit=4)
+    try:
+        results = asyncio.run(drive(f"ws://localhost:{port}/_stcore/stream", args.clicks))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stand_ins.shutdown()
+
+    print(f"three {args.report_kb} KB reports loaded; medians over {args.clicks} actions (polling: one re-analysis)")
+    print(f"{'action':<12} {'runs':>5} {'run p50':>9} {'run total':>10} {'bytes':>9} {'wall':>7}")
+    for action, result in results.items():
+        print(f"{action:<12} {result['script_runs']:>5} {result['run_ms_p50']:>6.1f} ms {result['run_ms_total']:>7.1f} ms "
+              f"{result['bytes']:>9} {result['wall_seconds']:>6.2f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"report_kb": args.report_kb, "scale": args.scale, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
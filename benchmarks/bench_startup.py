@@ -0,0 +1,155 @@
+"""Cold-start profile of the Streamlit app: import time and first paint.
+
+    python benchmarks/bench_startup.py [--runs 3] [--json out.json]
+
+Import profile: runs the app's top-level imports in a fresh interpreter with
+``-X importtime`` and reports their total cost, the slowest packages, whether
+agno, OpenAI or Firecrawl were loaded (they should only load once an analysis
+runs) and what the first analysis then pays to import them.
+
+First paint: starts ``streamlit run`` of the app, opens sessions over the
+websocket the way a browser does and times the first element and the end of
+the first script run, plus a plain rerun, with the bytes each one sent. The
+first session is the cold one.
+"""
+
+import argparse
+import ast
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import APP, free_port, start_server  # noqa: E402
+
+try:
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+except ImportError as e:  # pragma: no cover - depends on the Streamlit install
+    sys.exit(f"bench_startup needs streamlit and websockets: {e}")
+
+ROOT = os.path.dirname(APP)
+HEAVY_PACKAGES = ("agno", "openai", "firecrawl")
+# What the first analysis imports on top of the UI's own imports
+ANALYSIS_IMPORTS = "import launch_intel.firecrawl_tools, launch_intel.openai_chat, agno.agent"
+# Top-level modules are indented by one space in -X importtime output, nested ones by two more per level
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+_FINISHED = ForwardMsg.ScriptFinishedStatus
+
+
+def app_imports() -> str:
+    """The import statements at the top level of the app script."""
+    with open(APP, encoding="utf-8-sig") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile_imports() -> dict:
+    imports = app_imports()
+    code = imports + f"\nimport sys\nprint(sorted({{m.split('.')[0] for m in sys.modules}} & {set(HEAVY_PACKAGES)!r}))"
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total_us, packages = 0, {}
+    for line in process.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        total_us += int(self_us)
+        if not indent:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + int(cumulative_us)
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:5]
+
+    code = imports + f"\nimport time\nstarted = time.perf_counter()\n{ANALYSIS_IMPORTS}\nprint(time.perf_counter() - started)"
+    analysis = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return {
+        "import_seconds": total_us / 1e6,
+        "slowest": {name: us / 1e6 for name, us in slowest},
+        "heavy_loaded": ast.literal_eval(process.stdout.strip()),
+        "first_analysis_import_seconds": float(analysis.stdout.strip()),
+    }
+
+
+async def paint(ws) -> dict:
+    """Run the script once with no widget changes; time the first element and the finished run."""
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.page_script_hash = ""
+    await ws.send(msg.SerializeToString())
+    started, first_element, sent = time.perf_counter(), None, 0
+    while True:
+        raw = await ws.recv()
+        sent += len(raw)
+        reply = ForwardMsg()
+        reply.ParseFromString(raw)
+        kind = reply.WhichOneof("type")
+        if kind == "delta" and first_element is None and reply.delta.WhichOneof("type") == "new_element":
+            first_element = time.perf_counter() - started
+        elif kind == "script_finished" and reply.script_finished != _FINISHED.FINISHED_EARLY_FOR_RERUN:
+            return {"first_element": first_element or 0.0, "script_run": time.perf_counter() - started, "bytes": sent}
+
+
+async def profile_sessions(url: str, runs: int) -> list:
+    sessions = []
+    for _ in range(runs):
+        async with websockets.connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=60) as ws:
+            sessions.append({"first_run": await paint(ws), "rerun": await paint(ws)})
+    return sessions
+
+
+def profile_first_paint(runs: int) -> dict:
+    os.environ["BI_CACHE_DIR"] = tempfile.mkdtemp(prefix="bi-startup-")
+    os.environ["BI_TELEMETRY_FILE"] = ""
+    port = free_port()
+    started = time.perf_counter()
+    server = start_server(port, job_limit=4)
+    boot = time.perf_counter() - started
+    try:
+        sessions = asyncio.run(profile_sessions(f"ws://localhost:{port}/_stcore/stream", runs))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"server_boot_seconds": boot, "sessions": sessions}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="import profiles and browser sessions to run")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    imports = [profile_imports() for _ in range(args.runs)]
+    import_seconds = statistics.median(run["import_seconds"] for run in imports)
+    print(f"app imports: {import_seconds * 1000:.0f} ms (median of {args.runs} cold interpreters)")
+    print("  slowest: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in imports[0]["slowest"].items()))
+    print(f"  heavy packages loaded at startup: {', '.join(imports[0]['heavy_loaded']) or 'none'}")
+    analysis_seconds = statistics.median(run["first_analysis_import_seconds"] for run in imports)
+    print(f"  deferred to the first analysis: {analysis_seconds * 1000:.0f} ms")
+
+    paint_result = profile_first_paint(args.runs)
+    print(f"\nserver boot to healthy: {paint_result['server_boot_seconds']:.2f}s")
+    print(f"{'session':<8} {'first element':>14} {'first run':>10} {'bytes':>8} {'rerun':>8} {'bytes':>8}")
+    for i, session in enumerate(paint_result["sessions"]):
+        first, rerun = session["first_run"], session["rerun"]
+        label = "cold" if i == 0 else f"warm {i}"
+        print(f"{label:<8} {first['first_element'] * 1000:>11.0f} ms {first['script_run'] * 1000:>7.0f} ms "
+              f"{first['bytes']:>8} {rerun['script_run'] * 1000:>5.0f} ms {rerun['bytes']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"imports": imports, "first_paint": paint_result}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
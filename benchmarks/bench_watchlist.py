@@ -0,0 +1,104 @@
+"""Monday-morning latency with and without the off-peak watchlist refresh, fully offline.
+
+    python benchmarks/bench_watchlist.py [--scale 0.05] [--companies 30] [--workers 2] [--age-hours 22] [--json out.json]
+
+Without the watchlist, every analyst opens the same ``--companies`` competitors
+at once and all three reports of each run cold, ``BI_MAX_CONCURRENT_JOBS`` at
+a time. With it, the companies are watched and seeded with reports
+``--age-hours`` old (last refresh). One off-peak pass with ``--workers``
+refreshes them, logging each refresh's duration and the staleness of the report it
+replaced, and the same Monday requests are then timed again. Times are real-world
+seconds (scaled back from the stand-ins' ``--scale``).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+
+def monday_morning(companies, shared_research: bool, scale: float) -> list:
+    """Seconds from 9:00 until each company's three reports are on screen, jobs queued as in the app."""
+    from launch_intel.jobs import MAX_CONCURRENT_JOBS
+    from launch_intel.pipeline import ANALYSIS_KINDS
+    from launch_intel.runner import run_cached_analysis
+
+    started = time.perf_counter()
+
+    def report_ready(company: str, kind: str) -> float:
+        run_cached_analysis(company, kind, "sk-standin", "fc-standin", shared_research)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS) as pool:
+        futures = {company: [pool.submit(report_ready, company, kind) for kind in ANALYSIS_KINDS] for company in companies}
+        return [max(future.result() for future in company_futures) / scale for company_futures in futures.values()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.05, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--companies", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=2, help="watchlist refreshes running at once")
+    parser.add_argument("--age-hours", type=float, default=22, help="age of the reports the off-peak pass replaces")
+    parser.add_argument("--shared-research", action="store_true")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = start_standins(Latency(scale=args.scale))
+    configure_environment(server.url)
+    # The rate limits run in real time, not --scale time, and would dominate both passes
+    for limit in ("BI_OPENAI_RPM", "BI_OPENAI_TPM", "BI_FIRECRAWL_JOBS_PER_MIN"):
+        os.environ[limit] = "0"
+    from launch_intel.agents import build_agents
+    from launch_intel.cache import sqlite_connection
+    from launch_intel.pipeline import ANALYSIS_KINDS
+    from launch_intel.report_cache import report_cache, store_report
+    from launch_intel.watchlist import refresh_due, watchlist
+
+    build_agents("sk-standin", "fc-standin")  # Pay the agno import before anything is timed
+    cold = monday_morning([f"Cold Company {i}" for i in range(args.companies)], args.shared_research, args.scale)
+
+    watched = [f"Watched Company {i}" for i in range(args.companies)]
+    watch = watchlist()
+    for company in watched:
+        watch.add(company, args.shared_research)
+        for kind in ANALYSIS_KINDS:
+            store_report(company, kind, f"# {company} {kind} (last refresh)", args.shared_research)
+    with sqlite_connection(report_cache.path) as conn:
+        conn.execute("UPDATE entries SET created_at = created_at - ?", (args.age_hours * 3600,))
+
+    started = time.perf_counter()
+    records = refresh_due(watch, "sk-standin", "fc-standin", args.workers)
+    refresh_wall = (time.perf_counter() - started) / args.scale
+    warm = monday_morning(watched, args.shared_research, args.scale)
+    server.shutdown()
+
+    durations = [record.seconds / args.scale for record in records]
+    staleness = [record.staleness_seconds / 3600 for record in records if record.staleness_seconds is not None]
+    print(f"{args.companies} companies x {len(ANALYSIS_KINDS)} reports"
+          f"{' (shared research)' if args.shared_research else ''}, all opened at 9:00")
+    print(f"cold:      ready after p50 {statistics.median(cold):.0f}s, last {max(cold):.0f}s")
+    print(f"watchlist: ready after p50 {statistics.median(warm):.2f}s, last {max(warm):.2f}s")
+    print(f"off-peak pass: {len(records)} refreshes ({sum(1 for record in records if record.error)} failed) "
+          f"with {args.workers} workers in {refresh_wall / 60:.1f} min; each p50 {statistics.median(durations):.0f}s, "
+          f"max {max(durations):.0f}s; replaced reports {statistics.median(staleness):.1f}h old")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "scale": args.scale, "cold": cold, "warm": warm, "refresh_wall": refresh_wall,
+                "refreshes": [record._asdict() for record in records],
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
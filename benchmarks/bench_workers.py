@@ -0,0 +1,117 @@
+"""Analysis throughput against the number of external worker processes, fully offline.
+
+    python benchmarks/bench_workers.py [--scale 0.1] [--workers 1,2,4] [--threads 2] [--jobs 24] [--json out.json]
+
+For each worker count, starts that many ``python -m launch_intel.worker``
+processes (``--threads`` each) against the stand-ins and a shared job
+database, queues ``--jobs`` analyses (a third of that many companies, all
+three analyses each) the way the app does in ``BI_EXTERNAL_WORKERS`` mode and
+waits for them. Reports jobs per minute, the speed-up over one worker and the
+queue wait and run time per job, in real-world seconds.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+POLL_SECONDS = 0.1
+
+
+def start_workers(count: int, threads: int, manager) -> list:
+    env = dict(os.environ, OPENAI_API_KEY="sk-standin", FIRECRAWL_API_KEY="fc-standin")
+    workers = [
+        subprocess.Popen([sys.executable, "-m", "launch_intel.worker", "--threads", str(threads)],
+                         cwd=ROOT, env=env, stderr=subprocess.DEVNULL)
+        for _ in range(count)
+    ]
+    while manager.stats()["workers"] < count:  # Registered once their agents are warm
+        if any(worker.poll() is not None for worker in workers):
+            raise RuntimeError("a worker exited during startup")
+        time.sleep(POLL_SECONDS)
+    return workers
+
+
+def stop_workers(workers: list) -> None:
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.wait(timeout=60)
+
+
+def run_level(manager, count: int, threads: int, jobs: int, scale: float) -> dict:
+    from launch_intel.pipeline import ANALYSIS_KINDS
+
+    workers = start_workers(count, threads, manager)
+    try:
+        started = time.perf_counter()
+        ids = [
+            manager.submit(f"Company {count}-{i // len(ANALYSIS_KINDS)}", ANALYSIS_KINDS[i % len(ANALYSIS_KINDS)], "", "")
+            for i in range(jobs)
+        ]
+        while any(manager.get(job_id).active for job_id in ids):
+            time.sleep(POLL_SECONDS)
+        wall = (time.perf_counter() - started) / scale
+    finally:
+        stop_workers(workers)
+    finished = [manager.get(job_id) for job_id in ids]
+    failed = [job.error for job in finished if job.error]
+    if failed:
+        raise RuntimeError(f"{len(failed)} jobs failed, e.g. {failed[0]}")
+    return {
+        "workers": count,
+        "wall": wall,
+        "jobs_per_min": jobs / wall * 60,
+        "queue_wait_p50": statistics.median((job.started_at - job.created_at) / scale for job in finished),
+        "run_p50": statistics.median((job.finished_at - job.started_at) / scale for job in finished),
+        "served_by": len({job.worker for job in finished}),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.1, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker process counts")
+    parser.add_argument("--threads", type=int, default=2, help="jobs each worker runs at once")
+    parser.add_argument("--jobs", type=int, default=24)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = start_standins(Latency(scale=args.scale))
+    configure_environment(server.url)
+    os.environ["BI_EXTERNAL_WORKERS"] = "1"
+    # The rate limits run in real time, not --scale time, and each worker has its own
+    for limit in ("BI_OPENAI_RPM", "BI_OPENAI_TPM", "BI_FIRECRAWL_JOBS_PER_MIN"):
+        os.environ[limit] = "0"
+    from launch_intel.jobs import JobManager
+
+    manager = JobManager(external=True)
+    results = []
+    for count in [int(value) for value in args.workers.split(",") if value.strip()]:
+        results.append(run_level(manager, count, args.threads, args.jobs, args.scale))
+    server.shutdown()
+
+    print(f"{args.jobs} jobs, {args.threads} threads per worker")
+    print(f"{'workers':>7} {'jobs/min':>9} {'speed-up':>9} {'queue p50':>10} {'run p50':>8}")
+    for result in results:
+        print(f"{result['workers']:>7} {result['jobs_per_min']:>9.1f} "
+              f"{result['jobs_per_min'] / results[0]['jobs_per_min'] * results[0]['workers']:>8.2f}x "
+              f"{result['queue_wait_p50']:>9.1f}s {result['run_p50']:>7.1f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "threads": args.threads, "jobs": args.jobs, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
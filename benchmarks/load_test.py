@@ -0,0 +1,400 @@
+"""Load test: N concurrent browser sessions against one Streamlit server, fully offline.
+
+    python benchmarks/load_test.py [--sessions 1,4,8] [--scale 0.25] [--json out.json]
+
+Starts the OpenAI and Firecrawl stand-ins (``benchmarks/standins.py``) and a
+real ``streamlit run`` of the app pointed at them, then drives each session
+over Streamlit's websocket protocol the way a browser does: enter the keys and
+a company, click "Analyze All" and follow the app's polling reruns (fragment
+``run_every`` timers, which the browser drives) until every report is in. Each level of ``--sessions`` starts that many sessions at once
+(each with its own company, so nothing is served from the report cache) and
+reports throughput, session latency percentiles, the server's RSS growth per
+session, and script-thread saturation: script-run times, how many runs
+overlapped, server CPU, thread count and the analysis job queue depth.
+
+Times are wall-clock seconds with the stand-in latencies multiplied by
+``--scale``. Server metrics are read from ``/proc``, so this runs on Linux.
+Needs the ``websockets`` package (installed with Streamlit's server).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import configure_environment  # noqa: E402
+from benchmarks.standins import Latency, start_standins  # noqa: E402
+
+try:
+    import websockets
+    from streamlit.proto.Alert_pb2 import Alert
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+except ImportError as e:  # pragma: no cover - depends on the Streamlit install
+    sys.exit(f"load_test needs streamlit and websockets: {e}")
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "product_launch_intelligence_agent.py")
+ANALYZE_ALL_LABEL = "Analyze All"
+SAMPLE_SECONDS = 0.25
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_FINISHED = ForwardMsg.ScriptFinishedStatus
+
+
+@dataclass
+class SessionResult:
+    company: str
+    latency: float = 0.0
+    script_runs: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+class BrowserSession:
+    """The part of the Streamlit frontend protocol the app's flows need.
+
+    Reruns carry the widget state, a widget inside a fragment reruns only that
+    fragment, ``run_every`` timers are kept per fragment (and dropped on a full
+    rerun, as the frontend does), and large elements already received are
+    advertised so the server sends references instead of resending them.
+    """
+
+    def __init__(self, ws, tracker: "RunTracker"):
+        self.ws = ws
+        self.tracker = tracker
+        self.widgets: Dict[str, tuple] = {}  # label -> (element type, widget id, fragment id)
+        self.values: Dict[str, object] = {}  # widget id -> value sent with every rerun
+        self.auto_reruns: Dict[str, float] = {}  # fragment id -> run_every interval
+        self.cached_hashes: set = set()
+        self.script_runs: List[float] = []
+        self.bytes_received = 0
+        self.errors: List[str] = []
+
+    async def rerun(self, trigger: Optional[str] = None, fragment_id: str = "", auto: bool = False) -> None:
+        """Request a rerun and wait until the app stops rerunning itself."""
+        if trigger:
+            fragment_id = next((fragment for _, widget_id, fragment in self.widgets.values() if widget_id == trigger), "")
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.is_auto_rerun = auto
+        msg.rerun_script.cached_message_hashes.extend(self.cached_hashes)
+        for widget_id, value in self.values.items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            if isinstance(value, bool):
+                state.bool_value = value
+            else:
+                state.string_value = value
+        if trigger:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = trigger
+            state.trigger_value = True
+        await self.ws.send(msg.SerializeToString())
+
+        run_started = None
+        while True:
+            raw = await self.ws.recv()
+            self.bytes_received += len(raw)
+            reply = ForwardMsg()
+            reply.ParseFromString(raw)
+            kind = reply.WhichOneof("type")
+            if kind == "new_session":
+                run_started = time.perf_counter()
+                if not reply.new_session.fragment_ids_this_run:
+                    self.errors = []
+                    self.auto_reruns.clear()
+                self.tracker.started()
+            elif kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                if reply.metadata.cacheable:
+                    self.cached_hashes.add(reply.hash)
+                self._observe(reply.delta.new_element, reply.delta.fragment_id)
+            elif kind == "auto_rerun":
+                self.auto_reruns[reply.auto_rerun.fragment_id] = reply.auto_rerun.interval
+            elif kind == "stop_auto_rerun":
+                for stopped in reply.stop_auto_rerun.fragment_ids:
+                    self.auto_reruns.pop(stopped, None)
+            elif kind == "script_finished":
+                if run_started is not None:
+                    self.script_runs.append(time.perf_counter() - run_started)
+                    self.tracker.finished()
+                    run_started = None
+                if reply.script_finished != _FINISHED.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    async def settle(self) -> None:
+        """Fire the fragments' ``run_every`` timers, as the browser would, until none is left."""
+        while self.auto_reruns:
+            await asyncio.sleep(min(self.auto_reruns.values()))
+            for fragment_id in list(self.auto_reruns):
+                if fragment_id in self.auto_reruns:
+                    await self.rerun(fragment_id=fragment_id, auto=True)
+
+    def set(self, label: str, value) -> None:
+        self.values[self.widget_id(label)] = value
+
+    def widget_id(self, label: str) -> str:
+        for known, (_, widget_id, _) in self.widgets.items():
+            if label in known:
+                return widget_id
+        raise LookupError(f"no widget labelled {label!r} on the page")
+
+    def _observe(self, element, fragment_id: str = "") -> None:
+        element_type = element.WhichOneof("type")
+        if element_type in ("text_input", "button", "checkbox"):
+            widget = getattr(element, element_type)
+            self.widgets[widget.label] = (element_type, widget.id, fragment_id)
+        elif element_type == "alert" and element.alert.format == Alert.ERROR:
+            self.errors.append(element.alert.body)
+        elif element_type == "exception":
+            self.errors.append(element.exception.message)
+
+
+class RunTracker:
+    """How many script runs are executing on the server at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    def started(self) -> None:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+    def finished(self) -> None:
+        self.active -= 1
+
+
+async def run_session(
+    url: str, company: str, keys: tuple, shared_research: bool, tracker: RunTracker,
+    finished: asyncio.Event, release: asyncio.Event,
+) -> SessionResult:
+    result = SessionResult(company)
+    try:
+        async with websockets.connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=60) as ws:
+            session = BrowserSession(ws, tracker)
+            await session.rerun()
+            session.set("OpenAI API Key", keys[0])
+            session.set("Firecrawl API Key", keys[1])
+            session.set("Company Name", company)
+            session.set("Shared research", shared_research)
+            await session.rerun()
+            started = time.perf_counter()
+            await session.rerun(trigger=session.widget_id(ANALYZE_ALL_LABEL))
+            await session.settle()
+            result.latency = time.perf_counter() - started
+            result.script_runs, result.errors = session.script_runs, session.errors
+            finished.set()
+            # Stay connected until the level's memory sample is taken
+            await release.wait()
+    finally:
+        finished.set()
+    return result
+
+
+class ServerSampler:
+    """Polls the server process and the job table while a level runs."""
+
+    def __init__(self, pid: int, jobs_db: str):
+        self.pid = pid
+        self.jobs_db = jobs_db
+        self.samples: List[dict] = []
+
+    def rss_mb(self) -> float:
+        return self._status().get("VmRSS", 0) / 1024
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+
+    def sample(self) -> None:
+        status = self._status()
+        queued = running = 0
+        if os.path.exists(self.jobs_db):
+            with closing(sqlite3.connect(self.jobs_db, timeout=5)) as conn:
+                counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            queued, running = counts.get("queued", 0), counts.get("running", 0)
+        self.samples.append({
+            "rss_mb": status.get("VmRSS", 0) / 1024, "threads": status.get("Threads", 0),
+            "jobs_queued": queued, "jobs_running": running,
+        })
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop.wait(), SAMPLE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _status(self) -> Dict[str, int]:
+        values = {}
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("VmRSS", "Threads"):
+                    values[name] = int(rest.split()[0])
+        return values
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+async def run_level(
+    url: str, sessions: int, level: int, sampler: ServerSampler, keys: tuple, shared_research: bool, job_limit: int
+) -> dict:
+    tracker, release, stop = RunTracker(), asyncio.Event(), asyncio.Event()
+    rss_before, cpu_before = sampler.rss_mb(), sampler.cpu_seconds()
+    sampler.samples = []
+    sampling = asyncio.create_task(sampler.run(stop))
+    started = time.perf_counter()
+    finished = [asyncio.Event() for _ in range(sessions)]
+    tasks = [
+        asyncio.create_task(run_session(
+            url, f"Loadtest {level}-{i}", keys, shared_research, tracker, finished[i], release
+        ))
+        for i in range(sessions)
+    ]
+    # Every session has its reports (or failed); sample memory while they are all still connected
+    await asyncio.gather(*(event.wait() for event in finished))
+    wall = time.perf_counter() - started
+    cpu = sampler.cpu_seconds() - cpu_before
+    rss_connected = sampler.rss_mb()
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    stop.set()
+    await sampling
+    await asyncio.sleep(1.0)  # Let the server drop the closed sessions
+    rss_after = sampler.rss_mb()
+
+    done = [r for r in results if isinstance(r, SessionResult) and not r.errors]
+    failed = [r for r in results if not isinstance(r, SessionResult) or r.errors]
+    latencies = [r.latency for r in done]
+    script_runs = [s for r in results if isinstance(r, SessionResult) for s in r.script_runs]
+    samples = sampler.samples or [{"threads": 0, "jobs_queued": 0, "jobs_running": 0}]
+    return {
+        "sessions": sessions,
+        "completed": len(done),
+        "failed": len(failed),
+        "errors": sorted({str(r) if not isinstance(r, SessionResult) else r.errors[0] for r in failed})[:3],
+        "wall_seconds": round(wall, 2),
+        "analyses_per_minute": round(3 * len(done) / wall * 60, 2),
+        "latency_p50": round(statistics.median(latencies), 2) if latencies else None,
+        "latency_p95": round(percentile(latencies, 0.95), 2) if latencies else None,
+        "latency_max": round(max(latencies), 2) if latencies else None,
+        "script_run_p50_ms": round(statistics.median(script_runs) * 1000, 1) if script_runs else None,
+        "script_run_p95_ms": round(percentile(script_runs, 0.95) * 1000, 1) if script_runs else None,
+        "script_runs": len(script_runs),
+        "peak_concurrent_runs": tracker.peak,
+        "server_cpu_percent": round(100 * cpu / wall, 1),
+        "threads_max": max(s["threads"] for s in samples),
+        "jobs_queued_max": max(s["jobs_queued"] for s in samples),
+        "job_pool_saturated_percent": round(
+            100 * sum(s["jobs_running"] >= job_limit for s in samples) / len(samples), 1
+        ),
+        "rss_before_mb": round(rss_before, 1),
+        "rss_growth_per_session_mb": round((rss_connected - rss_before) / sessions, 2),
+        "rss_retained_per_session_mb": round((rss_after - rss_before) / sessions, 2),
+    }
+
+
+def start_server(port: int, job_limit: int) -> subprocess.Popen:
+    env = dict(os.environ, BI_MAX_CONCURRENT_JOBS=str(job_limit))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless=true", f"--server.port={port}",
+         "--browser.gatherUsageStats=false", "--server.fileWatcherType=none"],
+        env=env, cwd=os.path.dirname(APP), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("the Streamlit server did not become healthy within 60s")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def print_level(result: dict) -> None:
+    print(
+        f"{result['sessions']:>8} {result['completed']:>4}/{result['failed']:<3} {result['analyses_per_minute']:>9.1f} "
+        f"{result['latency_p50'] or 0:>7.1f}s {result['latency_p95'] or 0:>6.1f}s "
+        f"{result['script_run_p50_ms'] or 0:>7.0f} {result['script_run_p95_ms'] or 0:>6.0f} "
+        f"{result['peak_concurrent_runs']:>5} {result['server_cpu_percent']:>5.0f}% {result['threads_max']:>7} "
+        f"{result['jobs_queued_max']:>6} {result['job_pool_saturated_percent']:>5.0f}% "
+        f"{result['rss_growth_per_session_mb']:>8.2f} {result['rss_retained_per_session_mb']:>8.2f}"
+    )
+    for error in result["errors"]:
+        print(f"         error: {error[:160]}")
+
+
+async def run_levels(args, url: str, sampler: ServerSampler) -> List[dict]:
+    keys = ("sk-standin", "fc-standin")
+    # One warm-up session so imports and first-run caches are not charged to the first level
+    warmup = await run_level(url, 1, 0, sampler, keys, args.shared_research, args.jobs)
+    print(f"warm-up session: {warmup['latency_p50'] or 0:.1f}s, server RSS {sampler.rss_mb():.0f} MB")
+    print(f"\n{'sessions':>8} {'ok/fail':<8} {'an./min':>9} {'p50':>8} {'p95':>7} "
+          f"{'run p50':>7} {'p95ms':>6} {'ovlp':>5} {'cpu':>6} {'threads':>7} {'queued':>6} {'pool':>6} "
+          f"{'MB/sess':>8} {'retained':>8}")
+    results = []
+    for level, sessions in enumerate(args.sessions, start=1):
+        results.append(await run_level(url, sessions, level, sampler, keys, args.shared_research, args.jobs))
+        print_level(results[-1])
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,4,8", help="comma-separated concurrent session counts, run in turn")
+    parser.add_argument("--scale", type=float, default=0.25, help="latency multiplier for the stand-ins (1 = real time)")
+    parser.add_argument("--jobs", type=int, default=int(os.getenv("BI_MAX_CONCURRENT_JOBS", "4")),
+                        help="server job pool size (BI_MAX_CONCURRENT_JOBS)")
+    parser.add_argument("--shared-research", action="store_true", help="tick the shared research stage in every session")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    args.sessions = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    stand_ins = start_standins(Latency(scale=args.scale))
+    configure_environment(stand_ins.url)
+    port = free_port()
+    server = start_server(port, args.jobs)
+    try:
+        sampler = ServerSampler(server.pid, os.path.join(os.environ["BI_CACHE_DIR"], "jobs.sqlite3"))
+        print(f"streamlit pid {server.pid} on port {port}, job pool {args.jobs}, stand-in scale {args.scale}")
+        results = asyncio.run(run_levels(args, f"ws://localhost:{port}/_stcore/stream", sampler))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stand_ins.shutdown()
+    print("stand-in requests: " + ", ".join(f"{key}={value}" for key, value in sorted(stand_ins.stats.items())))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "job_pool": args.jobs, "levels": results}, f, indent=2)
+    return 1 if any(result["failed"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
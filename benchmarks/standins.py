@@ -0,0 +1,531 @@
+"""Local stand-ins for the OpenAI chat endpoint and the Firecrawl API.
+
+One HTTP server answers both APIs:
+
+* ``POST /v1/chat/completions`` (plain and streamed, including tool calls)
+* ``POST /v2/search``, ``POST /v2/scrape``, ``POST /v2/map``
+* ``POST /v2/crawl`` and ``GET /v2/crawl/<id>``
+* ``GET``/``HEAD /pages/...``: the origin pages synthetic search results link to,
+  with ``ETag`` and ``Last-Modified`` so conditional refresh requests get a 304
+
+In ``replay`` mode responses come from a fixture file when one matches the
+request and are otherwise synthesised deterministically, so nothing ever
+leaves the machine. In ``record`` mode requests are forwarded to the real
+APIs with the caller's credentials and the responses (and their latency) are
+saved as fixtures. Latencies are simulated from ``Latency`` and multiplied by
+``Latency.scale`` so that benchmarks can compress time. Connections are kept
+alive, and the first request on each new one waits ``Latency.connect`` as a
+stand-in for the TCP and TLS handshakes (``stats["connections"]`` counts them).
+
+Point the app at it with ``OPENAI_BASE_URL=<url>/v1`` and
+``FIRECRAWL_API_URL=<url>``.
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+OPENAI_UPSTREAM = "https://api.openai.com/v1"
+FIRECRAWL_UPSTREAM = "https://api.firecrawl.dev"
+
+
+@dataclass
+class Latency:
+    """Simulated service times in real-world seconds; ``scale`` compresses them all."""
+
+    scale: float = 1.0
+    openai_ttft: float = 0.6
+    openai_tokens_per_second: float = 70.0
+    # Prompt processing before the first token; cached prefix tokens skip it
+    openai_prefill_tokens_per_second: float = 8000.0
+    search: float = 1.2
+    scrape: float = 1.8
+    map: float = 1.0
+    crawl_job: float = 6.0
+    # TCP + TLS setup paid by the first request on each new connection
+    connect: float = 0.15
+    jitter: float = 0.15
+    use_recorded: bool = False
+    bullet_tokens: int = 350
+    report_tokens: int = 900
+
+
+class FixtureStore:
+    """Recorded responses keyed by a hash of the request, kept in one JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self.entries.get(key)
+
+    def put(self, key: str, response, latency: float) -> None:
+        with self._lock:
+            self.entries[key] = {"response": response, "latency": round(latency, 3)}
+            if self.path:
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f, indent=1, sort_keys=True)
+
+
+def request_key(kind: str, payload) -> str:
+    return kind + ":" + hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:24]
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# OpenAI caches prompt prefixes of at least 1024 tokens, in 128-token steps
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP_TOKENS = 128
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: Latency = Latency(),
+        fixtures: Optional[FixtureStore] = None,
+        mode: str = "replay",
+        port: int = 0,
+        openai_upstream: str = OPENAI_UPSTREAM,
+        firecrawl_upstream: str = FIRECRAWL_UPSTREAM,
+    ):
+        if mode not in ("replay", "record"):
+            raise ValueError(f"unknown stand-in mode: {mode}")
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.fixtures = fixtures or FixtureStore()
+        self.mode = mode
+        self.openai_upstream = openai_upstream
+        self.firecrawl_upstream = firecrawl_upstream
+        self.crawl_jobs: Dict[str, dict] = {}
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(7)
+        self._prompt_prefixes: set = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients closing keep-alive connections (e.g. a worker process exiting) are not errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self) -> "StandInServer":
+        threading.Thread(target=self.serve_forever, name="standins", daemon=True).start()
+        return self
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + n
+
+    def cached_prompt_tokens(self, body: dict) -> int:
+        """Emulate provider prompt caching: the longest prefix (tools, then messages) seen in an earlier request."""
+        text = json.dumps(body.get("tools") or [], sort_keys=True) + json.dumps(body.get("messages", []))
+        step = PROMPT_CACHE_STEP_TOKENS * 4
+        prefixes = [
+            (end, hashlib.sha256(text[:end].encode("utf-8")).digest())
+            for end in range(PROMPT_CACHE_MIN_TOKENS * 4, len(text) + 1, step)
+        ]
+        with self._lock:
+            cached = max((end for end, digest in prefixes if digest in self._prompt_prefixes), default=0)
+            self._prompt_prefixes.update(digest for _, digest in prefixes)
+        return cached // 4
+
+    def wait(self, seconds: float, recorded: Optional[float] = None) -> None:
+        if self.latency.use_recorded and recorded is not None:
+            seconds = recorded
+        with self._lock:
+            factor = 1 + self._rng.uniform(-self.latency.jitter, self.latency.jitter)
+        time.sleep(max(0.0, seconds * factor * self.latency.scale))
+
+    def forward(self, url: str, payload: Optional[dict], authorization: str, method: str = "POST"):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(url, data=data, method=method, headers={
+            "Authorization": authorization, "Content-Type": "application/json",
+        })
+        started = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=300) as response:
+            body = json.loads(response.read())
+        return body, time.perf_counter() - started
+
+
+# --- Synthetic content ----------------------------------------------------------
+
+_FILLER = (
+    "Our mission has always been to build products people love, crafted with care for teams everywhere.",
+    "Industry observers expect the category to keep consolidating over the coming quarters.",
+    "The announcement follows a series of smaller updates shipped earlier in the year.",
+)
+
+
+def guess_company(text: str) -> str:
+    match = re.search(r"^Company: (.+)$", text, re.MULTILINE) or re.search(
+        r"(?:about|for|analysing|analyzing) ([A-Z][\w&.-]*(?: [A-Z][\w&.-]*)*)", text
+    )
+    if match:
+        return match.group(1)
+    words = re.findall(r"[A-Z][\w&.-]+", text)
+    return words[0] if words else "the company"
+
+
+def synthetic_page(topic: str, seed: str, paragraphs: int = 8) -> str:
+    rng = random.Random(seed)
+    company = guess_company(topic)
+    lines = ["[Home](/)", "[Products](/products)", "[Pricing](/pricing)", "Accept all cookies to continue", ""]
+    lines.append(f"# {company}: {topic}")
+    for i in range(paragraphs):
+        if i % 3 == 2:
+            lines.append(rng.choice(_FILLER) * 2)
+        else:
+            lines.append(
+                f"{company} reported {rng.randint(2, 90)}% growth after the launch, reaching "
+                f"{rng.randint(1, 40)} million users; reviewers praised the {rng.choice(['speed', 'design', 'pricing'])} "
+                f"but customers complained about {rng.choice(['bugs', 'support', 'onboarding'])}."
+            )
+        lines.append("")
+    lines.append(f"© 2025 {company}. All rights reserved. Subscribe to our newsletter.")
+    return "\n".join(lines)
+
+
+def synthetic_completion(messages: List[dict], tools: List[dict], latency: Latency) -> dict:
+    """A deterministic assistant turn: research with a tool first when tools are offered, then answer."""
+    user_text = next((str(m.get("content") or "") for m in reversed(messages) if m.get("role") == "user"), "")
+    company = guess_company(user_text)
+    tool_names = [tool["function"]["name"] for tool in tools or []]
+    expanding = "=== SOURCE BULLETS ===" in user_text
+    if tool_names and not expanding and not any(m.get("role") == "tool" for m in messages):
+        name = "search" if "search" in tool_names else tool_names[0]
+        arguments = {"query": f"{company} product launch", "limit": 5} if name == "search" else {"url": "https://example.com"}
+        if name == "crawl_websites":
+            arguments = {"urls": ["https://example.com"]}
+        return {"role": "assistant", "content": None, "tool_calls": [{
+            "id": "call_" + uuid.uuid4().hex[:12], "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments)},
+        }]}
+    rng = random.Random(user_text)
+    target_chars = (latency.report_tokens if expanding else latency.bullet_tokens) * 4
+    lines = [f"# {company} -- Launch Review" if expanding else ""]
+    tags = ("Positioning", "Strength", "Weakness", "Learning")
+    # Bullets written from a research corpus cite its numbered sources, as the prompt asks
+    refs = re.findall(r"^\[(\d+)\]", user_text, re.MULTILINE) if not expanding else []
+    while sum(len(line) for line in lines) < target_chars:
+        lines.append(
+            f"- {rng.choice(tags)}: {company} reached {rng.randint(1, 40)}M users with "
+            f"{rng.randint(2, 90)}% growth; sentiment was {rng.choice(['positive', 'mixed', 'negative'])} on pricing."
+            + (f" [{rng.choice(refs)}]" if refs else "")
+        )
+    return {"role": "assistant", "content": "\n".join(line for line in lines if line)}
+
+
+# --- Request handling -----------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInServer
+    # Keep-alive, like the real APIs, so clients that reuse connections skip the connect latency
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+        self._new_connection = True
+
+    def handle_one_request(self):
+        if self._new_connection:
+            self._new_connection = False
+            # Waited on the first request rather than at accept so idle pre-opened sockets cost nothing
+            self.server.wait(self.server.latency.connect)
+        super().handle_one_request()
+
+    def _json(self, payload, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._body()
+        routes = {
+            "/v1/chat/completions": self._chat,
+            "/v2/search": lambda b: self._firecrawl("search", b, self.server.latency.search),
+            "/v2/scrape": lambda b: self._firecrawl("scrape", b, self.server.latency.scrape),
+            "/v2/map": lambda b: self._firecrawl("map", b, self.server.latency.map),
+            "/v2/crawl": self._start_crawl,
+        }
+        handler = routes.get(path)
+        if handler is None:
+            self._json({"success": False, "error": f"no stand-in for {path}"}, 404)
+            return
+        handler(body)
+
+    def do_HEAD(self):
+        self._origin_page(with_body=False)
+
+    def do_GET(self):
+        if self.path.startswith("/pages/"):
+            self._origin_page(with_body=True)
+            return
+        match = re.fullmatch(r"/v2/crawl/([\w-]+)", self.path.split("?")[0])
+        if match is None:
+            self._json({"success": False, "error": f"no stand-in for {self.path}"}, 404)
+            return
+        self._crawl_status(match.group(1))
+
+    # OpenAI ----------------------------------------------------------------------
+
+    def _chat(self, body: dict) -> None:
+        server = self.server
+        stream = bool(body.get("stream"))
+        server.count("openai_stream_calls" if stream else "openai_calls")
+        key = request_key("openai", {
+            "model": body.get("model"),
+            "messages": [(m.get("role"), str(m.get("content") or ""), json.dumps(m.get("tool_calls"), sort_keys=True))
+                         for m in body.get("messages", [])],
+            "tools": sorted(t["function"]["name"] for t in body.get("tools") or []),
+        })
+        fixture = server.fixtures.get(key)
+        recorded = None
+        if fixture is not None:
+            server.count("fixture_hits")
+            completion, recorded = fixture["response"], fixture["latency"]
+        elif server.mode == "record":
+            upstream = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+            completion, seconds = server.forward(
+                f"{server.openai_upstream}/chat/completions", upstream, self.headers.get("Authorization", "")
+            )
+            server.fixtures.put(key, completion, seconds)
+        else:
+            server.count("fixture_misses")
+            message = synthetic_completion(body.get("messages", []), body.get("tools"), server.latency)
+            prompt_tokens = count_tokens(json.dumps(body.get("tools") or []) + json.dumps(body.get("messages", [])))
+            completion_tokens = count_tokens(message.get("content") or json.dumps(message.get("tool_calls")))
+            completion = {
+                "id": "chatcmpl-" + uuid.uuid4().hex[:12], "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "gpt-4o-mini"),
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens,
+                          "prompt_tokens_details": {"cached_tokens": min(prompt_tokens, server.cached_prompt_tokens(body))}},
+            }
+        usage = completion.get("usage") or {}
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        server.count("prompt_tokens", usage.get("prompt_tokens", 0))
+        server.count("cached_prompt_tokens", cached_tokens)
+        server.count("completion_tokens", usage.get("completion_tokens", 0))
+        ttft = server.latency.openai_ttft + (
+            max(0, usage.get("prompt_tokens", 0) - cached_tokens) / server.latency.openai_prefill_tokens_per_second
+        )
+        if stream:
+            self._stream_chat(completion, recorded, ttft, bool((body.get("stream_options") or {}).get("include_usage")))
+            return
+        generation = usage.get("completion_tokens", 0) / server.latency.openai_tokens_per_second
+        server.wait(ttft + generation, recorded)
+        self._json(completion)
+
+    def _stream_chat(self, completion: dict, recorded: Optional[float], ttft: float, include_usage: bool) -> None:
+        server = self.server
+        choice = completion["choices"][0]
+        message = choice["message"]
+        base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                "model": completion["model"]}
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(payload) -> None:
+            event = f"data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+
+        tokens = max(1, (completion.get("usage") or {}).get("completion_tokens", 1))
+        server.wait(ttft, recorded and recorded * 0.2)
+        send({**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]})
+        if message.get("tool_calls"):
+            deltas = [{**call, "index": i} for i, call in enumerate(message["tool_calls"])]
+            send({**base, "choices": [{"index": 0, "delta": {"tool_calls": deltas}, "finish_reason": None}]})
+        else:
+            pieces = re.findall(r"\S+\s*", message.get("content") or "")
+            step = max(1, len(pieces) // 40)
+            for i in range(0, len(pieces), step):
+                server.wait(tokens / server.latency.openai_tokens_per_second * step / max(1, len(pieces)),
+                            recorded and recorded * 0.8 * step / max(1, len(pieces)))
+                send({**base, "choices": [{"index": 0, "delta": {"content": "".join(pieces[i:i + step])}, "finish_reason": None}]})
+        send({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": choice.get("finish_reason", "stop")}]})
+        if include_usage:
+            send({**base, "choices": [], "usage": completion.get("usage")})
+        send("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    # Firecrawl -------------------------------------------------------------------
+
+    def _firecrawl(self, operation: str, body: dict, seconds: float) -> None:
+        server = self.server
+        server.count(operation)
+        key = request_key(f"firecrawl:{operation}", body)
+        fixture = server.fixtures.get(key)
+        if fixture is not None:
+            server.count("fixture_hits")
+            server.wait(seconds, fixture["latency"])
+            self._json(fixture["response"])
+            return
+        if server.mode == "record":
+            response, elapsed = server.forward(
+                f"{server.firecrawl_upstream}/v2/{operation}", body, self.headers.get("Authorization", "")
+            )
+            server.fixtures.put(key, response, elapsed)
+            self._json(response)
+            return
+        server.count("fixture_misses")
+        server.wait(seconds)
+        self._json(self._synthetic_firecrawl(operation, body))
+
+    def _origin_page(self, with_body: bool) -> None:
+        """A static origin page that honours If-None-Match and If-Modified-Since."""
+        if not self.path.startswith("/pages/"):
+            self.send_error(404)
+            return
+        self.server.count("origin_gets" if with_body else "origin_checks")
+        body = synthetic_page(self.path, self.path).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+        if self.headers.get("If-None-Match") == etag or (
+            not self.headers.get("If-None-Match") and self.headers.get("If-Modified-Since") == last_modified
+        ):
+            self.server.count("origin_not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def _synthetic_firecrawl(self, operation: str, body: dict) -> dict:
+        if operation == "search":
+            query = body.get("query", "")
+            with_markdown = bool(body.get("scrapeOptions"))
+            results = []
+            for i in range(int(body.get("limit") or 5)):
+                slug = re.sub(r"\W+", "-", query.lower()).strip("-")
+                item = {"url": f"{self.server.url}/pages/{slug}/{i}", "title": f"{query} ({i + 1})",
+                        "description": f"Coverage of {query}, item {i + 1}."}
+                if with_markdown:
+                    item["markdown"] = synthetic_page(query, f"{query}:{i}")
+                    item["metadata"] = {"sourceURL": item["url"], "title": item["title"]}
+                results.append(item)
+            return {"success": True, "data": {"web": results}}
+        url = body.get("url", "https://example.com")
+        if operation == "map":
+            return {"success": True, "links": [{"url": f"{url.rstrip('/')}/page-{i}"} for i in range(10)]}
+        return {"success": True, "data": {"markdown": synthetic_page(url, url), "metadata": {"sourceURL": url, "title": url}}}
+
+    def _start_crawl(self, body: dict) -> None:
+        server = self.server
+        server.count("crawl_jobs")
+        key = request_key("firecrawl:crawl", body)
+        fixture = server.fixtures.get(key)
+        job_id = uuid.uuid4().hex
+        job = {"key": key, "body": body, "started": time.monotonic()}
+        if server.mode == "record" and fixture is None:
+            response, _ = server.forward(f"{server.firecrawl_upstream}/v2/crawl", body, self.headers.get("Authorization", ""))
+            job.update(upstream_id=response.get("id"), authorization=self.headers.get("Authorization", ""))
+        else:
+            if fixture is not None:
+                server.count("fixture_hits")
+            duration = fixture["latency"] if fixture is not None and server.latency.use_recorded else server.latency.crawl_job
+            job.update(done_at=time.monotonic() + duration * server.latency.scale, fixture=fixture)
+        with server._lock:
+            server.crawl_jobs[job_id] = job
+        self._json({"success": True, "id": job_id, "url": f"{server.url}/v2/crawl/{job_id}"})
+
+    def _crawl_status(self, job_id: str) -> None:
+        server = self.server
+        server.count("crawl_status")
+        with server._lock:
+            job = server.crawl_jobs.get(job_id)
+        if job is None:
+            self._json({"success": False, "error": "unknown crawl job"}, 404)
+            return
+        if "upstream_id" in job:
+            response, _ = server.forward(
+                f"{server.firecrawl_upstream}/v2/crawl/{job['upstream_id']}", None, job["authorization"], method="GET"
+            )
+            response.pop("next", None)
+            if response.get("status") == "completed":
+                server.fixtures.put(job["key"], response, time.monotonic() - job["started"])
+            self._json(response)
+            return
+        if time.monotonic() < job["done_at"]:
+            self._json({"success": True, "status": "scraping", "total": 1, "completed": 0, "creditsUsed": 0, "data": []})
+            return
+        if job.get("fixture") is not None:
+            self._json(job["fixture"]["response"])
+            return
+        url = job["body"].get("url", "https://example.com")
+        pages = int(job["body"].get("limit") or 3)
+        data = [{"markdown": synthetic_page(url, f"{url}:{i}"), "metadata": {"sourceURL": f"{url}/{i}"}} for i in range(pages)]
+        self._json({"success": True, "status": "completed", "total": pages, "completed": pages,
+                    "creditsUsed": pages, "data": data})
+
+
+def start_standins(
+    latency: Latency = Latency(), fixtures_path: Optional[str] = None, mode: str = "replay", port: int = 0
+) -> StandInServer:
+    """Start a stand-in server on a daemon thread; see the module docstring for wiring it up."""
+    return StandInServer(latency, FixtureStore(fixtures_path), mode, port).start()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the OpenAI and Firecrawl stand-ins")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=("replay", "record"), default="replay")
+    parser.add_argument("--fixtures", help="JSON fixture file to replay from or record into")
+    parser.add_argument("--scale", type=float, default=1.0, help="latency multiplier (1 = realistic)")
+    args = parser.parse_args()
+    server = start_standins(Latency(scale=args.scale), args.fixtures, args.mode, args.port)
+    print(f"Stand-ins on {server.url}: OPENAI_BASE_URL={server.url}/v1 FIRECRAWL_API_URL={server.url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1 @@
+"""Building blocks for the AI Business Intelligence Streamlit app."""
@@ -0,0 +1,216 @@
+"""Agent construction and the process-wide agent cache.
+
+Streamlit re-executes the UI script on every interaction, but imported modules
+persist for the lifetime of the server process. Agents are therefore built here,
+keyed by a fingerprint of the credentials and model config, and leased out to
+whichever session needs them so that a rerun never constructs a client. Their
+HTTP connections come from the per-key pools in ``launch_intel.http_pool``. agno,
+OpenAI and Firecrawl are imported when the first agent is built, not when the
+UI starts. Idle bundles age out: the least recently used fingerprints beyond
+``MAX_FINGERPRINTS`` are dropped, and so is any bundle idle for longer than
+``BI_AGENT_IDLE_MINUTES``, e.g. one whose keys a session has since replaced.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from textwrap import dedent
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+from .research import RESULTS_PER_QUERY
+from .telemetry import register_gauges
+
+if TYPE_CHECKING:
+    from agno.agent import Agent
+
+    from .firecrawl_tools import CachedFirecrawlTools
+
+DEFAULT_MODEL_ID = "gpt-4o-mini"
+
+# Idle agent bundles kept per fingerprint, and fingerprints kept overall
+MAX_IDLE_BUNDLES = 4
+MAX_FINGERPRINTS = 8
+AGENT_IDLE_SECONDS = float(os.getenv("BI_AGENT_IDLE_MINUTES", "30")) * 60
+
+LAUNCH_ANALYST_DESCRIPTION = dedent("""
+    You are a senior Go-To-Market strategist who evaluates competitor product launches with a critical, evidence-driven lens.
+    
+    Your objective is to uncover:
+    • How the product is positioned in the market
+    • Which launch tactics drove success (strengths)  
+    • Where execution fell short (weaknesses)
+    • Actionable learnings competitors can leverage
+    
+    Always cite observable signals (messaging, pricing actions, channel mix, timing, engagement metrics). Maintain a crisp, executive tone and focus on strategic value.
+    
+    IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
+""")
+
+SENTIMENT_ANALYST_DESCRIPTION = dedent("""
+    You are a market research expert specializing in sentiment analysis and consumer perception tracking.
+    
+    Your expertise includes:
+    • Analyzing social media sentiment and customer feedback
+    • Identifying positive and negative sentiment drivers
+    • Tracking brand perception trends across platforms  
+    • Monitoring customer satisfaction and review patterns
+    • Providing actionable insights on market reception
+    
+    Focus on extracting sentiment signals from social platforms, review sites, forums, and customer feedback channels.
+    
+    IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
+""")
+
+METRICS_ANALYST_DESCRIPTION = dedent("""
+    You are a product launch performance analyst who specializes in tracking and analyzing launch KPIs.
+    
+    Your focus areas include:
+    • User adoption and engagement metrics
+    • Revenue and business performance indicators
+    • Market penetration and growth rates
+    • Press coverage and media attention analysis
+    • Social media traction and viral coefficient tracking
+    • Competitive market share analysis
+    
+    Always provide quantitative insights with context and benchmark against industry standards when possible.
+    
+    IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
+""")
+
+AGENT_SPECS = {
+    "competitor": ("Product Launch Analyst", LAUNCH_ANALYST_DESCRIPTION),
+    "sentiment": ("Market Sentiment Specialist", SENTIMENT_ANALYST_DESCRIPTION),
+    "metrics": ("Launch Metrics Specialist", METRICS_ANALYST_DESCRIPTION),
+}
+
+_lock = threading.Lock()
+# Idle bundles per (fingerprint, with_tools), each with the time it was returned; least recently used first
+_idle: "OrderedDict[Tuple[str, bool], List[Tuple[float, Dict[str, Agent]]]]" = OrderedDict()
+_research_tools: "OrderedDict[str, CachedFirecrawlTools]" = OrderedDict()
+_stats = {"built": 0, "reused": 0, "evicted": 0}
+
+
+def agent_fingerprint(openai_key: str, firecrawl_key: str, model_id: str = DEFAULT_MODEL_ID) -> str:
+    payload = "\x1f".join([openai_key, firecrawl_key, model_id])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_agents(
+    openai_key: str, firecrawl_key: str, model_id: str = DEFAULT_MODEL_ID, with_tools: bool = True
+) -> "Dict[str, Agent]":
+    """Build one agent per analysis; ``with_tools=False`` builds writers that work from a supplied corpus."""
+    from agno.agent import Agent
+
+    from .firecrawl_tools import CachedFirecrawlTools
+    from .http_pool import openai_http_client
+    from .openai_chat import RateLimitedOpenAIChat
+
+    agents = {}
+    for kind, (name, description) in AGENT_SPECS.items():
+        tools = []
+        if with_tools:
+            tools.append(CachedFirecrawlTools(api_key=firecrawl_key, search=True, crawl=True))
+        agents[kind] = Agent(
+            name=name,
+            description=description,
+            model=RateLimitedOpenAIChat(id=model_id, api_key=openai_key, http_client=openai_http_client(openai_key)),
+            tools=tools,
+            show_tool_calls=True,
+            markdown=True,
+            exponential_backoff=True,
+            delay_between_retries=2,
+        )
+    return agents
+
+
+@contextmanager
+def lease_agents(
+    openai_key: str, firecrawl_key: str, model_id: str = DEFAULT_MODEL_ID, with_tools: bool = True
+) -> "Iterator[Dict[str, Agent]]":
+    """Check out an agent bundle for the given credentials, building one only if none is idle.
+
+    agno agents keep per-run state, so a bundle is never shared by two runs at
+    once; concurrent sessions with the same keys each lease their own bundle.
+    """
+    bundle_key = (agent_fingerprint(openai_key, firecrawl_key, model_id), with_tools)
+    with _lock:
+        _expire_idle()
+        bundles = _idle.get(bundle_key)
+        agents = bundles.pop()[1] if bundles else None
+        if agents is not None:
+            _stats["reused"] += 1
+    if agents is None:
+        agents = build_agents(openai_key, firecrawl_key, model_id, with_tools)
+        with _lock:
+            _stats["built"] += 1
+    try:
+        yield agents
+    finally:
+        # agno keeps every run's messages in the agent's memory; a pooled bundle must not carry them
+        for agent in agents.values():
+            if agent.memory is not None:
+                agent.memory.clear()
+        with _lock:
+            bundles = _idle.setdefault(bundle_key, [])
+            _idle.move_to_end(bundle_key)
+            if len(bundles) < MAX_IDLE_BUNDLES:
+                bundles.append((time.monotonic(), agents))
+            while len(_idle) > MAX_FINGERPRINTS:
+                _stats["evicted"] += len(_idle.popitem(last=False)[1])
+
+
+def _expire_idle() -> None:
+    """Drop bundles idle for longer than ``AGENT_IDLE_SECONDS``; the caller holds ``_lock``."""
+    cutoff = time.monotonic() - AGENT_IDLE_SECONDS
+    for bundle_key, bundles in list(_idle.items()):
+        fresh = [bundle for bundle in bundles if bundle[0] >= cutoff]
+        _stats["evicted"] += len(bundles) - len(fresh)
+        if fresh:
+            _idle[bundle_key] = fresh
+        else:
+            del _idle[bundle_key]
+
+
+def research_tools(openai_key: str, firecrawl_key: str, model_id: str = DEFAULT_MODEL_ID) -> "CachedFirecrawlTools":
+    """Shared toolkit for the consolidated research stage; it holds no per-run state."""
+    from .firecrawl_tools import CachedFirecrawlTools
+
+    fingerprint = agent_fingerprint(openai_key, firecrawl_key, model_id)
+    with _lock:
+        tools = _research_tools.get(fingerprint)
+        if tools is None:
+            tools = CachedFirecrawlTools(
+                api_key=firecrawl_key, search=True, limit=RESULTS_PER_QUERY, formats=["markdown"], compact=False
+            )
+            _research_tools[fingerprint] = tools
+        _research_tools.move_to_end(fingerprint)
+        while len(_research_tools) > MAX_FINGERPRINTS:
+            _research_tools.popitem(last=False)
+        return tools
+
+
+def agent_cache_stats() -> Dict[str, int]:
+    with _lock:
+        _expire_idle()
+        return dict(_stats, fingerprints=len(_idle), idle_bundles=sum(len(b) for b in _idle.values()))
+
+
+def _gauges() -> Dict[str, float]:
+    stats = agent_cache_stats()
+    return {
+        "bi_agent_bundles_built_total": stats["built"],
+        "bi_agent_bundles_reused_total": stats["reused"],
+        "bi_agent_bundles_evicted_total": stats["evicted"],
+        "bi_agent_bundles_idle": stats["idle_bundles"],
+    }
+
+
+register_gauges(_gauges, {
+    "bi_agent_bundles_built_total": ("counter", "Analyst agent bundles constructed"),
+    "bi_agent_bundles_reused_total": ("counter", "Analyses that leased an idle agent bundle instead of building one"),
+    "bi_agent_bundles_evicted_total": ("counter", "Idle agent bundles dropped by the LRU cap or the idle timeout"),
+    "bi_agent_bundles_idle": ("gauge", "Agent bundles idle in the pool, ready for the next analysis"),
+})
@@ -0,0 +1,242 @@
+"""Headless batch runs over a CSV of companies.
+
+    python -m launch_intel.batch companies.csv --out reports --workers 4
+
+Every (company, analysis type) pair is a task on one bounded worker pool, so
+``--workers`` is the number of agent runs in flight. Each company gets one
+Markdown file as soon as its last analysis finishes, and a line in the
+checkpoint file; a re-run skips every company already recorded there. The
+shared report cache still applies, so analyses that finished before an
+interrupted run are not paid for twice.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+from dotenv import load_dotenv
+
+from .jobs import MAX_CONCURRENT_JOBS
+from .manifest import last_refresh
+from .packer import last_compaction
+from .pipeline import ANALYSIS_KINDS
+from .report_cache import normalize_company
+from .runner import run_cached_analysis
+from .telemetry import start_metrics_server
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+SUMMARY_FILE = "summary.json"
+# Header cells naming the company column, after case folding and turning punctuation into spaces
+_COMPANY_HEADER = re.compile(r"^(compan(y|ies)( name)?|name)$")
+
+ANALYSIS_TITLES = {
+    "competitor": "Competitor Analysis",
+    "sentiment": "Market Sentiment",
+    "metrics": "Launch Metrics",
+}
+
+
+def read_companies(path: str) -> List[str]:
+    """Company names from the ``company`` (or ``company name``, ``name``) column, else from the first column."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [re.sub(r"[\W_]+", " ", cell.casefold()).strip() for cell in rows[0]]
+    # A "company" column wins over a generic "name" column
+    matches = sorted((not cell.startswith("compan"), i) for i, cell in enumerate(header) if _COMPANY_HEADER.match(cell))
+    column = matches[0][1] if matches else None
+    if column is not None:
+        rows = rows[1:]
+    names, seen = [], set()
+    for row in rows:
+        name = row[column or 0].strip() if len(row) > (column or 0) else ""
+        if name and normalize_company(name) not in seen:
+            seen.add(normalize_company(name))
+            names.append(name)
+    return names
+
+
+def report_filename(company_name: str) -> str:
+    """A readable slug plus a short hash of the name, so "A.B" and "A-B" do not overwrite each other."""
+    company = normalize_company(company_name)
+    slug = re.sub(r"[^a-z0-9]+", "-", company).strip("-")[:60].strip("-") or "company"
+    return f"{slug}-{hashlib.sha256(company.encode('utf-8')).hexdigest()[:8]}.md"
+
+
+def load_checkpoint(out_dir: str) -> Dict[str, dict]:
+    """Finished companies by normalised name; records whose report file is gone do not count."""
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    finished = {}
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A torn last line from an interrupted run
+            if os.path.exists(os.path.join(out_dir, record.get("file", ""))):
+                finished[normalize_company(record["company"])] = record
+    return finished
+
+
+def render_company_report(company_name: str, reports: Dict[str, str]) -> str:
+    sections = [f"# {company_name} - Launch Intelligence", f"_Generated {datetime.now():%Y-%m-%d %H:%M}_"]
+    for kind, report in reports.items():
+        sections.append(f"## {ANALYSIS_TITLES[kind]}\n\n{report.strip()}")
+    return "\n\n".join(sections) + "\n"
+
+
+def run_batch(
+    companies: Sequence[str],
+    out_dir: str,
+    openai_key: str,
+    firecrawl_key: str,
+    kinds: Sequence[str] = ANALYSIS_KINDS,
+    workers: int = MAX_CONCURRENT_JOBS,
+    shared_research: bool = False,
+    force: bool = False,
+) -> dict:
+    """Analyse every company not yet checkpointed and return the run summary."""
+    os.makedirs(out_dir, exist_ok=True)
+    started_at = time.time()
+    finished = {} if force else load_checkpoint(out_dir)
+    skipped = [c for c in companies if normalize_company(c) in finished
+               and set(kinds) <= set(finished[normalize_company(c)]["analyses"])]
+    pending = [c for c in companies if c not in skipped]
+    _log(f"{len(companies)} companies: {len(skipped)} already finished, {len(pending)} to run with {workers} workers")
+
+    results = {company: {} for company in pending}
+    company_started = {}
+    summary = {"companies": {}}
+    lock = threading.Lock()
+
+    def analyse(company: str, kind: str):
+        with lock:
+            company_started.setdefault(company, time.perf_counter())
+        t0 = time.perf_counter()
+        report, from_cache = run_cached_analysis(company, kind, openai_key, firecrawl_key, shared_research, force)
+        if from_cache:
+            return report, from_cache, time.perf_counter() - t0, None, None
+        refreshed = last_refresh(company, kind) if shared_research else None
+        return report, from_cache, time.perf_counter() - t0, last_compaction(company, kind), refreshed
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        futures = {pool.submit(analyse, company, kind): (company, kind) for company in pending for kind in kinds}
+        for future in as_completed(futures):
+            company, kind = futures[future]
+            try:
+                report, from_cache, seconds, packed, refreshed = future.result()
+                results[company][kind] = {"report": report, "cached": from_cache, "seconds": round(seconds, 2)}
+                if packed is not None and packed.tokens_before:
+                    results[company][kind].update(
+                        context_tokens_before=packed.tokens_before, context_tokens_after=packed.tokens_after
+                    )
+                if refreshed is not None:
+                    results[company][kind].update(
+                        fetches_skipped=refreshed.fetches_skipped, fetches_made=refreshed.fetches_made,
+                        bullets_reused=refreshed.bullets_reused, tokens_skipped=refreshed.tokens_skipped,
+                    )
+                _log(f"{company} / {kind}: {'cached' if from_cache else f'{seconds:.1f}s'}")
+            except Exception as e:
+                results[company][kind] = {"error": str(e) or type(e).__name__}
+                _log(f"{company} / {kind}: failed - {results[company][kind]['error']}")
+            if len(results[company]) == len(kinds):
+                summary["companies"][company] = _finish_company(
+                    company, kinds, results.pop(company), time.perf_counter() - company_started[company], out_dir
+                )
+
+    for company in skipped:
+        record = finished[normalize_company(company)]
+        summary["companies"][company] = {"status": "skipped", "file": record["file"]}
+
+    statuses = [entry["status"] for entry in summary["companies"].values()]
+    summary.update({
+        "started_at": datetime.fromtimestamp(started_at).isoformat(timespec="seconds"),
+        "wall_seconds": round(time.time() - started_at, 2),
+        "workers": workers,
+        "analyses": list(kinds),
+        "shared_research": shared_research,
+        "done": statuses.count("done"),
+        "failed": statuses.count("failed"),
+        "skipped": statuses.count("skipped"),
+        # Incremental shared research: source fetches and bullet-extraction prompt tokens not spent again
+        "fetches_skipped": sum(entry.get("fetches_skipped", 0) for entry in summary["companies"].values()),
+        "tokens_skipped": sum(
+            timing.get("tokens_skipped", 0)
+            for entry in summary["companies"].values() for timing in entry.get("analyses", {}).values()
+        ),
+    })
+    with open(os.path.join(out_dir, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def _finish_company(company: str, kinds: Sequence[str], outcome: Dict[str, dict], seconds: float, out_dir: str) -> dict:
+    timings = {kind: {k: v for k, v in outcome[kind].items() if k != "report"} for kind in kinds}
+    if any("error" in outcome[kind] for kind in kinds):
+        return {"status": "failed", "seconds": round(seconds, 2), "analyses": timings}
+    # The analyses of one company share its sources: the first to refresh them decides what to fetch and the
+    # others reuse its work, so the company skipped as many fetches as the analysis that skipped the fewest
+    fetches_skipped = min((timing.get("fetches_skipped", 0) for timing in timings.values()), default=0)
+
+    filename = report_filename(company)
+    with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+        f.write(render_company_report(company, {kind: outcome[kind]["report"] for kind in kinds}))
+    # The checkpoint line is written only after the report file is complete
+    with open(os.path.join(out_dir, CHECKPOINT_FILE), "a", encoding="utf-8") as f:
+        record = {"company": company, "file": filename, "analyses": list(kinds), "finished_at": time.time()}
+        f.write(json.dumps(record) + "\n")
+    return {
+        "status": "done", "file": filename, "seconds": round(seconds, 2), "fetches_skipped": fetches_skipped,
+        "analyses": timings,
+    }
+
+
+def _log(message: str) -> None:
+    print(f"[batch {datetime.now():%H:%M:%S}] {message}", file=sys.stderr, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m launch_intel.batch", description=__doc__.splitlines()[0])
+    parser.add_argument("csv", help="CSV file with a 'company' column (or one company per line)")
+    parser.add_argument("--out", default="reports", help="output directory for reports, checkpoint and summary")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENT_JOBS, help="analyses running at once")
+    parser.add_argument("--analyses", default=",".join(ANALYSIS_KINDS), help="comma-separated subset of: " + ", ".join(ANALYSIS_KINDS))
+    parser.add_argument("--shared-research", action="store_true", help="one research pass per company feeding all analysts")
+    parser.add_argument("--force", action="store_true", help="ignore the checkpoint and the report cache")
+    args = parser.parse_args(argv)
+
+    kinds = [kind.strip() for kind in args.analyses.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in ANALYSIS_KINDS]
+    if unknown or not kinds:
+        parser.error(f"unknown analyses: {', '.join(unknown) or '(none)'}")
+
+    load_dotenv()
+    start_metrics_server()
+    openai_key, firecrawl_key = os.getenv("OPENAI_API_KEY", ""), os.getenv("FIRECRAWL_API_KEY", "")
+    if not openai_key or not firecrawl_key:
+        parser.error("OPENAI_API_KEY and FIRECRAWL_API_KEY must be set (environment or .env)")
+
+    summary = run_batch(
+        read_companies(args.csv), args.out, openai_key, firecrawl_key, kinds,
+        max(1, args.workers), args.shared_research, args.force,
+    )
+    _log(f"done={summary['done']} failed={summary['failed']} skipped={summary['skipped']} "
+         f"(fetches skipped={summary['fetches_skipped']}, tokens skipped={summary['tokens_skipped']}) "
+         f"in {summary['wall_seconds']:.1f}s - summary in {os.path.join(args.out, SUMMARY_FILE)}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
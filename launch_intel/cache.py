@@ -0,0 +1,138 @@
+"""A small SQLite-backed key/value store with TTL expiry and LRU size caps.
+
+SQLite gives us a cache that is shared by every Streamlit session and by every
+worker process on the same machine without running another service. Each call
+opens its own short-lived connection, which keeps the store safe to use from
+any thread. Nothing touches the disk until the first call, so importing a
+module that declares a cache does not create ``BI_CACHE_DIR``.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple, Optional
+
+CACHE_DIR = os.getenv("BI_CACHE_DIR", os.path.join(os.getcwd(), ".bi_cache"))
+
+
+def normalize_company(company_name: str) -> str:
+    """The key every cache, lock and telemetry lookup uses for a company: case and spacing don't matter."""
+    return re.sub(r"\s+", " ", company_name).strip().casefold()
+
+
+@contextmanager
+def sqlite_connection(path: str) -> Iterator[sqlite3.Connection]:
+    """Open a short-lived connection that commits on success and always closes."""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class CacheEntry(NamedTuple):
+    value: bytes
+    created_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.created_at)
+
+
+class SqliteCache:
+    def __init__(
+        self,
+        filename: str,
+        ttl_seconds: float,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        table: str = "entries",
+    ):
+        self.path = os.path.join(CACHE_DIR, filename)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.table = table
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _connect(self):
+        if not self._ready:
+            with self._ready_lock:
+                if not self._ready:
+                    self._create()
+                    self._ready = True
+        return sqlite_connection(self.path)
+
+    def _create(self) -> None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with sqlite_connection(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_lru ON {self.table} (accessed_at)")
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._count("misses")
+                return None
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return CacheEntry(bytes(row[0]), row[1])
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), now, now, len(value)),
+            )
+            self._evict(conn, now)
+        self._count("writes")
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        evicted = conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        if self.max_entries is not None:
+            evicted += conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if self.max_bytes is not None:
+            total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+            for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def usage(self) -> dict:
+        with self._connect() as conn:
+            entries, size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        return {"entries": entries, "bytes": size}
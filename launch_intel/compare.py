@@ -0,0 +1,130 @@
+"""Side-by-side comparison of several competitors from their competitor-analysis bullets.
+
+Each company gets an ordinary competitor analysis job, so the comparison runs
+under the same concurrency limit (or the same external workers) as everything
+else, reuses cached reports and shares Firecrawl fetches with other runs
+through the page cache. The competitor analyst tags its evidence bullets
+``Positioning | Strength | Weakness | Learning``. The matrix is built from
+those bullets, or from the report's sections when it was cached before
+bullets were kept.
+
+Cells come from crawled pages and company names from the user, so both are
+escaped before they reach the ``unsafe_allow_html`` markdown that renders the
+``<br>``-separated cells.
+"""
+
+import html
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from .report_cache import get_cached_bullets, get_cached_report
+
+COMPARE_MAX_COMPANIES = int(os.getenv("BI_COMPARE_MAX_COMPANIES", "8"))
+MATRIX_COLUMNS = {"positioning": "Positioning", "strength": "Strengths", "weakness": "Weaknesses"}
+BULLETS_PER_CELL = 3
+
+_TAGGED = re.compile(
+    r"^\s*(?:[-*•]|\d+[.)])?\s*\**(positioning|strengths?|weakness(?:es)?|learnings?)\**\s*[:|\-–—]\s*(.+)$",
+    re.IGNORECASE,
+)
+_CITATIONS = re.compile(r"\s*\[\d+(?:\s*,\s*\d+)*\]")
+_HEADING = re.compile(r"^#{2,}\s*(?:\d+\.\s*)?(.*)$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+)$")
+
+
+def parse_companies(text: str) -> List[str]:
+    """Company names from comma- or newline-separated input, de-duplicated, in order."""
+    seen, companies = set(), []
+    for name in re.split(r"[,\n]", text):
+        name = " ".join(name.split())
+        if name and name.casefold() not in seen:
+            seen.add(name.casefold())
+            companies.append(name)
+    return companies
+
+
+def _clean(text: str) -> str:
+    return _CITATIONS.sub("", text).replace("**", "").strip()
+
+
+def matrix_from_bullets(bullets: str) -> Dict[str, List[str]]:
+    """Matrix cells from tagged bullets such as ``• Strength: ...``; untagged lines are ignored."""
+    cells: Dict[str, List[str]] = {column: [] for column in MATRIX_COLUMNS}
+    for line in bullets.splitlines():
+        match = _TAGGED.match(line)
+        if match is None:
+            continue
+        tag = match.group(1).lower()
+        column = next((column for column in MATRIX_COLUMNS if tag.startswith(column)), None)
+        if column is not None:
+            cells[column].append(_clean(match.group(2)))
+    return cells
+
+
+def matrix_from_report(report: str) -> Dict[str, List[str]]:
+    """Matrix cells from a competitor report's positioning, strengths and weaknesses sections.
+
+    Takes list items and the first column of table rows; falls back to tagged
+    bullets for reports without those sections.
+    """
+    cells: Dict[str, List[str]] = {column: [] for column in MATRIX_COLUMNS}
+    column = None
+    for line in report.splitlines():
+        heading = _HEADING.match(line.strip())
+        if heading is not None:
+            title = heading.group(1).lower()
+            column = next((column for column in MATRIX_COLUMNS if column in title), None)
+            continue
+        if column is None:
+            continue
+        stripped = line.strip()
+        if stripped.startswith("|"):
+            first = stripped.strip("|").split("|")[0].strip()
+            if first and not set(first) <= set("-: ") and first.lower() not in ("strength", "weakness"):
+                cells[column].append(_clean(first))
+        else:
+            item = _LIST_ITEM.match(stripped)
+            if item is not None:
+                cells[column].append(_clean(item.group(1)))
+    if not any(cells.values()):
+        return matrix_from_bullets(report)
+    return cells
+
+
+def cached_matrix_row(company_name: str, shared_research: bool = False) -> Optional[Dict[str, List[str]]]:
+    """The company's matrix cells from cached bullets or its cached report; None if neither is cached."""
+    bullets = get_cached_bullets(company_name, "competitor", shared_research)
+    if bullets is not None:
+        cells = matrix_from_bullets(bullets.value.decode("utf-8"))
+        if any(cells.values()):
+            return cells
+    report = get_cached_report(company_name, "competitor", shared_research)
+    if report is None:
+        return None
+    return matrix_from_report(report.value.decode("utf-8"))
+
+
+def _escape(text: str) -> str:
+    """Text safe to embed in the HTML-enabled Markdown table: no raw HTML, Markdown links or cell breaks."""
+    return html.escape(text).replace("|", "/").replace("[", "\\[").replace("]", "\\]")
+
+
+def _cell(items: Iterable[str], limit: int) -> str:
+    items = list(items)
+    text = "<br>".join(f"• {_escape(item)}" for item in items[:limit])
+    if len(items) > limit:
+        text += f"<br>*+{len(items) - limit} more*"
+    return text or "–"
+
+
+def render_matrix(rows: Dict[str, Optional[Dict[str, List[str]]]], limit: int = BULLETS_PER_CELL) -> str:
+    """A Markdown table with one row per company; companies still running show as pending."""
+    lines = [
+        "| Company | " + " | ".join(MATRIX_COLUMNS.values()) + " |",
+        "|---" * (len(MATRIX_COLUMNS) + 1) + "|",
+    ]
+    for company, cells in rows.items():
+        values = [_cell(cells[column], limit) for column in MATRIX_COLUMNS] if cells else ["⏳"] * len(MATRIX_COLUMNS)
+        lines.append(f"| **{_escape(company)}** | " + " | ".join(values) + " |")
+    return "\n".join(lines)
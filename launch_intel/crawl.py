@@ -0,0 +1,57 @@
+"""Adaptive polling for Firecrawl crawl jobs.
+
+The SDK's blocking ``crawl`` sleeps a fixed ``poll_interval`` between status
+checks, so a crawl that finishes in 3 seconds still costs a full interval.
+Here a job is started with ``start_crawl`` and checked after short intervals
+that grow geometrically up to a cap, under an overall deadline.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Crawl jobs one ``crawl_websites`` tool call polls side by side, however many URLs the agent passes
+MAX_PARALLEL_CRAWLS = 3
+
+
+@dataclass(frozen=True)
+class PollSchedule:
+    """Intervals between status checks: ``first``, growing by ``factor`` up to ``cap``, until ``deadline``."""
+
+    first: float = 0.5
+    factor: float = 1.5
+    cap: float = float(os.getenv("BI_CRAWL_POLL_MAX_SECONDS", "4"))
+    deadline: float = float(os.getenv("BI_CRAWL_DEADLINE_SECONDS", "180"))
+
+    def intervals(self) -> Iterator[float]:
+        interval = self.first
+        while True:
+            yield interval
+            interval = min(self.cap, interval * self.factor)
+
+
+class CrawlTimeout(TimeoutError):
+    def __init__(self, job_id: str, deadline: float):
+        super().__init__(f"Crawl job {job_id} did not finish within {deadline:.0f}s")
+        self.job_id = job_id
+
+
+def poll_crawl(app, job_id: str, schedule: PollSchedule = PollSchedule()):
+    """Wait for one crawl job and return its final status object."""
+    deadline = time.monotonic() + schedule.deadline
+    for interval in schedule.intervals():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CrawlTimeout(job_id, schedule.deadline)
+        time.sleep(min(interval, remaining))
+        status = app.get_crawl_status(job_id)
+        if status.status in TERMINAL_STATUSES:
+            return status
+    raise AssertionError("unreachable")
+
+
+def crawl(app, url: str, schedule: PollSchedule = PollSchedule(), **params):
+    """Start a crawl and poll it adaptively; a drop-in for the SDK's blocking ``crawl``."""
+    return poll_crawl(app, app.start_crawl(url, **params).id, schedule)
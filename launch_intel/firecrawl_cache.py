@@ -0,0 +1,141 @@
+"""Content-addressed cache underneath every Firecrawl tool call.
+
+All three analysts research the same company, so they routinely issue the same
+searches and crawl the same press pages. Each tool call is keyed by its
+normalised query or URL plus the parameters that change the result; the key
+points at a content hash, and bodies are stored once per hash, so two requests
+that return identical pages share storage. Identical calls made at the same
+time (e.g. pipelines for several companies reaching the same article) share
+one fetch. The agno toolkit built on it lives in ``launch_intel.firecrawl_tools``.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .cache import SqliteCache
+from .ratelimit import call_with_limits, firecrawl_jobs
+from .singleflight import FlightGroup
+from .telemetry import record_tool_call
+
+PAGE_TTL_SECONDS = float(os.getenv("BI_PAGE_TTL_HOURS", "6")) * 3600
+PAGE_CACHE_MAX_BYTES = int(float(os.getenv("BI_PAGE_CACHE_MAX_MB", "200")) * 1024 * 1024)
+PAGE_FOLLOW_TIMEOUT_SECONDS = float(os.getenv("BI_PAGE_FOLLOW_TIMEOUT", "300"))
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref|ref_src)$", re.IGNORECASE)
+
+page_index = SqliteCache("pages.sqlite3", PAGE_TTL_SECONDS, table="page_index")
+page_bodies = SqliteCache("pages.sqlite3", PAGE_TTL_SECONDS, max_bytes=PAGE_CACHE_MAX_BYTES, table="page_bodies")
+
+_stats_lock = threading.Lock()
+_stats = {"calls_made": 0, "calls_saved": 0, "calls_shared": 0, "bytes_fetched": 0, "bytes_saved": 0}
+_page_flights = FlightGroup()
+# Called with (request key, served from cache, seconds) after every tool call, e.g. to attribute prefetch hits
+_call_listeners: List[Callable[[str, bool, float], None]] = []
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def page_cache_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def add_call_listener(listener: Callable[[str, bool, float], None]) -> None:
+    _call_listeners.append(listener)
+
+
+def _notify(request_key: str, cached: bool, seconds: float) -> None:
+    for listener in _call_listeners:
+        listener(request_key, cached, seconds)
+
+
+def _count(**deltas: int) -> None:
+    with _stats_lock:
+        for name, delta in deltas.items():
+            _stats[name] += delta
+
+
+def cached_call(operation: str, target: str, params: Dict[str, Any], fetch: Callable[[], str]) -> str:
+    """Return a cached result for (operation, target, params) or fetch and store it.
+
+    Only cache misses count against the Firecrawl jobs/min budget. Results that
+    look like errors are returned but never cached. A miss for a call already
+    being fetched waits for that fetch (``calls_shared``) instead of repeating it,
+    for up to ``BI_PAGE_FOLLOW_TIMEOUT`` seconds before fetching on its own.
+    """
+    request_key = hashlib.sha256(
+        json.dumps([operation, target, params], sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    started = time.perf_counter()
+    pointer = page_index.get(request_key)
+    if pointer is not None:
+        body = page_bodies.get(pointer.value.decode("ascii"))
+        if body is not None:
+            _count(calls_saved=1, bytes_saved=len(body.value))
+            record_tool_call(operation, time.perf_counter() - started, cached=True)
+            _notify(request_key, True, time.perf_counter() - started)
+            return body.value.decode("utf-8")
+
+    flight, leader = _page_flights.join(request_key)
+    if not leader:
+        try:
+            result = flight.follow(timeout=PAGE_FOLLOW_TIMEOUT_SECONDS)
+        except TimeoutError:
+            # The leading fetch is stuck or was lost; fetch for ourselves rather than wait on it forever
+            return _fetch_and_store(operation, request_key, fetch, started)
+        _count(calls_saved=1, calls_shared=1, bytes_saved=len(result.encode("utf-8")))
+        record_tool_call(operation, time.perf_counter() - started, cached=True)
+        _notify(request_key, True, time.perf_counter() - started)
+        return result
+
+    result, error = None, None
+    try:
+        result = _fetch_and_store(operation, request_key, fetch, started)
+        return result
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _page_flights.land(request_key, flight, result, error)
+
+
+def _fetch_and_store(operation: str, request_key: str, fetch: Callable[[], str], started: float) -> str:
+    try:
+        result = call_with_limits(firecrawl_jobs, fetch)
+    finally:
+        record_tool_call(operation, time.perf_counter() - started, cached=False)
+    encoded = result.encode("utf-8")
+    _count(calls_made=1, bytes_fetched=len(encoded))
+    if not result.startswith("Error"):
+        content_hash = hashlib.sha256(encoded).hexdigest()
+        try:
+            page_bodies.set(content_hash, encoded)
+            page_index.set(request_key, content_hash.encode("ascii"))
+        except (sqlite3.Error, OSError):
+            # An unwritable cache (locked, full disk) only means the next call for this key is a miss
+            pass
+        # Before landing, so listeners see the fetch before anyone it was shared with
+        _notify(request_key, False, time.perf_counter() - started)
+    return result
@@ -0,0 +1,138 @@
+"""The Firecrawl toolkit the analysts and the shared research stage call.
+
+Every search, scrape, crawl and map goes through the page cache in
+``launch_intel.firecrawl_cache``. This is the only module that imports the
+Firecrawl SDK (through agno), so it is loaded on the first analysis rather
+than when the UI starts.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from agno.tools.firecrawl import CustomJSONEncoder, FirecrawlTools, ScrapeOptions
+
+from .crawl import MAX_PARALLEL_CRAWLS, PollSchedule, crawl
+from .firecrawl_cache import cached_call, normalize_query, normalize_url
+from .http_pool import pool_firecrawl_sdk
+from .packer import compact_tool_result
+from .telemetry import bind_context
+
+FIRECRAWL_API_URL = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev")
+
+# The SDK's requests reuse one keep-alive session per API key
+pool_firecrawl_sdk()
+
+
+class CachedFirecrawlTools(FirecrawlTools):
+    """FirecrawlTools whose search, scrape, crawl and map calls go through the shared page cache.
+
+    Crawls are polled adaptively (see ``launch_intel.crawl``) instead of with a
+    fixed ``poll_interval``, and a ``crawl_websites`` tool lets an agent crawl
+    several sites in one call with up to ``MAX_PARALLEL_CRAWLS`` of their jobs
+    polled side by side. Page bodies are cached raw and, with ``compact`` on,
+    packed under the analyst's token budget before they are returned to the
+    model.
+    """
+
+    def __init__(self, *args, poll_schedule: PollSchedule = PollSchedule(), compact: bool = True, **kwargs):
+        kwargs.setdefault("api_url", FIRECRAWL_API_URL)
+        super().__init__(*args, **kwargs)
+        self.poll_schedule = poll_schedule
+        self.compact = compact
+        if "crawl_website" in self.functions:
+            self.register(self.crawl_websites)
+
+    def _params(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        return {"limit": self.limit or limit, "formats": self.formats, "search_params": self.search_params}
+
+    def scrape_website(self, url: str) -> str:
+        """Use this function to scrape a website using Firecrawl.
+
+        Args:
+            url (str): The URL to scrape.
+        """
+        return self._compact(
+            cached_call("scrape", normalize_url(url), self._params(), lambda: super(CachedFirecrawlTools, self).scrape_website(url))
+        )
+
+    def crawl_website(self, url: str, limit: Optional[int] = None) -> str:
+        """Use this function to Crawls a website using Firecrawl.
+
+        Args:
+            url (str): The URL to crawl.
+            limit (int): The maximum number of pages to crawl
+
+        Returns:
+            The results of the crawling.
+        """
+        return self._compact(self._cached_crawl(url, limit))
+
+    def crawl_websites(self, urls: List[str], limit: Optional[int] = None) -> str:
+        """Use this function to crawl several websites at once using Firecrawl.
+
+        Args:
+            urls (List[str]): The URLs to crawl.
+            limit (int): The maximum number of pages to crawl per website
+
+        Returns:
+            A JSON object mapping each URL to its crawl results.
+        """
+        workers = max(1, min(len(urls), MAX_PARALLEL_CRAWLS))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl") as pool:
+            results = list(pool.map(bind_context(lambda url: self._cached_crawl(url, limit)), urls))
+        return self._compact(json.dumps(dict(zip(urls, results))))
+
+    def _compact(self, result: str) -> str:
+        return compact_tool_result(result) if self.compact else result
+
+    def _cached_crawl(self, url: str, limit: Optional[int] = None) -> str:
+        return cached_call("crawl", normalize_url(url), self._params(limit), lambda: self._crawl(url, limit))
+
+    def _crawl(self, url: str, limit: Optional[int] = None) -> str:
+        params: Dict[str, Any] = {}
+        if self.limit or limit:
+            params["limit"] = self.limit or limit
+        if self.formats:
+            params["scrape_options"] = ScrapeOptions(formats=self.formats)
+        crawl_result = crawl(self.app, url, self.poll_schedule, **params)
+        return json.dumps(crawl_result.model_dump(), cls=CustomJSONEncoder)
+
+    def map_website(self, url: str) -> str:
+        """Use this function to Map a website using Firecrawl.
+
+        Args:
+            url (str): The URL to map.
+
+        """
+        return cached_call("map", normalize_url(url), self._params(), lambda: super(CachedFirecrawlTools, self).map_website(url))
+
+    def search(self, query: str, limit: Optional[int] = None):
+        """Use this function to search for the web using Firecrawl.
+
+        Args:
+            query (str): The query to search for.
+            limit (int): The maximum number of results to return.
+        """
+        return self._compact(cached_call(
+            "search", normalize_query(query), self._params(limit), lambda: self._search(query, limit)
+        ))
+
+    def search_links(self, query: str, limit: Optional[int] = None) -> str:
+        """Search without scraping the results: URLs, titles and descriptions only (not exposed to agents)."""
+        return cached_call(
+            "search", normalize_query(query), {**self._params(limit), "formats": None},
+            lambda: self._search(query, limit, scrape=False),
+        )
+
+    def _search(self, query: str, limit: Optional[int] = None, scrape: bool = True) -> str:
+        params: Dict[str, Any] = {}
+        if self.limit or limit:
+            params["limit"] = self.limit or limit
+        if self.formats and scrape:
+            params["scrape_options"] = ScrapeOptions(formats=self.formats)
+        if self.search_params:
+            params.update(self.search_params)
+        search_result = self.app.search(query, **params)
+        return json.dumps(search_result.model_dump(exclude_none=True), cls=CustomJSONEncoder)
@@ -0,0 +1,201 @@
+"""Keep-alive HTTP clients for OpenAI and Firecrawl, one pool per credential.
+
+agno builds a new OpenAI client for every model call and the Firecrawl SDK
+sends each request through a throwaway ``requests`` session, so every call
+used to pay a fresh TCP (and TLS) handshake. Here each API key gets one
+long-lived client whose connections are reused by every agent, job and
+session using that key: an ``httpx.Client`` for OpenAI (HTTP/2 when ``h2`` is
+installed) and a ``requests.Session`` for Firecrawl. Keys never share a
+connection pool, and none are read from or written to the environment.
+
+Connections opened, requests sent and the time spent on handshakes are
+counted per API so the reuse rate and the handshake time saved can be shown.
+httpx and requests are imported when the first client is built.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+HTTP2 = os.getenv("BI_HTTP2", "1").lower() in ("1", "true", "yes") and importlib.util.find_spec("h2") is not None
+# Pools kept per API; matches the agent cache so a pool outlives the agents built with it
+MAX_CREDENTIALS = 8
+FIRECRAWL_POOL_SIZE = 16
+
+_lock = threading.Lock()
+_clients: Dict[str, "OrderedDict[str, Any]"] = {"openai": OrderedDict(), "firecrawl": OrderedDict()}
+_stats = {api: {"requests": 0, "connections": 0, "handshake_seconds": 0.0} for api in _clients}
+
+
+def _count(api: str, requests: int = 0, connections: int = 0, handshake_seconds: float = 0.0) -> None:
+    with _lock:
+        stats = _stats[api]
+        stats["requests"] += requests
+        stats["connections"] += connections
+        stats["handshake_seconds"] += handshake_seconds
+
+
+def _pooled(api: str, credential: str, build):
+    fingerprint = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+    with _lock:
+        clients = _clients[api]
+        client = clients.get(fingerprint)
+        if client is not None:
+            clients.move_to_end(fingerprint)
+            return client
+    client = build()
+    with _lock:
+        clients = _clients[api]
+        # Another thread may have built one meanwhile; keep the first so all callers share it
+        client = clients.setdefault(fingerprint, client)
+        while len(clients) > MAX_CREDENTIALS:
+            # Not closed: agents leased before the eviction may still be using it
+            clients.popitem(last=False)
+    return client
+
+
+# --- OpenAI (httpx) -------------------------------------------------------------
+
+def _trace_handshakes(request) -> None:
+    """httpx request hook: time the TCP connect and TLS handshake if this request opens a connection."""
+    started: Dict[str, float] = {}
+
+    def trace(event_name: str, info: dict) -> None:
+        step, _, phase = event_name.rpartition(".")
+        if step not in ("connection.connect_tcp", "connection.start_tls"):
+            return
+        if phase == "started":
+            started[step] = time.perf_counter()
+        elif phase == "complete" and step in started:
+            _count("openai", connections=int(step == "connection.connect_tcp"),
+                   handshake_seconds=time.perf_counter() - started.pop(step))
+
+    request.extensions["trace"] = trace
+    _count("openai", requests=1)
+
+
+def openai_http_client(openai_key: str):
+    """The shared ``httpx.Client`` for this OpenAI key; pass it to ``OpenAIChat(http_client=...)``."""
+
+    def build():
+        import httpx
+
+        # A plain httpx.Client (agno rejects other types) with the OpenAI SDK's default timeouts and limits
+        return httpx.Client(
+            http2=HTTP2,
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+            follow_redirects=True,
+            event_hooks={"request": [_trace_handshakes]},
+        )
+
+    return _pooled("openai", openai_key, build)
+
+
+# --- Firecrawl (requests) -------------------------------------------------------
+
+def _timed_connection(connection_class):
+    class TimedConnection(connection_class):
+        def connect(self):
+            started = time.perf_counter()
+            super().connect()
+            _count("firecrawl", connections=1, handshake_seconds=time.perf_counter() - started)
+
+    return TimedConnection
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter_class():
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TimedHTTPPool(HTTPConnectionPool):
+        ConnectionCls = _timed_connection(HTTPConnection)
+
+    class TimedHTTPSPool(HTTPSConnectionPool):
+        ConnectionCls = _timed_connection(HTTPSConnection)
+
+    class TimedAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPPool, "https": TimedHTTPSPool}
+
+    return TimedAdapter
+
+
+def firecrawl_session(authorization: str):
+    """The shared ``requests.Session`` for one Firecrawl ``Authorization`` header."""
+
+    def build():
+        import requests
+
+        session = requests.Session()
+        adapter = _adapter_class()(pool_connections=4, pool_maxsize=FIRECRAWL_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    return _pooled("firecrawl", authorization, build)
+
+
+class _PooledRequests:
+    """Takes the place of ``requests`` inside the Firecrawl SDK's HTTP client.
+
+    The SDK calls ``requests.post(url, headers=..., ...)``; those calls are
+    sent through the session for the request's ``Authorization`` header
+    instead, so each Firecrawl key keeps its own warm connections.
+    """
+
+    def __init__(self, requests_module):
+        self._requests = requests_module
+
+    def __getattr__(self, name: str):
+        return getattr(self._requests, name)
+
+    def _send(self, method: str, url: str, **kwargs):
+        _count("firecrawl", requests=1)
+        authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+        return firecrawl_session(authorization).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self._send("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self._send("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        return self._send("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self._send("DELETE", url, **kwargs)
+
+
+def pool_firecrawl_sdk() -> bool:
+    """Route the Firecrawl SDK's requests through the per-key sessions; False if this SDK version has no hook."""
+    try:
+        from firecrawl.v2.utils import http_client
+    except ImportError:
+        return False
+    with _lock:
+        if not isinstance(http_client.requests, _PooledRequests):
+            http_client.requests = _PooledRequests(http_client.requests)
+    return True
+
+
+def connection_stats() -> Dict[str, Dict[str, float]]:
+    """Per API: requests, connections opened, reuse rate and the handshake time reuse saved."""
+    with _lock:
+        stats = {api: dict(values) for api, values in _stats.items()}
+    for values in stats.values():
+        reused = max(0, values["requests"] - values["connections"])
+        per_handshake = values["handshake_seconds"] / values["connections"] if values["connections"] else 0.0
+        values["reuse_rate"] = reused / values["requests"] if values["requests"] else 0.0
+        values["handshake_ms"] = per_handshake * 1000
+        values["seconds_saved"] = reused * per_handshake
+    return stats
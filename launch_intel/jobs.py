@@ -0,0 +1,412 @@
+"""Background analysis jobs that outlive Streamlit reruns, reloads and disconnects.
+
+An analysis is submitted as a (company, analysis type) job to a process-wide
+worker pool. Status, streamed partial text and the final report are persisted
+in SQLite, so the UI only needs a job ID to reattach after a rerun or a page
+reload. Each job is tagged with the process that runs it, which heartbeats its
+jobs; when several app processes share ``BI_CACHE_DIR``, only the jobs of a
+process that stopped heartbeating (or of an earlier process with the same
+PID) are failed as interrupted. The pool size is the server-side cap on
+concurrent agent runs. A job for a report that is already being produced,
+whether found at submission or when the job comes off the queue, follows
+that run instead of taking a pool slot: one shared thread streams every
+followed run into its jobs, and no follower ever starts a run of its own.
+
+With ``BI_EXTERNAL_WORKERS`` the app only queues jobs, and separate worker
+processes (``python -m launch_intel.worker``) claim them from the same SQLite
+file. Claims are atomic, and workers heartbeat their jobs so that a job left
+behind by a dead worker is failed rather than left running forever.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional
+
+from .cache import CACHE_DIR, sqlite_connection
+from .report_cache import report_key
+from .runner import run_cached_analysis
+from .singleflight import Flight, analysis_flights
+from .streaming import StreamBuffer
+from .telemetry import Trace, record_trace
+
+MAX_CONCURRENT_JOBS = int(os.getenv("BI_MAX_CONCURRENT_JOBS", "4"))
+JOB_RETENTION_SECONDS = float(os.getenv("BI_JOB_RETENTION_HOURS", "24")) * 3600
+EXTERNAL_WORKERS = os.getenv("BI_EXTERNAL_WORKERS", "").lower() in ("1", "true", "yes")
+PARTIAL_WRITE_INTERVAL = 0.5
+# A worker that has not heartbeat for this long is considered gone, and so are its running jobs
+WORKER_LEASE_SECONDS = 30
+HEARTBEAT_SECONDS = WORKER_LEASE_SECONDS / 6
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_COLUMNS = (
+    "id", "company_name", "kind", "shared_research", "status", "partial", "result", "error",
+    "ttft", "created_at", "started_at", "finished_at", "force", "worker",
+)
+# Added after the first release; created on databases that predate them
+_LATER_COLUMNS = {
+    "force": "INTEGER NOT NULL DEFAULT 0", "report_key": "TEXT", "worker": "TEXT", "heartbeat_at": "REAL", "owner": "TEXT",
+}
+
+
+def _process_id() -> str:
+    """Host, boot and PID of this process; a PID is only reused by a later process on the same boot."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id", encoding="ascii") as f:
+            boot = f.read().strip()[:8]
+    except OSError:
+        boot = ""
+    return f"{socket.gethostname()}-{boot}-{os.getpid()}"
+
+
+class Job(NamedTuple):
+    id: str
+    company_name: str
+    kind: str
+    shared_research: bool
+    status: str
+    partial: Optional[str]
+    result: Optional[str]
+    error: Optional[str]
+    ttft: Optional[float]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    force: bool = False
+    # The worker process running it, in external mode
+    worker: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+
+@dataclass
+class _Follower:
+    """A job served by another run's flight; ``seen`` counts the deltas already streamed into it."""
+
+    job_id: str
+    company_name: str
+    kind: str
+    flight: Flight
+    buffer: StreamBuffer
+    started: float = field(default_factory=time.perf_counter)
+    seen: int = 0
+
+
+class JobManager:
+    def __init__(
+        self,
+        max_workers: int = MAX_CONCURRENT_JOBS,
+        filename: str = "jobs.sqlite3",
+        external: bool = EXTERNAL_WORKERS,
+    ):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = os.path.join(CACHE_DIR, filename)
+        self.max_workers = max_workers
+        self.external = external
+        # Set on jobs this process runs itself; jobs queued for external workers have no owner
+        self.owner = None if external else _process_id()
+        self._pool = None if external else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._stopped = threading.Event()
+        self._followers: List[_Follower] = []
+        self._followers_changed = threading.Condition()
+        self._follower_thread: Optional[threading.Thread] = None
+        with sqlite_connection(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, company_name TEXT NOT NULL, kind TEXT NOT NULL,"
+                " shared_research INTEGER NOT NULL, status TEXT NOT NULL, partial TEXT, result TEXT, error TEXT,"
+                " ttft REAL, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in _LATER_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS workers ("
+                " id TEXT PRIMARY KEY, threads INTEGER NOT NULL, started_at REAL NOT NULL, heartbeat_at REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM jobs WHERE created_at < ?", (time.time() - JOB_RETENTION_SECONDS,))
+            conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (time.time() - JOB_RETENTION_SECONDS,))
+        if not external:
+            self._recover()
+            threading.Thread(target=self._heartbeat_jobs, name="job-heartbeat", daemon=True).start()
+
+    def submit(
+        self,
+        company_name: str,
+        kind: str,
+        openai_key: str,
+        firecrawl_key: str,
+        shared_research: bool = False,
+        force: bool = False,
+    ) -> str:
+        """Queue an analysis and return its job ID; in external mode the keys are ignored (workers use their own)."""
+        job_id = uuid.uuid4().hex[:12]
+        key = report_key(company_name, kind, shared_research)
+        now = time.time()
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, company_name, kind, shared_research, status, created_at, force, report_key,"
+                " owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, company_name, kind, int(shared_research), QUEUED, now, int(force), key, self.owner, now),
+            )
+        if self.external:
+            return job_id
+        # Joined now, so the follower is served by that run even if it lands before the follower thread looks
+        flight = analysis_flights.follow_existing(key)
+        if flight is not None:
+            self._follow(job_id, company_name, kind, flight)
+        else:
+            # Credentials only live in this closure; they are never written to disk
+            self._pool.submit(
+                self._dequeue, job_id, company_name, kind, openai_key, firecrawl_key, shared_research, force
+            )
+        return job_id
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop heartbeating and accepting in-process jobs; with ``wait``, let the running ones finish first."""
+        self._stopped.set()
+        with self._followers_changed:
+            self._followers_changed.notify_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with sqlite_connection(self.path) as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = Job(*row)
+        return job._replace(shared_research=bool(job.shared_research), force=bool(job.force))
+
+    def stats(self) -> Dict[str, int]:
+        """Queued and running jobs and the concurrency limit; in external mode, the live workers' combined threads."""
+        with sqlite_connection(self.path) as conn:
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE status IN (?, ?) GROUP BY status", (QUEUED, RUNNING)
+            ).fetchall())
+            workers, threads = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(threads), 0) FROM workers WHERE heartbeat_at >= ?",
+                (time.time() - WORKER_LEASE_SECONDS,),
+            ).fetchone()
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "limit": threads if self.external else self.max_workers,
+            "workers": workers,
+        }
+
+    def _update(self, job_id: str, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with sqlite_connection(self.path) as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    # --- In-process jobs ----------------------------------------------------------
+
+    def _recover(self) -> int:
+        """Fail in-process jobs whose process is gone: an earlier one with this PID, or one that stopped heartbeating."""
+        now = time.time()
+        with sqlite_connection(self.path) as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?"
+                " WHERE status IN (?, ?) AND owner IS NOT NULL AND (owner = ? OR COALESCE(heartbeat_at, 0) < ?)",
+                (FAILED, "Interrupted by a server restart", now, QUEUED, RUNNING, self.owner, now - WORKER_LEASE_SECONDS),
+            ).rowcount
+
+    def _heartbeat_jobs(self) -> None:
+        while not self._stopped.wait(HEARTBEAT_SECONDS):
+            now = time.time()
+            with sqlite_connection(self.path) as conn:
+                conn.execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                    (now, self.owner, QUEUED, RUNNING),
+                )
+                # Jobs of another app process sharing this database that stopped
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?"
+                    " WHERE status IN (?, ?) AND owner IS NOT NULL AND owner != ? AND heartbeat_at < ?",
+                    (FAILED, "Interrupted by a server restart", now, QUEUED, RUNNING, self.owner,
+                     now - WORKER_LEASE_SECONDS),
+                )
+
+    def _dequeue(
+        self,
+        job_id: str,
+        company_name: str,
+        kind: str,
+        openai_key: str,
+        firecrawl_key: str,
+        shared_research: bool,
+        force: bool,
+    ) -> None:
+        """Run a job that reached a pool slot, unless its report went into flight while it was queued."""
+        flight = analysis_flights.follow_existing(report_key(company_name, kind, shared_research))
+        if flight is not None:
+            self._follow(job_id, company_name, kind, flight)
+        else:
+            self._run(job_id, company_name, kind, openai_key, firecrawl_key, shared_research, force)
+
+    def _follow(self, job_id: str, company_name: str, kind: str, flight: Flight) -> None:
+        """Hand a job to the shared follower thread, which serves it from ``flight``."""
+        job = self.get(job_id)
+        if job is None:
+            return
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        buffer = StreamBuffer(time.perf_counter() - (time.time() - job.created_at))
+        with self._followers_changed:
+            self._followers.append(_Follower(job_id, company_name, kind, flight, buffer))
+            if self._follower_thread is None:
+                self._follower_thread = threading.Thread(target=self._serve_followers, name="job-followers", daemon=True)
+                self._follower_thread.start()
+        flight.add_listener(self._wake_followers)
+
+    def _wake_followers(self) -> None:
+        with self._followers_changed:
+            self._followers_changed.notify()
+
+    def _serve_followers(self) -> None:
+        """Stream each followed flight's new text into its job and finish the job once the flight lands."""
+        while not self._stopped.is_set():
+            with self._followers_changed:
+                self._followers_changed.wait(PARTIAL_WRITE_INTERVAL)
+                followers = list(self._followers)
+            landed = []
+            for follower in followers:
+                try:
+                    if self._serve_follower(follower):
+                        landed.append(follower)
+                except Exception:
+                    pass  # e.g. SQLite busy; the next pass writes the same text again
+            if landed:
+                with self._followers_changed:
+                    self._followers = [f for f in self._followers if f not in landed]
+
+    def _serve_follower(self, follower: _Follower) -> bool:
+        text, follower.seen, landed = follower.flight.progress(follower.seen)
+        if text:
+            follower.buffer.append(text)
+        if not landed:
+            partial = follower.buffer.pending_render(PARTIAL_WRITE_INTERVAL)
+            if partial is not None:
+                self._update(follower.job_id, partial=partial)
+            return False
+        seconds = time.perf_counter() - follower.started
+        error = follower.flight.error
+        message = None if error is None else str(error) or type(error).__name__
+        if error is None:
+            outcome = {"status": DONE, "result": follower.flight.result, "partial": None,
+                       "ttft": follower.buffer.ttft_seconds}
+        else:
+            outcome = {"status": FAILED, "error": message}
+        self._update(follower.job_id, finished_at=time.time(), **outcome)
+        record_trace(Trace(follower.company_name, follower.kind, started_at=time.time() - seconds, seconds=seconds,
+                           coalesced=True, error=message))
+        return True
+
+    # --- External workers ---------------------------------------------------------
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Atomically take the oldest queued job for ``worker``.
+
+        A job whose report another worker is already producing is left queued
+        until that run finishes. A normal job is then served from the report
+        cache; a ``force`` job runs the analysis again.
+        """
+        now = time.time()
+        with sqlite_connection(self.path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs AS queued WHERE status = ? AND owner IS NULL AND NOT EXISTS ("
+                " SELECT 1 FROM jobs AS running WHERE running.status = ? AND running.report_key = queued.report_key)"
+                " ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now, row[0]),
+            )
+        return self.get(row[0])
+
+    def heartbeat(self, worker: str, threads: int) -> int:
+        """Renew ``worker``'s lease on itself and its jobs; fail jobs of workers whose lease ran out. Returns those."""
+        now = time.time()
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "INSERT INTO workers (id, threads, started_at, heartbeat_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE SET threads = excluded.threads, heartbeat_at = excluded.heartbeat_at",
+                (worker, threads, now, now),
+            )
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status = ?", (now, worker, RUNNING))
+            return conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?"
+                " WHERE status = ? AND worker IS NOT NULL AND heartbeat_at < ?",
+                (FAILED, "Interrupted: its analysis worker stopped", now, RUNNING, now - WORKER_LEASE_SECONDS),
+            ).rowcount
+
+    def retire(self, worker: str) -> None:
+        with sqlite_connection(self.path) as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker,))
+
+    def run(self, job: Job, openai_key: str, firecrawl_key: str) -> None:
+        """Run a claimed job to completion in this process."""
+        self._run(job.id, job.company_name, job.kind, openai_key, firecrawl_key, job.shared_research, job.force)
+
+    def _run(
+        self,
+        job_id: str,
+        company_name: str,
+        kind: str,
+        openai_key: str,
+        firecrawl_key: str,
+        shared_research: bool,
+        force: bool,
+    ) -> None:
+        job = self.get(job_id)
+        if job is None:
+            return  # Purged (or deleted) while it was queued; there is nobody to report to
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        # Time to first token is measured from submission, which is what the user waits on
+        buffer = StreamBuffer(time.perf_counter() - (time.time() - job.created_at))
+
+        def persist_partial(delta: str) -> None:
+            buffer.append(delta)
+            partial = buffer.pending_render(PARTIAL_WRITE_INTERVAL)
+            if partial is not None:
+                self._update(job_id, partial=partial)
+
+        # Anything that escapes below, even a BaseException, still leaves the job failed rather than running
+        outcome = {"status": FAILED, "error": "Interrupted before it finished"}
+        try:
+            # Another session may have produced this report while the job was queued
+            report, _ = run_cached_analysis(
+                company_name, kind, openai_key, firecrawl_key, shared_research, force, on_delta=persist_partial
+            )
+            outcome = {"status": DONE, "result": report, "partial": None, "ttft": buffer.ttft_seconds}
+        except Exception as e:
+            outcome["error"] = str(e) or type(e).__name__
+        finally:
+            self._update(job_id, finished_at=time.time(), **outcome)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def job_manager() -> JobManager:
+    """The process-wide job manager, created on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
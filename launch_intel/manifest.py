@@ -0,0 +1,290 @@
+"""Per-company source manifest for incremental re-analysis.
+
+Every page the shared research stage reads is recorded per company with a
+stable reference number, its content hash, the ETag/Last-Modified validators
+its origin sent and when it was fetched. A refresh asks each known origin
+whether the page changed with a conditional request and only scrapes pages
+that are new or changed. The bullets each analyst extracted are stored with
+the hashes of the sources they were written from, so bullet extraction only
+re-runs over evidence that actually changed.
+"""
+
+import hashlib
+import ipaddress
+import json
+import os
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .cache import CACHE_DIR, normalize_company, sqlite_connection
+from .profiling import LOG_TIMINGS
+
+MANIFEST_TTL_SECONDS = float(os.getenv("BI_MANIFEST_TTL_DAYS", "30")) * 86400
+SOURCE_CHECK_TIMEOUT = float(os.getenv("BI_SOURCE_CHECK_TIMEOUT", "5"))
+# A source checked this recently (e.g. by a concurrent job for another analysis) is not asked again
+RECHECK_SECONDS = 600
+# Redirects a source check follows; every hop must pass the same public-address check
+MAX_SOURCE_REDIRECTS = 3
+
+_CITATION = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]")
+_BULLET_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+class SourceRecord(NamedTuple):
+    url: str
+    ref: int
+    title: str
+    content: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    checked_at: float
+
+
+class OriginCheck(NamedTuple):
+    unchanged: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class Bullet(NamedTuple):
+    text: str
+    refs: Tuple[int, ...]
+
+
+class StoredBullets(NamedTuple):
+    bullets: List[Bullet]
+    sources: Dict[int, str]  # ref -> content hash the bullets were written from
+    updated_at: float
+
+
+@dataclass
+class Refresh:
+    """What one analysis run reused from its previous run instead of fetching or extracting again."""
+
+    company_name: str
+    kind: str
+    fetches_made: int = 0
+    fetches_skipped: int = 0
+    sources_changed: int = 0
+    bullets_reused: int = 0
+    bullets_extracted: int = 0
+    tokens_skipped: int = 0
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def is_public_http_url(url: str) -> bool:
+    """An http(s) URL whose host resolves only to public addresses (no loopback, private or link-local ones).
+
+    Source URLs come from search results and from the model, and the check runs
+    from the server, so it must not be pointed at the server's own network.
+    """
+    try:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return False
+        addresses = socket.getaddrinfo(parts.hostname, parts.port or 80, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError, UnicodeError):
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(info[4][0].split("%")[0]).is_global for info in addresses)
+
+
+class _PublicRedirects(urllib.request.HTTPRedirectHandler):
+    max_redirections = MAX_SOURCE_REDIRECTS
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not is_public_http_url(newurl):
+            raise urllib.error.HTTPError(newurl, code, "Redirect to a non-public address", headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_PublicRedirects)
+
+
+def check_origin(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> OriginCheck:
+    """Conditional HEAD request; ``unchanged`` only when the origin confirms the validators still match.
+
+    Only public http(s) origins are asked; anything else counts as changed and is scraped through Firecrawl.
+    """
+    if not is_public_http_url(url):
+        return OriginCheck(False, None, None)
+    request = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "launch-intel/1.0"})
+    if etag:
+        request.add_header("If-None-Match", etag)
+    if last_modified:
+        request.add_header("If-Modified-Since", last_modified)
+    try:
+        with _opener.open(request, timeout=SOURCE_CHECK_TIMEOUT) as response:
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return OriginCheck(True, e.headers.get("ETag") or etag, e.headers.get("Last-Modified") or last_modified)
+        return OriginCheck(False, None, None)
+    except (OSError, ValueError):
+        return OriginCheck(False, None, None)
+    new_etag, new_modified = headers.get("ETag"), headers.get("Last-Modified")
+    # Some servers ignore conditional headers but still send the same validators
+    unchanged = bool((etag and new_etag == etag) or (not etag and last_modified and new_modified == last_modified))
+    return OriginCheck(unchanged, new_etag, new_modified)
+
+
+def parse_bullets(text: str) -> List[Bullet]:
+    """One bullet per non-heading line, with the numbered sources it cites."""
+    bullets = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        refs = tuple(sorted({int(n) for group in _CITATION.findall(stripped) for n in group.split(",")}))
+        bullets.append(Bullet(_BULLET_MARKER.sub("• ", stripped, count=1), refs))
+    return bullets
+
+
+def plan_bullets(stored: Optional[StoredBullets], sources: Sequence) -> Tuple[List[Bullet], List]:
+    """Split into (stored bullets still backed by unchanged sources, sources that need extraction).
+
+    ``sources`` need ``ref`` and ``content_hash``. Bullets citing a changed or
+    vanished source are dropped; uncited bullets survive only if nothing changed.
+    """
+    if stored is None:
+        return [], list(sources)
+    changed = [s for s in sources if stored.sources.get(s.ref) != s.content_hash]
+    current = {s.ref for s in sources}
+    removed = set(stored.sources) - current
+    if not changed and not removed:
+        return list(stored.bullets), []
+    if not any(bullet.refs for bullet in stored.bullets):
+        return [], list(sources)  # Without citations there is no telling which bullets are stale
+    unchanged = current - {s.ref for s in changed}
+    kept = [bullet for bullet in stored.bullets if bullet.refs and set(bullet.refs) <= unchanged]
+    return kept, changed
+
+
+class SourceManifest:
+    def __init__(self, filename: str = "manifest.sqlite3"):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = os.path.join(CACHE_DIR, filename)
+        with sqlite_connection(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                " company TEXT NOT NULL, url TEXT NOT NULL, ref INTEGER NOT NULL, title TEXT NOT NULL,"
+                " content TEXT NOT NULL, content_hash TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+                " fetched_at REAL NOT NULL, checked_at REAL NOT NULL, PRIMARY KEY (company, url))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bullets ("
+                " company TEXT NOT NULL, kind TEXT NOT NULL, version TEXT NOT NULL, bullets TEXT NOT NULL,"
+                " sources TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (company, kind, version))"
+            )
+            cutoff = time.time() - MANIFEST_TTL_SECONDS
+            conn.execute("DELETE FROM sources WHERE fetched_at < ?", (cutoff,))
+            conn.execute("DELETE FROM bullets WHERE updated_at < ?", (cutoff,))
+
+    def sources(self, company_name: str) -> Dict[str, SourceRecord]:
+        """Known sources for a company by normalised URL, refetched ones after the manifest TTL."""
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(SourceRecord._fields)} FROM sources WHERE company = ? AND fetched_at >= ?",
+                (normalize_company(company_name), time.time() - MANIFEST_TTL_SECONDS),
+            ).fetchall()
+        return {row[0]: SourceRecord(*row) for row in rows}
+
+    def record(
+        self, company_name: str, url: str, title: str, content: str, etag: Optional[str],
+        last_modified: Optional[str], fetched: bool,
+    ) -> SourceRecord:
+        """Upsert one source, keeping its reference number; ``fetched`` is False when only re-validated."""
+        company, now = normalize_company(company_name), time.time()
+        digest = content_hash(content)
+        with sqlite_connection(self.path) as conn:
+            row = conn.execute(
+                "SELECT ref, fetched_at FROM sources WHERE company = ? AND url = ?", (company, url)
+            ).fetchone()
+            if row is None:
+                ref = conn.execute(
+                    "SELECT COALESCE(MAX(ref), 0) + 1 FROM sources WHERE company = ?", (company,)
+                ).fetchone()[0]
+                fetched_at = now
+            else:
+                ref, fetched_at = row[0], now if fetched else row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO sources (company, url, ref, title, content, content_hash, etag, last_modified,"
+                " fetched_at, checked_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (company, url, ref, title, content, digest, etag, last_modified, fetched_at, now),
+            )
+        return SourceRecord(url, ref, title, content, digest, etag, last_modified, fetched_at, now)
+
+    def set_validators(self, company_name: str, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "UPDATE sources SET etag = ?, last_modified = ? WHERE company = ? AND url = ?",
+                (etag, last_modified, normalize_company(company_name), url),
+            )
+
+    def bullets(self, company_name: str, kind: str, version: str) -> Optional[StoredBullets]:
+        with sqlite_connection(self.path) as conn:
+            row = conn.execute(
+                "SELECT bullets, sources, updated_at FROM bullets WHERE company = ? AND kind = ? AND version = ?"
+                " AND updated_at >= ?",
+                (normalize_company(company_name), kind, version, time.time() - MANIFEST_TTL_SECONDS),
+            ).fetchone()
+        if row is None:
+            return None
+        bullets = [Bullet(text, tuple(refs)) for text, refs in json.loads(row[0])]
+        return StoredBullets(bullets, {int(ref): digest for ref, digest in json.loads(row[1]).items()}, row[2])
+
+    def store_bullets(
+        self, company_name: str, kind: str, version: str, bullets: Iterable[Bullet], sources: Dict[int, str]
+    ) -> None:
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO bullets (company, kind, version, bullets, sources, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_company(company_name), kind, version, json.dumps([list(b) for b in bullets]),
+                 json.dumps(sources), time.time()),
+            )
+
+
+_manifest: Optional[SourceManifest] = None
+_manifest_lock = threading.Lock()
+_latest: Dict[Tuple[str, str], Refresh] = {}
+_latest_lock = threading.Lock()
+
+
+def source_manifest() -> SourceManifest:
+    """The process-wide source manifest, created on first use."""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = SourceManifest()
+        return _manifest
+
+
+def record_refresh(refresh: Refresh) -> None:
+    with _latest_lock:
+        _latest[(normalize_company(refresh.company_name), refresh.kind)] = refresh
+    if LOG_TIMINGS:
+        print(
+            f"[refresh] {refresh.company_name} / {refresh.kind}: {refresh.fetches_skipped} fetches skipped, "
+            f"{refresh.fetches_made} made; {refresh.bullets_reused} bullets reused, "
+            f"{refresh.bullets_extracted} extracted; {refresh.tokens_skipped} tokens skipped",
+            flush=True,
+        )
+
+
+def last_refresh(company_name: str, kind: str) -> Optional[Refresh]:
+    """The most recent shared-research run's reuse for this company and analysis type in this process."""
+    with _latest_lock:
+        return _latest.get((normalize_company(company_name), kind))
@@ -0,0 +1,59 @@
+"""The OpenAI chat model every agent is built with.
+
+It draws from the shared request and token buckets in ``launch_intel.ratelimit``
+before each call and reports usage to telemetry. Kept apart from the buckets so
+importing them (as the UI does for its status line) does not load agno and the
+OpenAI SDK.
+"""
+
+import itertools
+
+from agno.models.openai import OpenAIChat
+
+from .ratelimit import call_with_limits, estimate_tokens, openai_requests, openai_tokens
+from .telemetry import record_model_call
+
+
+class RateLimitedOpenAIChat(OpenAIChat):
+    """OpenAIChat that draws from the shared request and token buckets before every call."""
+
+    def _reserve(self, messages) -> int:
+        estimate = estimate_tokens(messages, self.max_completion_tokens or self.max_tokens)
+        openai_tokens.acquire(estimate)
+        return estimate
+
+    def invoke(self, messages, *args, **kwargs):
+        estimate = self._reserve(messages)
+        try:
+            response = call_with_limits(openai_requests, lambda: super(RateLimitedOpenAIChat, self).invoke(messages, *args, **kwargs))
+        except Exception:
+            openai_tokens.adjust(-estimate)
+            raise
+        self._record_usage(getattr(response, "usage", None), estimate)
+        return response
+
+    def invoke_stream(self, messages, *args, **kwargs):
+        estimate = self._reserve(messages)
+
+        def open_stream():
+            # The request is only sent on the first next(), and a 429 can only arrive then
+            stream = super(RateLimitedOpenAIChat, self).invoke_stream(messages, *args, **kwargs)
+            return stream, next(stream, None)
+
+        try:
+            stream, first = call_with_limits(openai_requests, open_stream)
+        except Exception:
+            openai_tokens.adjust(-estimate)
+            raise
+        if first is None:
+            return
+        for chunk in itertools.chain([first], stream):
+            self._record_usage(getattr(chunk, "usage", None), estimate)
+            yield chunk
+
+    @staticmethod
+    def _record_usage(usage, estimate: int) -> None:
+        if usage is not None:
+            openai_tokens.adjust(usage.total_tokens - estimate)
+            details = getattr(usage, "prompt_tokens_details", None)
+            record_model_call(usage.prompt_tokens, usage.completion_tokens, getattr(details, "cached_tokens", 0) or 0)
@@ -0,0 +1,262 @@
+"""Token-budgeted compaction of crawled content before it reaches a model.
+
+Firecrawl returns whole pages: navigation, cookie banners, repeated footers
+and long marketing copy. Before page text is handed to an analyst it is
+stripped of that boilerplate, split into passages, scored for relevance to the
+company and the analysis type, and packed greedily under a token budget.
+Tokens before and after are recorded for every analysis run.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .cache import normalize_company
+from .profiling import LOG_TIMINGS
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("BI_CONTEXT_TOKENS", "6000"))
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv("BI_TOOL_RESULT_TOKENS", "2500"))
+MAX_PASSAGE_TOKENS = 200
+
+KIND_TERMS = {
+    "competitor": (
+        "launch", "launched", "announce", "release", "feature", "pricing", "price", "plan", "competitor",
+        "position", "differentiat", "market", "strategy", "channel", "partner", "customer", "enterprise",
+    ),
+    "sentiment": (
+        "review", "rating", "customer", "user", "feedback", "love", "hate", "complain", "praise", "criticis",
+        "frustrat", "reddit", "twitter", "community", "reaction", "sentiment", "trust", "bug", "issue",
+    ),
+    "metrics": (
+        "users", "revenue", "growth", "adoption", "download", "install", "subscriber", "arr", "mrr",
+        "million", "billion", "percent", "%", "quarter", "retention", "share", "traffic", "waitlist",
+    ),
+}
+
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_BARE_URL = re.compile(r"<?https?://\S+>?")
+# Whole lines (punctuation folded away) that are navigation, banners or share widgets, never evidence
+_BOILERPLATE_LINE = re.compile(
+    r"^(sign (in|up)|log ?(in|out)|subscribe( to (our|the) newsletter)?|newsletter|share (this( \w+)?|on \w+)"
+    r"|accept( all)?( cookies)?|reject all|cookie (policy|settings|preferences)|privacy policy|terms of (service|use)"
+    r"|back to top|skip to (main )?content|follow us( on \w+)?|related (posts|articles)|read more|learn more"
+    r"|menu|search|home|close)$"
+)
+# Banner phrases that mark a short line as site furniture wherever they appear in it
+_BANNER = re.compile(r"\bwe use cookies\b|\ball rights reserved\b|©|\bcopyright \d{4}\b", re.IGNORECASE)
+# Breadcrumb separators; pipes are left alone so table rows survive
+_CRUMB_SEPARATOR = re.compile(r"\s+[>/»›·•]\s+")
+# Roughly four characters per token for English text; good enough for budgeting
+_CHARS_PER_TOKEN = 4
+
+# The analysis run whose tool results and corpus are being compacted on this thread
+_current_run: ContextVar[Optional["Compaction"]] = ContextVar("compaction_run", default=None)
+_latest: Dict[Tuple[str, str], "Compaction"] = {}
+_latest_lock = threading.Lock()
+_totals = {"runs": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+@dataclass
+class Compaction:
+    company_name: str
+    kind: str
+    tokens_before: int = 0
+    tokens_after: int = 0
+    passages_kept: int = 0
+    passages_dropped: int = 0
+
+    @property
+    def saved_ratio(self) -> float:
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+
+def count_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def _is_nav_fragment(line: str) -> bool:
+    """Menu entries and breadcrumbs: lines made only of short links, or of short items between separators."""
+    rest = _LINK.sub("", line).strip(" \t|*-_>·•/»›")
+    if not rest and _LINK.search(line):
+        return all(len(label.split()) <= 3 for label in _LINK.findall(line))
+    segments = _CRUMB_SEPARATOR.split(line.strip(" \t|*-_>"))
+    return len(segments) > 1 and all(len(s.split()) <= 3 and not re.search(r"\d", s) for s in segments)
+
+
+def strip_boilerplate(text: str, seen_lines: Optional[Set[str]] = None) -> str:
+    """Drop images, link targets, navigation, banners and (across pages sharing ``seen_lines``) repeated lines."""
+    seen_lines = set() if seen_lines is None else seen_lines
+    kept = []
+    for line in _IMAGE.sub("", text).splitlines():
+        if not line.lstrip().startswith("#") and _is_nav_fragment(line):
+            continue
+        line = _BARE_URL.sub("", _LINK.sub(r"\1", line))
+        stripped = line.strip(" \t|*-_>")
+        if not stripped:
+            kept.append("")
+            continue
+        key = re.sub(r"\W+", " ", stripped).strip().casefold()
+        if _BOILERPLATE_LINE.match(key) or (len(stripped) < 200 and _BANNER.search(stripped)):
+            continue
+        if len(key) > 20:
+            if key in seen_lines:
+                continue
+            seen_lines.add(key)
+        kept.append(line.rstrip())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def split_passages(text: str) -> List[str]:
+    """Paragraphs with headings attached to the text below them, long ones cut at sentence ends."""
+    passages, heading = [], ""
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("#") and "\n" not in block:
+            heading = f"{heading}\n{block}".strip() if heading else block
+            continue
+        block, heading = f"{heading}\n{block}".strip(), ""
+        if count_tokens(block) <= MAX_PASSAGE_TOKENS:
+            passages.append(block)
+            continue
+        chunk = ""
+        for sentence in re.split(r"(?<=[.!?])\s+", block):
+            if chunk and count_tokens(chunk) + count_tokens(sentence) > MAX_PASSAGE_TOKENS:
+                passages.append(chunk)
+                chunk = ""
+            chunk = f"{chunk} {sentence}".strip()
+        if chunk:
+            passages.append(chunk)
+    return passages
+
+
+def score_passage(passage: str, company_name: str, kind: Optional[str], position: int = 0) -> float:
+    """Relevance per token: company mentions weigh most, then analysis terms and figures; earlier is better."""
+    lowered = passage.casefold()
+    company_terms = [term for term in re.findall(r"\w+", company_name.casefold()) if len(term) > 1]
+    hits = 3.0 * sum(lowered.count(term) for term in company_terms)
+    hits += sum(lowered.count(term) for term in KIND_TERMS.get(kind, ()))
+    hits += 0.5 * min(5, len(re.findall(r"\d[\d,.]*\s?(%|k|m|b|million|billion)?", lowered)))
+    return (hits + 0.5) / math.sqrt(count_tokens(passage)) + 0.2 / (1 + position)
+
+
+def pack(
+    documents: Sequence[str], budget: int, company_name: str = "", kind: Optional[str] = None, record: bool = True
+) -> Tuple[List[str], Compaction]:
+    """Compact each document so that together they fit ``budget`` tokens, keeping the best passages.
+
+    Returns one (possibly empty) string per document, with kept passages in
+    their original order, plus the before/after token counts, which are charged
+    to the active compaction run unless ``record`` is off.
+    """
+    stats = Compaction(company_name, kind or "")
+    seen_lines: Set[str] = set()
+    candidates = []
+    for doc_index, document in enumerate(documents):
+        stats.tokens_before += count_tokens(document)
+        for position, passage in enumerate(split_passages(strip_boilerplate(document, seen_lines))):
+            score = score_passage(passage, company_name, kind, position)
+            candidates.append((score, doc_index, position, passage))
+
+    chosen, used = [], 0
+    for candidate in sorted(candidates, key=lambda c: c[0], reverse=True):
+        cost = count_tokens(candidate[3])
+        if used + cost <= budget:
+            chosen.append(candidate)
+            used += cost
+    stats.passages_kept = len(chosen)
+    stats.passages_dropped = len(candidates) - len(chosen)
+    stats.tokens_after = used
+
+    packed = [[] for _ in documents]
+    for _, doc_index, _, passage in sorted(chosen, key=lambda c: (c[1], c[2])):
+        packed[doc_index].append(passage)
+    if record:
+        _charge(stats)
+    return ["\n\n".join(passages) for passages in packed], stats
+
+
+_HEAVY_FIELDS = ("html", "rawHtml", "raw_html", "links", "screenshot", "images")
+
+
+def compact_tool_result(raw: str, budget: int = TOOL_RESULT_TOKEN_BUDGET) -> str:
+    """Compact the page bodies inside a Firecrawl tool result (JSON) under one shared budget."""
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return raw  # Error strings and other plain text pass through untouched
+    run = _current_run.get()
+    pages = []
+
+    def collect(node):
+        if isinstance(node, dict):
+            if isinstance(node.get("markdown"), str):
+                for field_name in _HEAVY_FIELDS:
+                    node.pop(field_name, None)
+                pages.append(node)
+            for value in node.values():
+                collect(value)
+        elif isinstance(node, list):
+            for item in node:
+                collect(item)
+
+    collect(data)
+    if pages:
+        bodies, _ = pack(
+            [page["markdown"] for page in pages], budget,
+            run.company_name if run else "", run.kind if run else None,
+        )
+        for page, body in zip(pages, bodies):
+            page["markdown"] = body
+    return json.dumps(data)
+
+
+@contextmanager
+def compaction_run(company_name: str, kind: str) -> Iterator[Compaction]:
+    """Attribute every compaction on this thread to one analysis run and record its totals."""
+    run = Compaction(company_name, kind)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        with _latest_lock:
+            _latest[(normalize_company(company_name), kind)] = run
+            if run.tokens_before:
+                _totals["runs"] += 1
+                _totals["tokens_before"] += run.tokens_before
+                _totals["tokens_after"] += run.tokens_after
+        if LOG_TIMINGS and run.tokens_before:
+            print(
+                f"[context] {company_name} / {kind}: {run.tokens_before} -> {run.tokens_after} tokens "
+                f"({run.saved_ratio:.0%} saved, {run.passages_dropped} passages dropped)",
+                flush=True,
+            )
+
+
+def _charge(stats: Compaction) -> None:
+    run = _current_run.get()
+    if run is not None:
+        run.tokens_before += stats.tokens_before
+        run.tokens_after += stats.tokens_after
+        run.passages_kept += stats.passages_kept
+        run.passages_dropped += stats.passages_dropped
+
+
+def last_compaction(company_name: str, kind: str) -> Optional[Compaction]:
+    """The most recent run's compaction for this company and analysis type in this process."""
+    with _latest_lock:
+        return _latest.get((normalize_company(company_name), kind))
+
+
+def compaction_summary() -> Dict[str, int]:
+    with _latest_lock:
+        return dict(_totals)
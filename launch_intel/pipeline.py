@@ -0,0 +1,165 @@
+"""Prompt assembly and the two-stage bullets -> report pipeline behind each analyst.
+
+Every analysis first asks its agent for short evidence bullets (the step that
+uses Firecrawl) and then expands those bullets into a Markdown report. The
+prompt text lives in ``launch_intel.prompts``. Nothing here touches Streamlit,
+so pipelines can run on worker threads.
+"""
+
+import hashlib
+from typing import Callable, Optional
+
+from .agents import AGENT_SPECS, DEFAULT_MODEL_ID
+from .manifest import Refresh, parse_bullets, plan_bullets, record_refresh, source_manifest
+from .packer import compaction_run, count_tokens
+from .prompts import BULLET_TEMPLATES, CHANGED_SOURCES_INSTRUCTIONS, CORPUS_INSTRUCTIONS, REPORT_TEMPLATES
+from .research import RESEARCH_QUERIES, ResearchCorpus
+from .telemetry import stage
+
+ANALYSIS_KINDS = ("competitor", "sentiment", "metrics")
+
+
+def prompt_version(kind: str, shared_research: bool = False, model_id: str = DEFAULT_MODEL_ID) -> str:
+    """Hash of everything that shapes a report, so editing any prompt invalidates cached reports."""
+    parts = [AGENT_SPECS[kind][1], BULLET_TEMPLATES[kind].text, REPORT_TEMPLATES[kind].text, model_id]
+    if shared_research:
+        parts += [CORPUS_INSTRUCTIONS.text, CHANGED_SOURCES_INSTRUCTIONS.text, *RESEARCH_QUERIES.values()]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def response_text(resp) -> str:
+    return resp.content if hasattr(resp, "content") else str(resp)
+
+
+def run_agent(agent, prompt: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """Run one agent turn, streaming content deltas to ``on_delta`` when given.
+
+    ``stream`` is always passed explicitly: agno remembers ``stream=True`` on the
+    agent after a streamed run, and cached agents are reused across runs.
+    """
+    if on_delta is None:
+        return response_text(agent.run(prompt, stream=False))
+    from agno.run.response import RunEvent  # agno is only loaded once an analysis runs
+
+    parts = []
+    for event in agent.run(prompt, stream=True):
+        delta = getattr(event, "content", None)
+        if getattr(event, "event", None) == RunEvent.run_response_content.value and isinstance(delta, str) and delta:
+            parts.append(delta)
+            on_delta(delta)
+    return "".join(parts)
+
+
+def competitor_bullets_prompt(company_name: str) -> str:
+    return BULLET_TEMPLATES["competitor"].render(company_name=company_name)
+
+
+def sentiment_bullets_prompt(company_name: str) -> str:
+    return BULLET_TEMPLATES["sentiment"].render(company_name=company_name)
+
+
+def metrics_bullets_prompt(company_name: str) -> str:
+    return BULLET_TEMPLATES["metrics"].render(company_name=company_name)
+
+
+def expand_competitor_report(
+    agent, bullet_text: str, competitor: str, on_delta: Optional[Callable[[str], None]] = None
+) -> str:
+    prompt = REPORT_TEMPLATES["competitor"].render(competitor=competitor, bullet_text=bullet_text)
+    return run_agent(agent, prompt, on_delta)
+
+
+def expand_sentiment_report(
+    agent, bullet_text: str, competitor: str, on_delta: Optional[Callable[[str], None]] = None
+) -> str:
+    prompt = REPORT_TEMPLATES["sentiment"].render(competitor=competitor, bullet_text=bullet_text)
+    return run_agent(agent, prompt, on_delta)
+
+
+def expand_metrics_report(
+    agent, bullet_text: str, competitor: str, on_delta: Optional[Callable[[str], None]] = None
+) -> str:
+    prompt = REPORT_TEMPLATES["metrics"].render(competitor=competitor, bullet_text=bullet_text)
+    return run_agent(agent, prompt, on_delta)
+
+
+BULLET_PROMPTS = {
+    "competitor": competitor_bullets_prompt,
+    "sentiment": sentiment_bullets_prompt,
+    "metrics": metrics_bullets_prompt,
+}
+
+EXPAND_REPORTS = {
+    "competitor": expand_competitor_report,
+    "sentiment": expand_sentiment_report,
+    "metrics": expand_metrics_report,
+}
+
+
+def corpus_bullets(agent, kind: str, company_name: str, corpus: ResearchCorpus) -> str:
+    """Bullets written from a shared corpus, extracting only from sources that changed since the stored ones.
+
+    A corpus whose sources have no manifest references is always extracted
+    in full.
+    """
+    template = BULLET_TEMPLATES[kind]
+    sources = corpus.relevant(kind)
+    if not sources or any(source.ref is None for source in sources):
+        return run_agent(agent, template.then(CORPUS_INSTRUCTIONS).render(
+            company_name=company_name, corpus=corpus.render(sources, kind)
+        ))
+
+    manifest = source_manifest()
+    version = prompt_version(kind, shared_research=True)
+    kept, changed = plan_bullets(manifest.bullets(company_name, kind, version), sources)
+    refresh = Refresh(
+        company_name, kind, fetches_made=corpus.fetches_made, fetches_skipped=corpus.fetches_skipped,
+        sources_changed=len(changed), bullets_reused=len(kept),
+    )
+    full_prompt_tokens = 0
+    if len(changed) < len(sources):
+        full_prompt_tokens = count_tokens(template.then(CORPUS_INSTRUCTIONS).render(
+            company_name=company_name, corpus=corpus.render(sources, kind, record=False)
+        ))
+    new = []
+    if changed:
+        prompt = template.then(CHANGED_SOURCES_INSTRUCTIONS if kept else CORPUS_INSTRUCTIONS).render(
+            company_name=company_name, corpus=corpus.render(changed, kind)
+        )
+        new = parse_bullets(run_agent(agent, prompt))
+        if full_prompt_tokens:
+            full_prompt_tokens -= count_tokens(prompt)
+    refresh.bullets_extracted = len(new)
+    refresh.tokens_skipped = max(0, full_prompt_tokens)
+    bullets = kept + new
+    manifest.store_bullets(company_name, kind, version, bullets, {source.ref: source.content_hash for source in sources})
+    record_refresh(refresh)
+    return "\n".join(bullet.text for bullet in bullets)
+
+
+def run_analysis(
+    agent,
+    kind: str,
+    company_name: str,
+    corpus: Optional[ResearchCorpus] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+    on_bullets: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Run bullets then expand.
+
+    With a shared ``corpus`` the bullets come from it instead of the web, and
+    only its changed sources are extracted again. With ``on_delta`` the report
+    stage streams its Markdown as it is generated; ``on_bullets`` receives the
+    bullets before they are expanded. Crawled content is compacted under the
+    analyst's token budget on the way in.
+    """
+    with stage("bullets"), compaction_run(company_name, kind):
+        if corpus is not None:
+            bullets = corpus_bullets(agent, kind, company_name, corpus)
+        else:
+            bullets = run_agent(agent, BULLET_PROMPTS[kind](company_name))
+    if on_bullets is not None:
+        on_bullets(bullets)
+    with stage("expand"):
+        return EXPAND_REPORTS[kind](agent, bullets, company_name, on_delta)
+
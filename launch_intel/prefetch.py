@@ -0,0 +1,173 @@
+"""Speculative research prefetch while the user is still looking at the company name.
+
+With prefetch on, entering a company schedules the shared research stage's
+searches for it in the background. A request only starts after the name has
+been left alone for ``BI_PREFETCH_DEBOUNCE_SECONDS``. A newer name from the
+same session cancels the older prefetch, and at most
+``BI_PREFETCH_MAX_ACTIVE`` run at once. Results land in the Firecrawl page
+cache, so the analysis that follows starts with warm research.
+
+Every search a prefetch paid for is tracked for ``BI_PREFETCH_TTL_SECONDS``.
+It counts as a hit when a real analysis is served it from the cache, and as
+wasted (with its Firecrawl time) when nothing used it before then.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, NamedTuple, Optional
+
+from .firecrawl_cache import add_call_listener
+from .report_cache import normalize_company
+
+PREFETCH_ENABLED = os.getenv("BI_PREFETCH", "").lower() in ("1", "true", "yes")
+PREFETCH_DEBOUNCE_SECONDS = float(os.getenv("BI_PREFETCH_DEBOUNCE_SECONDS", "0.8"))
+PREFETCH_TTL_SECONDS = float(os.getenv("BI_PREFETCH_TTL_SECONDS", "600"))
+PREFETCH_MAX_ACTIVE = int(os.getenv("BI_PREFETCH_MAX_ACTIVE", "2"))
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = "pending", "running", "done", "cancelled", "failed"
+
+
+@dataclass
+class PrefetchTask:
+    company_name: str
+    status: str = PENDING
+    searches: int = 0
+    created_at: float = field(default_factory=time.time)
+    cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def company(self) -> str:
+        return normalize_company(self.company_name)
+
+
+class _Prefetched(NamedTuple):
+    task: PrefetchTask
+    seconds: float
+    expires_at: float
+
+
+_current_task: ContextVar[Optional[PrefetchTask]] = ContextVar("prefetch_task", default=None)
+
+
+class Prefetcher:
+    def __init__(
+        self,
+        max_active: int = PREFETCH_MAX_ACTIVE,
+        debounce_seconds: float = PREFETCH_DEBOUNCE_SECONDS,
+        ttl_seconds: float = PREFETCH_TTL_SECONDS,
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.ttl_seconds = ttl_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_active, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._slots: Dict[str, PrefetchTask] = {}
+        self._prefetched: Dict[str, _Prefetched] = {}
+        self.stats = {
+            "scheduled": 0, "started": 0, "cancelled": 0, "calls_made": 0,
+            "calls_used": 0, "calls_wasted": 0, "seconds_used": 0.0, "seconds_wasted": 0.0,
+        }
+        add_call_listener(self._on_call)
+
+    def schedule(self, slot: str, company_name: str, openai_key: str, firecrawl_key: str) -> PrefetchTask:
+        """Prefetch research for ``company_name`` on behalf of ``slot`` (e.g. a session), replacing its last request."""
+        task = PrefetchTask(company_name)
+        with self._lock:
+            current = self._slots.get(slot)
+            if current is not None and current.company == task.company and current.status != CANCELLED:
+                return current
+            self._cancel(current)
+            self._slots[slot] = task
+            self.stats["scheduled"] += 1
+        # Credentials only live in this closure, as for analysis jobs
+        timer = threading.Timer(self.debounce_seconds, self._start, args=(task, openai_key, firecrawl_key))
+        timer.daemon = True
+        timer.start()
+        return task
+
+    def cancel(self, slot: str) -> None:
+        with self._lock:
+            self._cancel(self._slots.pop(slot, None))
+
+    def _cancel(self, task: Optional[PrefetchTask]) -> None:
+        if task is not None and task.status in (PENDING, RUNNING):
+            task.cancelled.set()
+            task.status = CANCELLED
+            self.stats["cancelled"] += 1
+
+    def _start(self, task: PrefetchTask, openai_key: str, firecrawl_key: str) -> None:
+        if not task.cancelled.is_set():
+            self._pool.submit(self._run, task, openai_key, firecrawl_key)
+
+    def _run(self, task: PrefetchTask, openai_key: str, firecrawl_key: str) -> None:
+        if task.cancelled.is_set():
+            return
+        from .agents import research_tools
+        from .research import prefetch_research
+
+        with self._lock:
+            task.status = RUNNING
+            self.stats["started"] += 1
+        token = _current_task.set(task)
+        try:
+            task.searches = prefetch_research(
+                research_tools(openai_key, firecrawl_key), task.company_name, task.cancelled
+            )
+        except Exception:
+            task.status = FAILED  # A failed prefetch only means the analysis researches as usual
+        finally:
+            _current_task.reset(token)
+        with self._lock:
+            if task.status == RUNNING:
+                task.status = DONE
+
+    def _on_call(self, request_key: str, cached: bool, seconds: float) -> None:
+        task = _current_task.get()
+        with self._lock:
+            if task is not None:
+                if not cached:
+                    self._prefetched[request_key] = _Prefetched(task, seconds, time.time() + self.ttl_seconds)
+                    self.stats["calls_made"] += 1
+                return
+            entry = self._prefetched.pop(request_key, None)
+            if entry is None:
+                return
+            # A miss means the page cache dropped the prefetched result before it was needed
+            outcome = "used" if cached else "wasted"
+            self.stats[f"calls_{outcome}"] += 1
+            self.stats[f"seconds_{outcome}"] += entry.seconds
+
+    def _expire(self, now: float) -> None:
+        for request_key in [key for key, entry in self._prefetched.items() if entry.expires_at <= now]:
+            entry = self._prefetched.pop(request_key)
+            self.stats["calls_wasted"] += 1
+            self.stats["seconds_wasted"] += entry.seconds
+
+    def status(self, slot: str) -> Optional[PrefetchTask]:
+        with self._lock:
+            return self._slots.get(slot)
+
+    def summary(self) -> dict:
+        """Counters plus the hit rate over prefetched searches that were either used or expired."""
+        with self._lock:
+            self._expire(time.time())
+            stats = dict(self.stats, outstanding=len(self._prefetched))
+        resolved = stats["calls_used"] + stats["calls_wasted"]
+        stats["hit_rate"] = stats["calls_used"] / resolved if resolved else 0.0
+        return stats
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def prefetcher() -> Prefetcher:
+    """The process-wide prefetcher, created on first use."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        return _prefetcher
@@ -0,0 +1,45 @@
+"""Lightweight timing helpers for what users feel: rerun latency and time to first token."""
+
+import os
+import statistics
+from typing import Dict, MutableMapping, Optional
+
+RERUN_WINDOW = 50
+LOG_TIMINGS = os.getenv("BI_LOG_TIMINGS", "").lower() in ("1", "true", "yes")
+
+
+def record_rerun(session_state: MutableMapping, seconds: float, fragment: Optional[str] = None) -> None:
+    """Record a full script rerun, or with ``fragment`` a rerun of just that fragment."""
+    samples = session_state.setdefault("_fragment_rerun_samples" if fragment else "_rerun_samples", [])
+    samples.append(seconds)
+    del samples[:-RERUN_WINDOW]
+    if LOG_TIMINGS:
+        print(f"[rerun] {fragment or 'app'} {seconds * 1000:.1f} ms", flush=True)
+
+
+def rerun_summary(session_state: MutableMapping, fragments: bool = False) -> Dict[str, float]:
+    samples = session_state.get("_fragment_rerun_samples" if fragments else "_rerun_samples") or []
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "last_ms": samples[-1] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "count": len(samples),
+    }
+
+
+def record_ttft(session_state: MutableMapping, kind: str, seconds: float) -> None:
+    samples = session_state.setdefault("_ttft_samples", [])
+    samples.append(seconds)
+    del samples[:-RERUN_WINDOW]
+    if LOG_TIMINGS:
+        print(f"[ttft] {kind} first token after {seconds:.2f} s", flush=True)
+
+
+def ttft_summary(session_state: MutableMapping) -> Dict[str, float]:
+    samples = session_state.get("_ttft_samples") or []
+    if not samples:
+        return {}
+    return {"last_s": samples[-1], "median_s": statistics.median(samples), "count": len(samples)}
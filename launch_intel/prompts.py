@@ -0,0 +1,113 @@
+"""Prompt text for the analysts' two stages and for shared-research extraction.
+
+OpenAI caches the longest previously seen prefix of a request, so each
+template is split into a static ``prefix`` -- the instructions and format
+specification, byte-identical for every company -- and a ``tail`` holding
+what varies. Bullet tails take ``{company_name}``; report tails take
+``{competitor}`` and ``{bullet_text}``; the corpus instructions are joined to
+a bullet template with ``then`` and take ``{corpus}``. Every template feeds
+``prompt_version``, so editing one retires the reports it produced.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    prefix: str
+    tail: str
+
+    def __post_init__(self):
+        if "{" in self.prefix or "}" in self.prefix:
+            raise ValueError("a prompt prefix must be static; move placeholders into the tail")
+
+    def render(self, **fields: str) -> str:
+        return self.prefix + self.tail.format(**fields)
+
+    def then(self, other: "PromptTemplate") -> "PromptTemplate":
+        """This template followed by ``other``, with both static prefixes ahead of both tails."""
+        return PromptTemplate(self.prefix + other.prefix, self.tail + other.tail)
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.tail
+
+
+COMPANY_TAIL = "Company: {company_name}"
+BULLETS_TAIL = "Company: {competitor}\n\n=== SOURCE BULLETS ===\n{bullet_text}"
+CORPUS_TAIL = "\n\n=== RESEARCH CORPUS ===\n{corpus}"
+
+COMPETITOR_BULLETS_TEMPLATE = PromptTemplate(
+    "Generate up to 16 evidence-based insight bullets about the most recent product launches of the company below.\n"
+    "Format requirements:\n"
+    "• Start every bullet with exactly one tag: Positioning | Strength | Weakness | Learning\n"
+    "• Follow the tag with a concise statement (max 30 words) referencing concrete observations: messaging, differentiation, pricing, channel selection, timing, engagement metrics, or customer feedback.\n\n",
+    COMPANY_TAIL,
+)
+
+SENTIMENT_BULLETS_TEMPLATE = PromptTemplate(
+    "Analyze market sentiment for the company below across social media, reviews, and customer feedback channels. "
+    "Provide specific sentiment signals, positive/negative drivers, and actionable insights.\n\n",
+    COMPANY_TAIL,
+)
+
+METRICS_BULLETS_TEMPLATE = PromptTemplate(
+    "Track and analyze launch performance metrics for the company below. "
+    "Focus on adoption rates, engagement metrics, press coverage, and competitive benchmarks.\n\n",
+    COMPANY_TAIL,
+)
+
+COMPETITOR_REPORT_TEMPLATE = PromptTemplate(
+    "Transform the insight bullets below into a professional launch review for product managers analysing the company below.\n\n"
+    "Produce well-structured **Markdown** with a mix of tables, call-outs and concise bullet points --- avoid long paragraphs.\n\n"
+    "=== FORMAT SPECIFICATION ===\n"
+    "# <Company> -- Launch Review\n\n"
+    "## 1. Market & Product Positioning\n"
+    "• Bullet point summary of how the product is positioned (max 6 bullets).\n\n"
+    "## 2. Launch Strengths\n"
+    "| Strength | Evidence / Rationale |\n|---|---|\n| ... | ... | (add 4-6 rows)\n\n"
+    "## 3. Launch Weaknesses\n"
+    "| Weakness | Evidence / Rationale |\n|---|---|\n| ... | ... | (add 4-6 rows)\n\n"
+    "## 4. Strategic Takeaways for Competitors\n"
+    "1. ... (max 5 numbered recommendations)\n\n"
+    "Guidelines:\n"
+    "• Write the company's name in place of <Company>.\n"
+    "• Populate the tables with specific points derived from the bullets.\n"
+    "• Only include rows that contain meaningful data; omit any blank entries.\n\n",
+    BULLETS_TAIL,
+)
+
+SENTIMENT_REPORT_TEMPLATE = PromptTemplate(
+    "Transform the sentiment bullets below into a comprehensive market sentiment report for the company below.\n\n"
+    "Create well-structured **Markdown** with tables, metrics, and clear insights.\n\n",
+    BULLETS_TAIL,
+)
+
+METRICS_REPORT_TEMPLATE = PromptTemplate(
+    "Transform the metrics bullets below into a detailed launch performance report for the company below.\n\n"
+    "Create well-structured **Markdown** with KPI tables, trend analysis, and benchmarks.\n\n",
+    BULLETS_TAIL,
+)
+
+CORPUS_INSTRUCTIONS = PromptTemplate(
+    "Base every bullet only on the research corpus below. Do not browse; cite the numbered sources you rely on.\n\n",
+    CORPUS_TAIL,
+)
+
+CHANGED_SOURCES_INSTRUCTIONS = PromptTemplate(
+    "Bullets from earlier research are kept for every source not listed here. The sources below are new or have "
+    "changed since then: write bullets only for what they say, base every bullet only on them and cite their numbers.\n\n",
+    CORPUS_TAIL,
+)
+
+BULLET_TEMPLATES = {
+    "competitor": COMPETITOR_BULLETS_TEMPLATE,
+    "sentiment": SENTIMENT_BULLETS_TEMPLATE,
+    "metrics": METRICS_BULLETS_TEMPLATE,
+}
+
+REPORT_TEMPLATES = {
+    "competitor": COMPETITOR_REPORT_TEMPLATE,
+    "sentiment": SENTIMENT_REPORT_TEMPLATE,
+    "metrics": METRICS_REPORT_TEMPLATE,
+}
@@ -0,0 +1,153 @@
+"""Process-wide token buckets in front of OpenAI and Firecrawl.
+
+Every agent, analyst and session in the process draws from the same buckets:
+OpenAI requests/min and tokens/min, and Firecrawl jobs/min. Callers wait for
+capacity *before* sending, instead of collecting 429s and sleeping afterwards.
+When a provider still answers 429, its Retry-After header pauses the whole
+bucket, so every caller backs off together rather than retrying in a herd.
+"""
+
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, TypeVar
+
+from .telemetry import record_retry
+
+OPENAI_RPM = float(os.getenv("BI_OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("BI_OPENAI_TPM", "200000"))
+FIRECRAWL_JOBS_PER_MIN = float(os.getenv("BI_FIRECRAWL_JOBS_PER_MIN", "60"))
+MAX_RATE_LIMIT_RETRIES = 4
+DEFAULT_RETRY_AFTER = 5.0
+# Completion tokens we reserve when the request does not cap them; reconciled with real usage afterwards
+DEFAULT_COMPLETION_TOKENS = 1_024
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """A blocking token bucket refilled continuously at ``per_minute`` tokens per minute.
+
+    A rate of 0 disables the bucket. Usage reported after the fact can push the
+    level below zero, which simply makes the next callers wait longer.
+    """
+
+    def __init__(self, name: str, per_minute: float):
+        self.name = name
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self._level = per_minute
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = 0
+        self._stats = {"acquired": 0, "waits": 0, "wait_seconds": 0.0, "last_wait": 0.0, "retry_after": 0}
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """Block until ``amount`` tokens are available; returns the seconds waited."""
+        if self.per_minute <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self._paused_until and self._level >= amount:
+                        self._level -= amount
+                        break
+                    shortfall = max(0.0, amount - self._level) * 60 / self.per_minute
+                    self._cond.wait(max(self._paused_until - now, shortfall, 0.01))
+            finally:
+                self._waiting -= 1
+            waited = time.monotonic() - started
+            self._stats["acquired"] += 1
+            self._stats["last_wait"] = waited
+            if waited > 0.01:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+        return waited
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) tokens once the real cost is known."""
+        if self.per_minute <= 0 or not amount:
+            return
+        with self._cond:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level - amount)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds``, e.g. from a provider's Retry-After."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["retry_after"] += 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {"waiting": self._waiting, "limit_per_min": self.per_minute, **self._stats}
+
+
+openai_requests = TokenBucket("openai_requests", OPENAI_RPM)
+openai_tokens = TokenBucket("openai_tokens", OPENAI_TPM)
+firecrawl_jobs = TokenBucket("firecrawl_jobs", FIRECRAWL_JOBS_PER_MIN)
+BUCKETS = (openai_requests, openai_tokens, firecrawl_jobs)
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    return {bucket.name: bucket.stats() for bucket in BUCKETS}
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Seconds from ``retry-after-ms`` / ``Retry-After`` (delta or HTTP date), if the response has them."""
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _rate_limit_error(exc: BaseException) -> Optional[BaseException]:
+    """The 429 behind ``exc``, preferring the SDK error that still carries the HTTP response."""
+    for error in (exc.__cause__, exc):
+        response = getattr(error, "response", None)
+        if getattr(error, "status_code", None) == 429 or getattr(response, "status_code", None) == 429:
+            return error
+    return None
+
+
+def call_with_limits(bucket: TokenBucket, fetch: Callable[[], T], amount: float = 1) -> T:
+    """Run ``fetch`` under ``bucket``, retrying 429s after pausing for the provider's Retry-After."""
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        bucket.acquire(amount)
+        try:
+            return fetch()
+        except Exception as e:
+            error = _rate_limit_error(e)
+            if error is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            record_retry()
+            bucket.pause(retry_after_seconds(getattr(error, "response", None)) or DEFAULT_RETRY_AFTER * 2**attempt)
+    raise AssertionError("unreachable")
+
+
+def estimate_tokens(messages, max_completion: Optional[int]) -> int:
+    """Rough prompt size (about four characters per token) plus the completion allowance."""
+    chars = sum(len(str(m.content or "")) for m in messages)
+    return chars // 4 + (max_completion or DEFAULT_COMPLETION_TOKENS)
@@ -0,0 +1,55 @@
+"""Finished reports shared across sessions and worker processes.
+
+Entries are keyed by (company, analysis type, prompt version), so a report
+produced five minutes ago in another browser session is served instantly, and
+any edit to a prompt template quietly retires every report it produced.
+The evidence bullets each report was written from are kept under the same
+key, so views that summarise many companies (the comparison matrix) can read
+them without parsing reports.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from .cache import CacheEntry, SqliteCache, normalize_company  # noqa: F401 (re-exported)
+from .pipeline import prompt_version
+
+REPORT_TTL_SECONDS = float(os.getenv("BI_REPORT_TTL_HOURS", "24")) * 3600
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("BI_REPORT_CACHE_MAX_ENTRIES", "500"))
+
+report_cache = SqliteCache("reports.sqlite3", REPORT_TTL_SECONDS, max_entries=REPORT_CACHE_MAX_ENTRIES)
+bullet_cache = SqliteCache("reports.sqlite3", REPORT_TTL_SECONDS, max_entries=REPORT_CACHE_MAX_ENTRIES, table="bullets")
+
+
+def report_key(company_name: str, kind: str, shared_research: bool = False) -> str:
+    raw = "\x1f".join([normalize_company(company_name), kind, prompt_version(kind, shared_research)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_report(company_name: str, kind: str, shared_research: bool = False) -> Optional[CacheEntry]:
+    return report_cache.get(report_key(company_name, kind, shared_research))
+
+
+def store_report(company_name: str, kind: str, report: str, shared_research: bool = False) -> None:
+    report_cache.set(report_key(company_name, kind, shared_research), report.encode("utf-8"))
+
+
+def get_cached_bullets(company_name: str, kind: str, shared_research: bool = False) -> Optional[CacheEntry]:
+    return bullet_cache.get(report_key(company_name, kind, shared_research))
+
+
+def store_bullets(company_name: str, kind: str, bullets: str, shared_research: bool = False) -> None:
+    bullet_cache.set(report_key(company_name, kind, shared_research), bullets.encode("utf-8"))
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return "just now"
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} min ago"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes}m ago"
+    return f"{hours // 24}d {hours % 24}h ago"
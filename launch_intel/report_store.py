@@ -0,0 +1,112 @@
+"""Compressed, memory-capped home for the reports a session is showing.
+
+Sessions keep only a handle (the report's content hash) in ``st.session_state``;
+the body lives here once per process, zlib-compressed, however many sessions
+show it. It is decompressed when a tab renders. A global byte cap evicts the
+least recently rendered reports first; a session whose handle was evicted
+reloads the report from the SQLite report cache.
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .telemetry import register_gauges
+
+REPORT_STORE_MAX_BYTES = int(float(os.getenv("BI_REPORT_STORE_MAX_MB", "64")) * 1_048_576)
+COMPRESSION_LEVEL = 6
+
+
+class ReportStore:
+    def __init__(self, max_bytes: int = REPORT_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._raw_sizes: Dict[str, int] = {}
+        self._compressed_bytes = 0
+        self.stats = {"puts": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    def put(self, report: str) -> str:
+        """Store a report and return its handle; storing the same text again only refreshes it."""
+        raw = report.encode("utf-8")
+        handle = hashlib.sha256(raw).hexdigest()[:24]
+        with self._lock:
+            self.stats["puts"] += 1
+            if handle in self._bodies:
+                self._bodies.move_to_end(handle)
+                return handle
+        body = zlib.compress(raw, COMPRESSION_LEVEL)
+        with self._lock:
+            if handle not in self._bodies:
+                self._bodies[handle] = body
+                self._raw_sizes[handle] = len(raw)
+                self._compressed_bytes += len(body)
+                self._evict(keep=handle)
+        return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        """The report text, or None if it was evicted (or the handle came from another process)."""
+        with self._lock:
+            body = self._bodies.get(handle)
+            if body is None:
+                self.stats["misses"] += 1
+                return None
+            self._bodies.move_to_end(handle)
+            self.stats["hits"] += 1
+        return zlib.decompress(body).decode("utf-8")
+
+    def _evict(self, keep: str) -> None:
+        # The report just stored is kept even if it alone exceeds the cap: its session is about to render it
+        while self._compressed_bytes > self.max_bytes and len(self._bodies) > 1:
+            handle = next(iter(self._bodies))
+            if handle == keep:
+                break
+            self._compressed_bytes -= len(self._bodies.pop(handle))
+            del self._raw_sizes[handle]
+            self.stats["evictions"] += 1
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._bodies),
+                "raw_bytes": sum(self._raw_sizes.values()),
+                "compressed_bytes": self._compressed_bytes,
+                "max_bytes": self.max_bytes,
+                **self.stats,
+            }
+
+
+_store: Optional[ReportStore] = None
+_store_lock = threading.Lock()
+
+
+def report_store() -> ReportStore:
+    """The process-wide report store, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore()
+        return _store
+
+
+def _gauges() -> Dict[str, float]:
+    usage = report_store().usage()
+    return {
+        "bi_report_store_entries": usage["entries"],
+        "bi_report_store_raw_bytes": usage["raw_bytes"],
+        "bi_report_store_compressed_bytes": usage["compressed_bytes"],
+        "bi_report_store_max_bytes": usage["max_bytes"],
+        "bi_report_store_evictions_total": usage["evictions"],
+    }
+
+
+register_gauges(_gauges, {
+    "bi_report_store_entries": ("gauge", "Reports held in the in-memory report store"),
+    "bi_report_store_raw_bytes": ("gauge", "Uncompressed size of the reports in the store"),
+    "bi_report_store_compressed_bytes": ("gauge", "Memory the compressed reports occupy (capped by BI_REPORT_STORE_MAX_MB)"),
+    "bi_report_store_max_bytes": ("gauge", "The report store's memory cap"),
+    "bi_report_store_evictions_total": ("counter", "Reports evicted from the store to stay under the cap"),
+})
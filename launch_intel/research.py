@@ -0,0 +1,256 @@
+"""One consolidated research pass per company, shared by all three writers.
+
+In the default pipeline each analyst runs its own tool-calling loop before it
+writes a single bullet. In shared-research mode a fixed set of Firecrawl
+searches covering launches, press, reviews, social and metrics runs once per
+company; every analyst then writes from the same corpus with no tools, which
+removes two of the three research loops and all of their crawl jobs.
+
+When the company has been researched before, ``refresh_research`` rebuilds the
+corpus from the source manifest (``launch_intel.manifest``) and only scrapes
+pages that are new or whose origin reports a change.
+"""
+
+import json
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cache import normalize_company
+from .firecrawl_cache import normalize_url
+from .manifest import RECHECK_SECONDS, SourceManifest, SourceRecord, check_origin, source_manifest
+from .packer import CONTEXT_TOKEN_BUDGET, pack
+from .telemetry import bind_context
+
+RESEARCH_QUERIES = {
+    "launches": "{company} latest product launch announcement",
+    "press": "{company} product launch press coverage",
+    "reviews": "{company} product reviews customer feedback",
+    "social": "{company} launch reaction reddit twitter",
+    "metrics": "{company} launch users revenue growth adoption",
+}
+
+# Which research topics each analyst writes from, most relevant first
+ANALYSIS_TOPICS = {
+    "competitor": ("launches", "press", "reviews", "metrics"),
+    "sentiment": ("reviews", "social", "press"),
+    "metrics": ("metrics", "launches", "press"),
+}
+
+RESULTS_PER_QUERY = 5
+
+
+class _CompanyLock:
+    """A per-company lock that lives only while someone holds or waits on it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+# Concurrent jobs for one company queue behind the first gatherer and then read from the page cache
+_gather_locks: "weakref.WeakValueDictionary[str, _CompanyLock]" = weakref.WeakValueDictionary()
+_gather_locks_guard = threading.Lock()
+
+
+@dataclass
+class Source:
+    topic: str
+    url: str
+    title: str
+    content: str
+    # Stable per-company reference number and content hash from the source manifest
+    ref: Optional[int] = None
+    content_hash: str = ""
+
+
+@dataclass
+class ResearchCorpus:
+    company_name: str
+    sources: List[Source] = field(default_factory=list)
+    searches: int = 0
+    fetches_made: int = 0
+    fetches_skipped: int = 0
+
+    def relevant(self, kind: str) -> List[Source]:
+        """The sources one analyst writes from, most relevant topic first, each URL once."""
+        seen = set()
+        relevant = []
+        for topic in ANALYSIS_TOPICS[kind]:
+            for source in self.sources:
+                if source.topic == topic and source.url not in seen:
+                    seen.add(source.url)
+                    relevant.append(source)
+        return relevant
+
+    def render(
+        self, sources: Sequence[Source], kind: str, budget: int = CONTEXT_TOKEN_BUDGET, record: bool = True
+    ) -> str:
+        """Number sources by their manifest reference (or position) and pack them under ``budget`` tokens."""
+        bodies, _ = pack([source.content for source in sources], budget, self.company_name, kind, record)
+        lines = [
+            f"[{source.ref or number}] {source.title} ({source.url})\n{body}"
+            for number, (source, body) in enumerate(((s, b) for s, b in zip(sources, bodies) if b), start=1)
+        ]
+        return "\n\n".join(lines) if lines else "(no sources found)"
+
+
+def _parse_search_results(raw: str) -> List[Dict]:
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    if isinstance(data, dict):
+        data = data.get("web") or data.get("data") or []
+    items = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        # Scraped results come back as documents that keep their URL and title in the metadata
+        metadata = item.get("metadata") or {}
+        url = item.get("url") or metadata.get("source_url") or metadata.get("sourceURL") or metadata.get("url")
+        if url:
+            items.append({**item, "url": url, "title": item.get("title") or metadata.get("title")})
+    return items
+
+
+def _company_lock(company_name: str) -> _CompanyLock:
+    key = normalize_company(company_name)
+    with _gather_locks_guard:
+        lock = _gather_locks.get(key)
+        if lock is None:
+            lock = _gather_locks[key] = _CompanyLock()
+        return lock
+
+
+def _run_searches(search, company_name: str, max_workers: int) -> Dict[str, List[Dict]]:
+    """Search results per research topic, with the searches run side by side."""
+    queries = {topic: template.format(company=company_name) for topic, template in RESEARCH_QUERIES.items()}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research") as pool:
+        raw_results = pool.map(bind_context(lambda query: search(query, RESULTS_PER_QUERY)), queries.values())
+        return {topic: _parse_search_results(raw) for topic, raw in zip(queries, raw_results)}
+
+
+def _search_corpus(tools, company_name: str, max_workers: int) -> ResearchCorpus:
+    corpus = ResearchCorpus(company_name, searches=len(RESEARCH_QUERIES))
+    for topic, items in _run_searches(tools.search, company_name, max_workers).items():
+        for item in items:
+            content = item.get("markdown") or item.get("description") or ""
+            corpus.sources.append(Source(topic, item["url"], item.get("title") or item["url"], content))
+    return corpus
+
+
+def refresh_research(tools, company_name: str, max_workers: int = len(RESEARCH_QUERIES)) -> ResearchCorpus:
+    """Run every research query once through the (cached) Firecrawl toolkit, reusing unchanged known sources.
+
+    The first run for a company is a full research pass that seeds the source
+    manifest. Later runs rediscover sources with link-only searches, send each
+    known origin a conditional request and scrape only new or changed pages.
+    Every source comes back with its manifest reference number and content hash.
+    """
+    manifest = source_manifest()
+    with _company_lock(company_name):
+        known = manifest.sources(company_name)
+        if not known:
+            corpus = _search_corpus(tools, company_name, max_workers)
+            pages = {normalize_url(source.url): source for source in corpus.sources}
+            records = {
+                key: manifest.record(company_name, key, source.title, source.content, None, None, fetched=True)
+                for key, source in pages.items()
+            }
+            for source in corpus.sources:
+                record = records[normalize_url(source.url)]
+                source.ref, source.content_hash = record.ref, record.content_hash
+            corpus.fetches_made = len(records)
+            # Origins are asked for their validators off the critical path; the next refresh needs them
+            threading.Thread(
+                target=_capture_validators, args=(manifest, company_name, {k: s.url for k, s in pages.items()}),
+                name="validators", daemon=True,
+            ).start()
+            return corpus
+
+        found = _run_searches(tools.search_links, company_name, max_workers)
+        urls = {normalize_url(item["url"]): item for items in found.values() for item in items}
+        resolve = bind_context(lambda key: _resolve_source(tools, manifest, company_name, key, urls[key], known.get(key)))
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(urls))), thread_name_prefix="research") as pool:
+            resolved = dict(zip(urls, pool.map(resolve, urls)))
+
+    corpus = ResearchCorpus(company_name, searches=len(RESEARCH_QUERIES))
+    corpus.fetches_made = sum(1 for _, fetched in resolved.values() if fetched)
+    corpus.fetches_skipped = sum(1 for record, fetched in resolved.values() if record is not None and not fetched)
+    for topic, items in found.items():
+        for item in items:
+            record, _ = resolved[normalize_url(item["url"])]
+            if record is not None:
+                corpus.sources.append(
+                    Source(topic, item["url"], record.title, record.content, record.ref, record.content_hash)
+                )
+    return corpus
+
+
+def prefetch_research(
+    tools, company_name: str, cancelled: threading.Event, max_workers: int = 2
+) -> int:
+    """Run the searches ``refresh_research`` will start with, so they are in the page cache when it runs.
+
+    Holds the company's research lock, so an analysis started meanwhile waits
+    for the searches instead of repeating them. Stops issuing searches once
+    ``cancelled`` is set; returns how many ran.
+    """
+    with _company_lock(company_name):
+        search = tools.search_links if source_manifest().sources(company_name) else tools.search
+
+        def run(query: str) -> bool:
+            if cancelled.is_set():
+                return False
+            search(query, RESULTS_PER_QUERY)
+            return True
+
+        queries = [template.format(company=company_name) for template in RESEARCH_QUERIES.values()]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch") as pool:
+            return sum(pool.map(bind_context(run), queries))
+
+
+def _capture_validators(manifest: SourceManifest, company_name: str, urls: Dict[str, str]) -> None:
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(urls))), thread_name_prefix="validators") as pool:
+        for key, check in zip(urls, pool.map(check_origin, urls.values())):
+            if check.etag or check.last_modified:
+                manifest.set_validators(company_name, key, check.etag, check.last_modified)
+
+
+def _resolve_source(
+    tools, manifest: SourceManifest, company_name: str, key: str, item: Dict, record: Optional[SourceRecord]
+) -> Tuple[Optional[SourceRecord], bool]:
+    """``(manifest record or None, fetched)`` for one discovered URL, scraping only if it is new or changed."""
+    if record is not None and time.time() - record.checked_at < RECHECK_SECONDS:
+        return record, False
+    check = check_origin(item["url"], record.etag, record.last_modified) if record else check_origin(item["url"])
+    if record is not None and check.unchanged:
+        return manifest.record(
+            company_name, key, record.title, record.content, check.etag, check.last_modified, fetched=False
+        ), False
+    page = _scrape(tools, item["url"])
+    if page is None:
+        return record, False  # Keep the last good copy of a page that cannot be fetched right now
+    content, title = page
+    title = title or item.get("title") or item["url"]
+    return manifest.record(company_name, key, title, content, check.etag, check.last_modified, fetched=True), True
+
+
+def _scrape(tools, url: str) -> Optional[Tuple[str, Optional[str]]]:
+    try:
+        data = json.loads(tools.scrape_website(url))
+    except Exception:
+        return None  # Firecrawl errors come back as plain text or raise from the SDK
+    if not isinstance(data, dict) or not data.get("markdown"):
+        return None
+    return data["markdown"], (data.get("metadata") or {}).get("title")
@@ -0,0 +1,66 @@
+"""The one entry point every front end uses to produce a report.
+
+The Streamlit jobs, the batch CLI and anything else that needs a report call
+``run_cached_analysis``: it serves the shared report cache when it can and
+otherwise runs the (optionally shared-research) pipeline and stores the result.
+Shared research is incremental: a company researched before only has its
+new or changed sources fetched and extracted again. A request for a report
+that is already being produced joins that run instead of starting another
+(see ``singleflight``).
+"""
+
+from typing import Callable, Optional, Tuple
+
+from .agents import lease_agents, research_tools
+from .pipeline import run_analysis
+from .report_cache import get_cached_report, report_key, store_bullets, store_report
+from .research import refresh_research
+from .singleflight import analysis_flights
+from .telemetry import stage, trace_analysis
+
+
+def run_cached_analysis(
+    company_name: str,
+    kind: str,
+    openai_key: str,
+    firecrawl_key: str,
+    shared_research: bool = False,
+    force: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, bool]:
+    """Return ``(report, from_cache)`` for one company and analysis type."""
+    with trace_analysis(company_name, kind) as trace:
+        if not force:
+            entry = get_cached_report(company_name, kind, shared_research)
+            if entry is not None:
+                trace.cached = True
+                return entry.value.decode("utf-8"), True
+        # Any run in flight is fresh, so it also serves a forced refresh
+        key = report_key(company_name, kind, shared_research)
+        flight, leader = analysis_flights.join(key)
+        if not leader:
+            trace.coalesced = True
+            return flight.follow(on_delta), False
+
+        def publish(delta: str) -> None:
+            flight.publish(delta)
+            if on_delta is not None:
+                on_delta(delta)
+
+        try:
+            corpus = None
+            if shared_research:
+                with stage("research"):
+                    corpus = refresh_research(research_tools(openai_key, firecrawl_key), company_name)
+            with lease_agents(openai_key, firecrawl_key, with_tools=not shared_research) as agents:
+                report = run_analysis(
+                    agents[kind], kind, company_name, corpus, on_delta=publish,
+                    on_bullets=lambda bullets: store_bullets(company_name, kind, bullets, shared_research),
+                )
+            store_report(company_name, kind, report, shared_research)
+        except BaseException as e:
+            analysis_flights.land(key, flight, error=e)
+            raise
+        analysis_flights.land(key, flight, report)
+        return report, False
+
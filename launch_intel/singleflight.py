@@ -0,0 +1,149 @@
+"""Single-flight coalescing: identical analyses in flight at once share one run.
+
+When several sessions (or a session and the watchlist) ask for the same
+report while it is being produced, the first caller leads and runs the
+pipeline. Every later caller with the same key follows: it waits for the
+leader's result instead of starting its own crawls and model calls, and is
+streamed the leader's text as it is written. The key is the report cache key,
+i.e. (company, analysis type, prompt version). A flight lands (and stops
+accepting followers) once the leader has stored its report. Later callers
+are then served by the report cache.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .telemetry import register_gauges
+
+
+class Flight:
+    def __init__(self):
+        self._done = threading.Condition()
+        self._parts: List[str] = []
+        self.finished = False
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self._listeners: List[Callable[[], None]] = []
+
+    def publish(self, delta: str) -> None:
+        """Hand a streamed delta from the leader to its followers."""
+        with self._done:
+            self._parts.append(delta)
+            self._done.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def _finish(self, result: Optional[str], error: Optional[BaseException]) -> None:
+        with self._done:
+            self.result, self.error, self.finished = result, error, True
+            self._done.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener()`` after every delta and once the flight lands (at once if it already has).
+
+        Listeners run on the leader's thread, so they must only signal, e.g. wake a waiter that calls ``progress``.
+        """
+        with self._done:
+            self._listeners.append(listener)
+            finished = self.finished
+        if finished:
+            listener()
+
+    def progress(self, seen: int = 0) -> Tuple[str, int, bool]:
+        """Without waiting: the text published after the first ``seen`` deltas, the new count, and whether it landed."""
+        with self._done:
+            return "".join(self._parts[seen:]), len(self._parts), self.finished
+
+    def follow(self, on_delta: Optional[Callable[[str], None]] = None, timeout: Optional[float] = None) -> str:
+        """Wait for the leader's report, replaying its stream so far and then each new delta to ``on_delta``.
+
+        Deltas are delivered on the follower's own thread, so a slow follower never holds up the leader.
+        Raises ``TimeoutError`` if the flight has not landed ``timeout`` seconds after the call.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        seen = 0
+        while True:
+            with self._done:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                self._done.wait_for(
+                    lambda: self.finished or (on_delta is not None and len(self._parts) > seen), remaining
+                )
+                text, seen, finished = "".join(self._parts[seen:]), len(self._parts), self.finished
+            if text and on_delta is not None:
+                on_delta(text)
+            if not finished and deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"the leading run did not finish within {timeout:g}s")
+            if finished:
+                break
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class FlightGroup:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Flight] = {}
+        self.stats = {"led": 0, "coalesced": 0}
+
+    def join(self, key: str) -> Tuple[Flight, bool]:
+        """The flight for ``key`` and whether the caller leads it; a leader must ``land`` it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.stats["coalesced"] += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.stats["led"] += 1
+            return flight, True
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def follow_existing(self, key: str) -> Optional[Flight]:
+        """Follow the flight for ``key`` if there is one, never leading; None if nothing is in flight."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.stats["coalesced"] += 1
+            return flight
+
+    def land(self, key: str, flight: Flight, result: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight._finish(result, error)
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._flights),
+                        following=sum(flight.followers for flight in self._flights.values()))
+
+
+# Every analysis run in this process, keyed by report cache key
+analysis_flights = FlightGroup()
+
+
+def _gauges() -> Dict[str, float]:
+    summary = analysis_flights.summary()
+    return {
+        "bi_analyses_in_flight": summary["in_flight"],
+        "bi_analysis_followers": summary["following"],
+        "bi_analyses_coalesced_total": summary["coalesced"],
+    }
+
+
+register_gauges(_gauges, {
+    "bi_analyses_in_flight": ("gauge", "Distinct analyses running (each may serve several requests)"),
+    "bi_analysis_followers": ("gauge", "Requests waiting on an identical analysis in flight"),
+    "bi_analyses_coalesced_total": ("counter", "Requests served by joining an identical analysis in flight"),
+})
@@ -0,0 +1,48 @@
+"""Thread-safe accumulation of streamed report tokens, with time-to-first-token."""
+
+import threading
+import time
+from typing import Optional
+
+RENDER_INTERVAL_SECONDS = 0.1
+
+
+class StreamBuffer:
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self._parts = []
+        self._length = 0
+        self._lock = threading.Lock()
+        self._rendered_len = 0
+        self._rendered_at = 0.0
+
+    def append(self, delta: str) -> None:
+        with self._lock:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self._parts.append(delta)
+            self._length += len(delta)
+
+    @property
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self._parts)
+
+    @property
+    def ttft_seconds(self) -> Optional[float]:
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    def pending_render(self, min_interval: float = RENDER_INTERVAL_SECONDS) -> Optional[str]:
+        """Return the text to draw if it changed and the last draw is old enough, else None.
+
+        Re-sending the whole Markdown on every token floods the websocket, so
+        draws are throttled to one per ``min_interval``.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self._length == self._rendered_len or now - self._rendered_at < min_interval:
+                return None
+            self._rendered_len = self._length
+            self._rendered_at = now
+            return "".join(self._parts)
@@ -0,0 +1,336 @@
+"""Per-stage timings, token counts, tool calls and retries for every analysis run.
+
+Each run of ``run_cached_analysis`` is one trace with stages (``research``,
+``bullets``, ``expand``). Model calls, Firecrawl tool calls and rate-limit
+retries are attributed to the active stage through a context variable, so
+no call signatures change. Finished traces are appended to a JSON-lines file,
+rotated to ``<file>.1`` once it reaches ``BI_TELEMETRY_MAX_MB``, and folded
+into Prometheus-style counters and histograms, served on ``/metrics`` when
+``BI_METRICS_PORT`` is set. The metrics name companies and their costs, so
+they are served on ``BI_METRICS_HOST`` (loopback by default) only.
+"""
+
+import contextvars
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .cache import CACHE_DIR, normalize_company
+
+TELEMETRY_FILE = os.getenv("BI_TELEMETRY_FILE", os.path.join(CACHE_DIR, "telemetry.jsonl"))
+TELEMETRY_MAX_BYTES = int(float(os.getenv("BI_TELEMETRY_MAX_MB", "50")) * 1_048_576)
+METRICS_PORT = int(os.getenv("BI_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("BI_METRICS_HOST", "127.0.0.1")
+RECENT_TRACES = 200
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+@dataclass
+class ToolCall:
+    name: str
+    seconds: float
+    cached: bool
+
+
+@dataclass
+class Stage:
+    name: str
+    seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens the provider served from its prompt cache
+    cached_tokens: int = 0
+    model_calls: int = 0
+    retries: int = 0
+    tool_calls: List[ToolCall] = field(default_factory=list)
+
+    @property
+    def tool_seconds(self) -> float:
+        return sum(call.seconds for call in self.tool_calls)
+
+
+@dataclass
+class Trace:
+    company_name: str
+    kind: str
+    started_at: float = field(default_factory=time.time)
+    seconds: float = 0.0
+    cached: bool = False
+    # Joined an identical run already in flight instead of running the pipeline
+    coalesced: bool = False
+    error: Optional[str] = None
+    stages: List[Stage] = field(default_factory=list)
+
+    def stage(self, name: str) -> Optional[Stage]:
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_current_stage: contextvars.ContextVar[Optional[Stage]] = contextvars.ContextVar("stage", default=None)
+# Tool calls from research threads land on the same Stage object
+_record_lock = threading.Lock()
+
+
+def bind_context(fn: Callable) -> Callable:
+    """Wrap ``fn`` to run in (a copy of) the caller's context, e.g. on a pool thread."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+@contextmanager
+def trace_analysis(company_name: str, kind: str) -> Iterator[Trace]:
+    trace = Trace(company_name, kind)
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    except Exception as e:
+        trace.error = str(e) or type(e).__name__
+        raise
+    finally:
+        trace.seconds = time.perf_counter() - started
+        _current_trace.reset(token)
+        _finish(trace)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Optional[Stage]]:
+    """Time a stage of the active trace; a no-op outside one."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = Stage(name)
+    trace.stages.append(current)
+    token = _current_stage.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - started
+        _current_stage.reset(token)
+
+
+def record_model_call(prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> None:
+    current = _current_stage.get()
+    if current is not None:
+        with _record_lock:
+            current.model_calls += 1
+            current.prompt_tokens += prompt_tokens or 0
+            current.completion_tokens += completion_tokens or 0
+            current.cached_tokens += cached_tokens or 0
+
+
+def record_tool_call(name: str, seconds: float, cached: bool) -> None:
+    current = _current_stage.get()
+    if current is not None:
+        with _record_lock:
+            current.tool_calls.append(ToolCall(name, round(seconds, 3), cached))
+
+
+def record_retry() -> None:
+    current = _current_stage.get()
+    if current is not None:
+        with _record_lock:
+            current.retries += 1
+
+
+def record_trace(trace: Trace) -> None:
+    """Record a trace the caller timed itself, e.g. a job that waited on another run from a shared thread."""
+    _finish(trace)
+
+
+# --- Aggregation and export -------------------------------------------------
+
+_lock = threading.Lock()
+_recent: deque = deque(maxlen=RECENT_TRACES)
+_latest: Dict[Tuple[str, str], Trace] = {}
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+_histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+# Point-in-time values other modules report at scrape time: (callable returning {name: value}, {name: (type, help)})
+_gauge_sources: List[Tuple[Callable[[], Dict[str, float]], Dict[str, Tuple[str, str]]]] = []
+# Serialises appends and rotation of TELEMETRY_FILE within this process
+_file_lock = threading.Lock()
+
+_METRIC_HELP = {
+    "bi_analysis_runs_total": ("counter", "Analysis runs by type and outcome (coalesced runs joined an identical run in flight)"),
+    "bi_analysis_seconds": ("histogram", "End-to-end analysis time"),
+    "bi_stage_seconds": ("histogram", "Wall time per pipeline stage"),
+    "bi_tokens_total": ("counter", "Model tokens per stage (type=cached counts prompt tokens served from the prompt cache)"),
+    "bi_model_calls_total": ("counter", "Model calls per stage"),
+    "bi_retries_total": ("counter", "Rate-limit retries per stage"),
+    "bi_tool_calls_total": ("counter", "Firecrawl tool calls"),
+    "bi_tool_seconds": ("histogram", "Firecrawl tool call time"),
+}
+
+
+def register_gauges(source: Callable[[], Dict[str, float]], help_texts: Dict[str, Tuple[str, str]]) -> None:
+    """Export the values ``source`` returns on every ``/metrics`` scrape."""
+    with _lock:
+        _gauge_sources.append((source, help_texts))
+
+
+def _labels(**labels: str) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def _observe(name: str, value: float, **labels: str) -> None:
+    buckets = _histograms.setdefault((name, _labels(**labels)), [0.0] * (len(SECONDS_BUCKETS) + 2))
+    for i, bound in enumerate(SECONDS_BUCKETS):
+        if value <= bound:
+            buckets[i] += 1
+    buckets[-2] += 1  # count (also the +Inf bucket)
+    buckets[-1] += value  # sum
+
+
+def _finish(trace: Trace) -> None:
+    outcome = "error" if trace.error else "cached" if trace.cached else "coalesced" if trace.coalesced else "fresh"
+    with _lock:
+        _recent.append(trace)
+        if not trace.coalesced:  # The leader's trace holds the stages worth showing
+            _latest[(normalize_company(trace.company_name), trace.kind)] = trace
+        _counters[("bi_analysis_runs_total", _labels(kind=trace.kind, outcome=outcome))] += 1
+        _observe("bi_analysis_seconds", trace.seconds, kind=trace.kind, outcome=outcome)
+        for item in trace.stages:
+            labels = {"kind": trace.kind, "stage": item.name}
+            _observe("bi_stage_seconds", item.seconds, **labels)
+            _counters[("bi_tokens_total", _labels(type="prompt", **labels))] += item.prompt_tokens
+            _counters[("bi_tokens_total", _labels(type="completion", **labels))] += item.completion_tokens
+            _counters[("bi_tokens_total", _labels(type="cached", **labels))] += item.cached_tokens
+            _counters[("bi_model_calls_total", _labels(**labels))] += item.model_calls
+            _counters[("bi_retries_total", _labels(**labels))] += item.retries
+            for call in item.tool_calls:
+                _counters[("bi_tool_calls_total", _labels(tool=call.name, cached=str(call.cached).lower()))] += 1
+                _observe("bi_tool_seconds", call.seconds, tool=call.name)
+    if TELEMETRY_FILE:
+        _append_record({**asdict(trace), "outcome": outcome})
+
+
+def _append_record(record: dict) -> None:
+    """Append one line to ``TELEMETRY_FILE``, first moving a full file to ``.1`` (replacing the previous one)."""
+    line = json.dumps(record) + "\n"
+    with _file_lock:
+        try:
+            if TELEMETRY_MAX_BYTES and os.path.getsize(TELEMETRY_FILE) + len(line) > TELEMETRY_MAX_BYTES:
+                os.replace(TELEMETRY_FILE, TELEMETRY_FILE + ".1")
+        except OSError:
+            pass  # Not written yet, or another process rotated it first
+        try:
+            os.makedirs(os.path.dirname(TELEMETRY_FILE) or ".", exist_ok=True)
+            with open(TELEMETRY_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass  # Telemetry must never fail an analysis
+
+
+def last_trace(company_name: str, kind: str) -> Optional[Trace]:
+    with _lock:
+        return _latest.get((normalize_company(company_name), kind))
+
+
+def latency_percentiles() -> Dict[str, Dict[str, float]]:
+    """p50/p95 of fresh (non-cached) runs per analysis type over recent traces."""
+    with _lock:
+        samples = defaultdict(list)
+        for trace in _recent:
+            if not (trace.cached or trace.coalesced or trace.error):
+                samples[trace.kind].append(trace.seconds)
+    result = {}
+    for kind, values in samples.items():
+        ordered = sorted(values)
+        result[kind] = {
+            "p50": statistics.median(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "count": len(ordered),
+        }
+    return result
+
+
+def prompt_cache_ratios() -> Dict[str, Dict[str, float]]:
+    """Share of prompt tokens served from the provider's prompt cache per analysis type and stage."""
+    with _lock:
+        totals: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        for trace in _recent:
+            for item in trace.stages:
+                if item.prompt_tokens:
+                    totals[trace.kind][item.name][0] += item.cached_tokens
+                    totals[trace.kind][item.name][1] += item.prompt_tokens
+    return {
+        kind: {name: cached / prompt for name, (cached, prompt) in stages.items()}
+        for kind, stages in totals.items()
+    }
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(labels) + sorted(extra.items())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def prometheus_text() -> str:
+    """All counters and histograms in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, (metric_type, help_text) in _METRIC_HELP.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+            if metric_type == "counter":
+                for (metric, labels), value in sorted(_counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+                continue
+            for (metric, labels), buckets in sorted(_histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(SECONDS_BUCKETS, buckets):
+                    lines.append(f"{name}_bucket{_format_labels(labels, le=f'{bound:g}')} {count:g}")
+                lines.append(f"{name}_bucket{_format_labels(labels, le='+Inf')} {buckets[-2]:g}")
+                lines.append(f"{name}_count{_format_labels(labels)} {buckets[-2]:g}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {buckets[-1]:.6f}")
+        sources = list(_gauge_sources)
+    for source, help_texts in sources:
+        values = source()
+        for name, (metric_type, help_text) in help_texts.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {values.get(name, 0):g}"]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[int]:
+    """Serve ``/metrics`` on a daemon thread once per process; returns the bound port, or None if disabled."""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None  # Another process (e.g. a second Streamlit server) already serves it
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server.server_port
@@ -0,0 +1,372 @@
+"""Tracked companies whose reports are refreshed off-peak, before anyone asks for them.
+
+    python -m launch_intel.watchlist add "Acme" "Globex" [--shared-research]
+    python -m launch_intel.watchlist status
+    python -m launch_intel.watchlist run       # refresh everything due now (e.g. from cron)
+    python -m launch_intel.watchlist serve     # sidecar: refresh inside the off-peak window, forever
+
+A watched company's competitor, sentiment and metrics reports are re-run with
+the normal pipeline and prompts whenever they are older than
+``BI_WATCHLIST_REFRESH_HOURS``, but only inside the ``BI_WATCHLIST_WINDOW``
+(local time). The fresh reports land in the shared report cache, so a Monday
+morning request is served from the cache. Refreshes run on a small worker pool
+with the normal rate limiters, but each process has its own: a sidecar does
+not see the app's traffic, so run it when the app is quiet or give it lower
+limits. With ``BI_WATCHLIST_SCHEDULER=1`` the app runs the scheduler
+in-process instead, sharing its limiters. Each refresh is logged with its
+duration and how stale the report it replaced was.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .cache import CACHE_DIR, sqlite_connection
+from .pipeline import ANALYSIS_KINDS
+from .report_cache import format_age, get_cached_report, normalize_company
+
+WATCHLIST_WINDOW = os.getenv("BI_WATCHLIST_WINDOW", "02:00-06:00")
+WATCHLIST_REFRESH_SECONDS = float(os.getenv("BI_WATCHLIST_REFRESH_HOURS", "20")) * 3600
+WATCHLIST_WORKERS = int(os.getenv("BI_WATCHLIST_WORKERS", "2"))
+WATCHLIST_SCHEDULER = os.getenv("BI_WATCHLIST_SCHEDULER", "").lower() in ("1", "true", "yes")
+CHECK_INTERVAL_SECONDS = 60
+# A report whose refresh failed is left alone this long, so a bad name does not burn the window
+RETRY_FAILED_SECONDS = 3600
+REFRESH_LOG_RETENTION_SECONDS = 30 * 86400
+
+
+class WatchedCompany(NamedTuple):
+    name: str
+    shared_research: bool
+    added_at: float
+
+
+class RefreshRecord(NamedTuple):
+    company_name: str
+    kind: str
+    started_at: float
+    seconds: float
+    # Age of the report this refresh replaced; None if there was none
+    staleness_seconds: Optional[float]
+    error: Optional[str] = None
+
+
+class OffPeakWindow(NamedTuple):
+    """A daily ``HH:MM-HH:MM`` window in local time; it may wrap past midnight."""
+
+    start: int  # minutes after midnight
+    end: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "OffPeakWindow":
+        try:
+            start, end = (datetime.strptime(part.strip(), "%H:%M") for part in spec.split("-"))
+        except ValueError:
+            raise ValueError(f"expected a window like 02:00-06:00, got {spec!r}") from None
+        return cls(start.hour * 60 + start.minute, end.hour * 60 + end.minute)
+
+    def contains(self, moment: datetime) -> bool:
+        minute = moment.hour * 60 + moment.minute
+        if self.start <= self.end:
+            return self.start <= minute < self.end
+        return minute >= self.start or minute < self.end
+
+    def closes_at(self, moment: datetime) -> datetime:
+        """When the window containing ``moment`` closes."""
+        close = moment.replace(hour=self.end // 60, minute=self.end % 60, second=0, microsecond=0)
+        return close if close > moment else close + timedelta(days=1)
+
+    def next_opening(self, moment: datetime) -> datetime:
+        opening = moment.replace(hour=self.start // 60, minute=self.start % 60, second=0, microsecond=0)
+        return opening if opening > moment else opening + timedelta(days=1)
+
+
+def configured_window() -> OffPeakWindow:
+    try:
+        return OffPeakWindow.parse(WATCHLIST_WINDOW)
+    except ValueError as e:
+        raise ValueError(f"BI_WATCHLIST_WINDOW: {e}") from None
+
+
+class Watchlist:
+    def __init__(self, filename: str = "watchlist.sqlite3"):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = os.path.join(CACHE_DIR, filename)
+        with sqlite_connection(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS companies ("
+                " company TEXT PRIMARY KEY, name TEXT NOT NULL, shared_research INTEGER NOT NULL, added_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refreshes ("
+                " company TEXT NOT NULL, name TEXT NOT NULL, kind TEXT NOT NULL, started_at REAL NOT NULL,"
+                " seconds REAL NOT NULL, staleness_seconds REAL, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS refreshes_started ON refreshes (started_at)")
+            conn.execute("DELETE FROM refreshes WHERE started_at < ?", (time.time() - REFRESH_LOG_RETENTION_SECONDS,))
+
+    def add(self, company_name: str, shared_research: bool = False) -> None:
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO companies (company, name, shared_research, added_at) VALUES (?, ?, ?, ?)",
+                (normalize_company(company_name), " ".join(company_name.split()), int(shared_research), time.time()),
+            )
+
+    def remove(self, company_name: str) -> bool:
+        with sqlite_connection(self.path) as conn:
+            return conn.execute(
+                "DELETE FROM companies WHERE company = ?", (normalize_company(company_name),)
+            ).rowcount > 0
+
+    def contains(self, company_name: str) -> bool:
+        with sqlite_connection(self.path) as conn:
+            return conn.execute(
+                "SELECT 1 FROM companies WHERE company = ?", (normalize_company(company_name),)
+            ).fetchone() is not None
+
+    def companies(self) -> List[WatchedCompany]:
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute("SELECT name, shared_research, added_at FROM companies ORDER BY name").fetchall()
+        return [WatchedCompany(name, bool(shared), added_at) for name, shared, added_at in rows]
+
+    def record(self, refresh: RefreshRecord) -> None:
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "INSERT INTO refreshes (company, name, kind, started_at, seconds, staleness_seconds, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_company(refresh.company_name), *refresh),
+            )
+
+    def refreshes(self, limit: int = 50) -> List[RefreshRecord]:
+        """The most recent refreshes, newest first."""
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute(
+                "SELECT name, kind, started_at, seconds, staleness_seconds, error FROM refreshes"
+                " ORDER BY started_at DESC LIMIT ?", (limit,),
+            ).fetchall()
+        return [RefreshRecord(*row) for row in rows]
+
+    def failed_since(self, since: float) -> Set[Tuple[str, str]]:
+        """``(company, kind)`` pairs whose latest refresh after ``since`` failed."""
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute(
+                "SELECT company, kind, error FROM refreshes WHERE started_at >= ? ORDER BY started_at", (since,)
+            ).fetchall()
+        latest = {(company, kind): error for company, kind, error in rows}
+        return {pair for pair, error in latest.items() if error}
+
+
+def due_refreshes(
+    companies: Sequence[WatchedCompany],
+    refresh_after: float = WATCHLIST_REFRESH_SECONDS,
+    skip: Iterable[Tuple[str, str]] = (),
+) -> List[Tuple[WatchedCompany, str, Optional[float]]]:
+    """``(company, kind, report age or None)`` for every report that is missing or older than ``refresh_after``.
+
+    Missing reports come first, then the stalest. ``skip`` holds normalized ``(company, kind)`` pairs.
+    """
+    skip = set(skip)
+    due = []
+    for company in companies:
+        for kind in ANALYSIS_KINDS:
+            if (normalize_company(company.name), kind) in skip:
+                continue
+            entry = get_cached_report(company.name, kind, company.shared_research)
+            age = entry.age_seconds if entry is not None else None
+            if age is None or age >= refresh_after:
+                due.append((company, kind, age))
+    return sorted(due, key=lambda item: -(item[2] if item[2] is not None else float("inf")))
+
+
+def refresh_due(
+    watch: "Watchlist",
+    openai_key: str,
+    firecrawl_key: str,
+    workers: int = WATCHLIST_WORKERS,
+    refresh_after: float = WATCHLIST_REFRESH_SECONDS,
+    deadline: Optional[float] = None,
+    retry_failed_after: float = RETRY_FAILED_SECONDS,
+) -> List[RefreshRecord]:
+    """Re-run every due report; nothing new is started after ``deadline`` (a ``time.time()`` value)."""
+    from .runner import run_cached_analysis
+
+    skip = watch.failed_since(time.time() - retry_failed_after) if retry_failed_after > 0 else set()
+    due = due_refreshes(watch.companies(), refresh_after, skip)
+    if not due:
+        return []
+    _log(f"{len(due)} reports due for {len({company.name for company, _, _ in due})} companies, {workers} workers")
+
+    def refresh(company: WatchedCompany, kind: str, age: Optional[float]) -> Optional[RefreshRecord]:
+        if deadline is not None and time.time() >= deadline:
+            return None
+        started_at, started = time.time(), time.perf_counter()
+        error = None
+        try:
+            run_cached_analysis(company.name, kind, openai_key, firecrawl_key, company.shared_research, force=True)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        record = RefreshRecord(company.name, kind, started_at, time.perf_counter() - started, age, error)
+        watch.record(record)
+        stale = "new report" if age is None else f"replaced a report from {format_age(age)}"
+        _log(f"{company.name} / {kind}: {'failed - ' + error if error else f'{record.seconds:.1f}s, {stale}'}")
+        return record
+
+    records = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="watchlist") as pool:
+        for future in as_completed([pool.submit(refresh, *item) for item in due]):
+            if future.result() is not None:
+                records.append(future.result())
+    return records
+
+
+class WatchlistScheduler:
+    """Checks every minute and refreshes due reports while the off-peak window is open."""
+
+    def __init__(
+        self,
+        openai_key: str,
+        firecrawl_key: str,
+        window: Optional[OffPeakWindow] = None,
+        workers: int = WATCHLIST_WORKERS,
+    ):
+        """``window`` defaults to ``BI_WATCHLIST_WINDOW``; an invalid setting is logged and raises ValueError."""
+        if window is None:
+            try:
+                window = configured_window()
+            except ValueError as e:
+                _log(f"scheduler not started - {e}")
+                raise
+        self.openai_key = openai_key
+        self.firecrawl_key = firecrawl_key
+        self.window = window
+        self.workers = workers
+        self.last_run: Optional[float] = None
+        self._stop = threading.Event()
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            now = datetime.now()
+            if self.window.contains(now):
+                try:
+                    refresh_due(
+                        watchlist(), self.openai_key, self.firecrawl_key, self.workers,
+                        deadline=self.window.closes_at(now).timestamp(),
+                    )
+                except Exception as e:  # The scheduler must outlive one bad pass
+                    _log(f"refresh pass failed - {e}")
+                self.last_run = time.time()
+            self._stop.wait(CHECK_INTERVAL_SECONDS)
+
+    def start(self) -> "WatchlistScheduler":
+        threading.Thread(target=self.run_forever, name="watchlist", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_watchlist: Optional[Watchlist] = None
+_scheduler: Optional[WatchlistScheduler] = None
+_lock = threading.Lock()
+
+
+def watchlist() -> Watchlist:
+    """The process-wide watchlist, created on first use."""
+    global _watchlist
+    with _lock:
+        if _watchlist is None:
+            _watchlist = Watchlist()
+        return _watchlist
+
+
+def start_scheduler(openai_key: str, firecrawl_key: str) -> Optional[WatchlistScheduler]:
+    """Start the in-process scheduler once per process, if ``BI_WATCHLIST_SCHEDULER`` is on and keys are set."""
+    global _scheduler
+    if not (WATCHLIST_SCHEDULER and openai_key and firecrawl_key):
+        return None
+    with _lock:
+        if _scheduler is None:
+            try:
+                _scheduler = WatchlistScheduler(openai_key, firecrawl_key).start()
+            except ValueError:
+                return None  # Already logged; the app runs without it
+        return _scheduler
+
+
+def _log(message: str) -> None:
+    print(f"[watchlist {datetime.now():%H:%M:%S}] {message}", file=sys.stderr, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m launch_intel.watchlist", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="watch companies")
+    add.add_argument("companies", nargs="+")
+    add.add_argument("--shared-research", action="store_true", help="refresh with one research pass per company")
+    commands.add_parser("remove", help="stop watching companies").add_argument("companies", nargs="+")
+    commands.add_parser("status", help="watched companies, report ages and recent refreshes")
+    for name, text in (("run", "refresh every due report now"), ("serve", "refresh due reports in the off-peak window")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("--workers", type=int, default=WATCHLIST_WORKERS, help="refreshes running at once")
+    args = parser.parse_args(argv)
+
+    watch = watchlist()
+    if args.command == "add":
+        for company in args.companies:
+            watch.add(company, args.shared_research)
+        return 0
+    if args.command == "remove":
+        missing = [company for company in args.companies if not watch.remove(company)]
+        if missing:
+            _log(f"not on the watchlist: {', '.join(missing)}")
+        return 1 if missing else 0
+    try:
+        window = configured_window()
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command == "status":
+        print(f"window {WATCHLIST_WINDOW}, next opening {window.next_opening(datetime.now()):%a %H:%M}; "
+              f"refresh reports older than {WATCHLIST_REFRESH_SECONDS / 3600:g}h")
+        for company in watch.companies():
+            ages = []
+            for kind in ANALYSIS_KINDS:
+                entry = get_cached_report(company.name, kind, company.shared_research)
+                ages.append(f"{kind} {format_age(entry.age_seconds) if entry else 'missing'}")
+            print(f"{company.name}{' (shared research)' if company.shared_research else ''}: " + ", ".join(ages))
+        for record in watch.refreshes(20):
+            stale = "new report" if record.staleness_seconds is None else f"replaced one from {format_age(record.staleness_seconds)}"
+            outcome = f"failed - {record.error}" if record.error else f"{record.seconds:.1f}s, {stale}"
+            print(f"  {datetime.fromtimestamp(record.started_at):%m-%d %H:%M} {record.company_name} / {record.kind}: {outcome}")
+        return 0
+
+    from dotenv import load_dotenv
+
+    from .telemetry import start_metrics_server
+
+    load_dotenv()
+    start_metrics_server()
+    openai_key, firecrawl_key = os.getenv("OPENAI_API_KEY", ""), os.getenv("FIRECRAWL_API_KEY", "")
+    if not openai_key or not firecrawl_key:
+        parser.error("OPENAI_API_KEY and FIRECRAWL_API_KEY must be set (environment or .env)")
+    if args.command == "run":
+        records = refresh_due(watch, openai_key, firecrawl_key, max(1, args.workers), retry_failed_after=0)
+        failed = sum(1 for record in records if record.error)
+        _log(f"refreshed {len(records) - failed}, failed {failed}")
+        return 1 if failed else 0
+    scheduler = WatchlistScheduler(openai_key, firecrawl_key, window, workers=max(1, args.workers))
+    _log(f"serving: refreshing in {WATCHLIST_WINDOW} with {scheduler.workers} workers")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
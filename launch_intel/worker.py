@@ -0,0 +1,121 @@
+"""Analysis worker process: runs the jobs the app queues when ``BI_EXTERNAL_WORKERS`` is on.
+
+    python -m launch_intel.worker [--threads 4]
+
+Start as many as the machine (or several machines sharing ``BI_CACHE_DIR``)
+can take. Each claims queued jobs from the shared SQLite job table and runs
+the full pipeline (research, bullets and the expanded report), streaming
+partial text and the result back through the table for the app to render.
+Workers use their own ``OPENAI_API_KEY`` / ``FIRECRAWL_API_KEY`` (environment
+or ``.env``), and each has its own rate limiters. Ctrl-C or SIGTERM stops
+claiming and lets running jobs finish.
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import uuid
+from datetime import datetime
+
+from .jobs import HEARTBEAT_SECONDS, MAX_CONCURRENT_JOBS, JobManager
+
+POLL_SECONDS = 0.5
+
+
+class Worker:
+    def __init__(self, openai_key: str, firecrawl_key: str, threads: int = MAX_CONCURRENT_JOBS):
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.openai_key = openai_key
+        self.firecrawl_key = firecrawl_key
+        self.threads = threads
+        self.manager = JobManager(external=True)
+        self.stopping = threading.Event()
+        self.stats = {"done": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def _work(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                job = self.manager.claim(self.id)
+                if job is None:
+                    self.stopping.wait(POLL_SECONDS)
+                    continue
+                self.manager.run(job, self.openai_key, self.firecrawl_key)
+                outcome = self.manager.get(job.id)
+            except Exception as e:
+                # E.g. the job table stayed locked past SQLite's busy timeout; keep the thread and try again
+                _log(f"job loop error: {type(e).__name__}: {e}")
+                self.stopping.wait(POLL_SECONDS)
+                continue
+            if outcome is None:
+                _log(f"{job.company_name} / {job.kind}: finished, but the job was purged before its outcome was read")
+                continue
+            with self._lock:
+                self.stats["failed" if outcome.error else "done"] += 1
+            _log(f"{job.company_name} / {job.kind}: {outcome.status}"
+                 f"{f' - {outcome.error}' if outcome.error else f' in {outcome.finished_at - job.started_at:.1f}s'}")
+
+    def _heartbeat(self) -> None:
+        while True:
+            reaped = self.manager.heartbeat(self.id, self.threads)
+            if reaped:
+                _log(f"failed {reaped} jobs left running by a stopped worker")
+            if self.stopping.wait(HEARTBEAT_SECONDS):
+                return
+
+    def run(self) -> None:
+        """Work until ``stopping`` is set, then finish the jobs in hand."""
+        from .agents import lease_agents
+
+        # Unlike the app, a worker has no first paint to protect: pay agno's import before taking jobs
+        with lease_agents(self.openai_key, self.firecrawl_key):
+            pass
+        self.manager.heartbeat(self.id, self.threads)
+        threads = [threading.Thread(target=self._work, name=f"worker-{i}") for i in range(self.threads)]
+        heartbeat = threading.Thread(target=self._heartbeat, name="worker-heartbeat", daemon=True)
+        for thread in threads + [heartbeat]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.manager.retire(self.id)
+
+
+def _log(message: str) -> None:
+    print(f"[worker {datetime.now():%H:%M:%S}] {message}", file=sys.stderr, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m launch_intel.worker", description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=MAX_CONCURRENT_JOBS, help="jobs this worker runs at once")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    from .telemetry import start_metrics_server
+
+    load_dotenv()
+    start_metrics_server()
+    openai_key, firecrawl_key = os.getenv("OPENAI_API_KEY", ""), os.getenv("FIRECRAWL_API_KEY", "")
+    if not openai_key or not firecrawl_key:
+        parser.error("OPENAI_API_KEY and FIRECRAWL_API_KEY must be set (environment or .env)")
+
+    worker = Worker(openai_key, firecrawl_key, max(1, args.threads))
+
+    def stop(*_):
+        if not worker.stopping.is_set():
+            _log("stopping: finishing running jobs")
+        worker.stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    _log(f"{worker.id} ready with {worker.threads} threads on {worker.manager.path}")
+    worker.run()
+    _log(f"done={worker.stats['done']} failed={worker.stats['failed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
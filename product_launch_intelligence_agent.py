@@ -1,11 +1,30 @@
-﻿import streamlit as st
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from agno.tools.firecrawl import FirecrawlTools
-from dotenv import load_dotenv
-from datetime import datetime
-from textwrap import dedent
+﻿import time
+
+# Taken before any other import so rerun timings include the whole script
+_rerun_started = time.perf_counter()
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from pathlib import Path
+from typing import Optional
 import os
+import re
+
+from launch_intel.compare import COMPARE_MAX_COMPANIES, cached_matrix_row, parse_companies, render_matrix
+from launch_intel.firecrawl_cache import page_cache_stats
+from launch_intel.http_pool import connection_stats
+from launch_intel.jobs import DONE, EXTERNAL_WORKERS, FAILED, job_manager
+from launch_intel.manifest import last_refresh
+from launch_intel.pipeline import ANALYSIS_KINDS
+from launch_intel.prefetch import PREFETCH_ENABLED, prefetcher
+from launch_intel.packer import compaction_summary, last_compaction
+from launch_intel.profiling import record_rerun, record_ttft, rerun_summary, ttft_summary
+from launch_intel.ratelimit import limiter_stats
+from launch_intel.report_cache import format_age, get_cached_report
+from launch_intel.report_store import report_store
+from launch_intel.singleflight import analysis_flights
+from launch_intel.telemetry import last_trace, latency_percentiles, prompt_cache_ratios, start_metrics_server
+from launch_intel.watchlist import WATCHLIST_WINDOW, start_scheduler, watchlist
 
 st.set_page_config(
     page_title="AI Business Intelligence Platform",
@@ -14,155 +33,27 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for AI Business Intelligence styling
-st.markdown("""
-<style>
-    /* Import Inter font */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    /* Main app styling */
-    .main .block-container {
-        padding-top: 2rem;
-        max-width: 1400px;
-    }
-    
-    /* Custom header styling */
-    .custom-header {
-        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-        padding: 40px;
-        border-radius: 24px;
-        margin-bottom: 30px;
-        border: 1px solid #334155;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .custom-header::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(135deg, #00d4ff 0%, #0ea5e9 100%);
-    }
-    
-    .header-content {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        gap: 30px;
-    }
-    
-    .header-text h1 {
-        font-size: 3.5rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, #00d4ff 0%, #0ea5e9 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 12px;
-        line-height: 1.2;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .header-text p {
-        font-size: 1.2rem;
-        color: #e2e8f0;
-        font-weight: 400;
-        max-width: 600px;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .logo-container img {
-        width: 200px;
-        height: auto;
-        border-radius: 12px;
-        transition: transform 0.3s ease;
-    }
-    
-    .logo-container img:hover {
-        transform: scale(1.05);
-    }
-    
-    /* Hide default Streamlit header */
-    header[data-testid="stHeader"] {
-        display: none;
-    }
-    
-    /* Style the sidebar */
-    .css-1d391kg {
-        background-color: #1a1a2e;
-    }
-    
-    /* Custom input styling */
-    .stTextInput > div > div > input {
-        background-color: #16213e;
-        border: 2px solid #334155;
-        border-radius: 12px;
-        color: white;
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #00d4ff;
-        box-shadow: 0 0 0 3px rgba(0, 212, 255, 0.1);
-    }
-    
-    /* Custom button styling */
-    .stButton > button {
-        background: linear-gradient(135deg, #00d4ff 0%, #0ea5e9 100%);
-        color: white;
-        border: none;
-        border-radius: 12px;
-        font-weight: 600;
-        font-family: 'Inter', sans-serif;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #00b8e6 0%, #0284c7 100%);
-        transform: translateY(-2px);
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background-color: #16213e;
-        border: 1px solid #334155;
-        border-radius: 12px;
-        color: #e2e8f0;
-        font-family: 'Inter', sans-serif;
-        font-weight: 500;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #00d4ff 0%, #0ea5e9 100%);
-        color: white;
-    }
-    
-    /* Success/warning styling */
-    .stSuccess {
-        background-color: rgba(34, 197, 94, 0.1);
-        border: 1px solid rgba(34, 197, 94, 0.2);
-        border-radius: 12px;
-        color: #22c55e;
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-    }
-    
-    .css-1d391kg .stMarkdown {
-        color: #e2e8f0;
-        font-family: 'Inter', sans-serif;
-    }
-</style>
-""", unsafe_allow_html=True)
+STYLESHEET = Path(__file__).with_name("static") / "app.css"
+
+@st.cache_resource(show_spinner=False)
+def load_environment() -> None:
+    """Read .env once per server process rather than on every rerun."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    start_metrics_server()
+    # Off-peak watchlist refreshes in this process, only with BI_WATCHLIST_SCHEDULER and keys in the environment
+    start_scheduler(os.getenv("OPENAI_API_KEY", ""), os.getenv("FIRECRAWL_API_KEY", ""))
+
+@st.cache_resource(show_spinner=False)
+def stylesheet_markup() -> str:
+    """The stylesheet as one <style> block without comments or indentation, read once per server process."""
+    css = re.sub(r"/\*.*?\*/", "", STYLESHEET.read_text(encoding="utf-8"), flags=re.DOTALL)
+    return "<style>" + re.sub(r"\s+", " ", css).strip() + "</style>"
+
+# Inlined rather than linked: Streamlit's static file serving sends .css as text/plain with nosniff,
+# so browsers would drop a <link>ed stylesheet. Fragment reruns (tabs, sidebar) never re-send it
+st.markdown(stylesheet_markup(), unsafe_allow_html=True)
 
 # Custom header with AI Business Intelligence branding
 st.markdown("""
@@ -179,7 +70,7 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-load_dotenv()
+load_environment()
 
 st.sidebar.header("🔑 API Configuration")
 with st.sidebar.container():
@@ -197,13 +88,31 @@ with st.sidebar.container():
         help="Required for web search and crawling"
     )
 
-# Set environment variables
-if openai_key:
-    os.environ["OPENAI_API_KEY"] = openai_key
-if firecrawl_key:
-    os.environ["FIRECRAWL_API_KEY"] = firecrawl_key
+    shared_research = st.toggle(
+        "🧭 Shared research stage",
+        value=os.getenv("BI_SHARED_RESEARCH", "").lower() in ("1", "true", "yes"),
+        help="Run one consolidated Firecrawl research pass per company and let all three analysts write from it"
+    )
 
-# Initialize session state
+    prefetch_enabled = st.toggle(
+        "🔮 Prefetch research",
+        value=PREFETCH_ENABLED,
+        disabled=not shared_research,
+        help="Start the shared research searches as soon as a company is entered, so an analysis starts warm"
+    )
+
+    stream_reports = st.toggle(
+        "⚡ Stream reports",
+        value=os.getenv("BI_STREAM_REPORTS", "1").lower() in ("1", "true", "yes"),
+        help="Show each report as it is being written instead of waiting for the full text"
+    )
+
+    force_refresh = st.checkbox(
+        "🔄 Force refresh",
+        help="Ignore cached reports and re-run the analysts (the fresh result replaces the cached one)"
+    )
+
+# Initialize session state; *_response holds a report store handle, never the report text
 if 'competitor_response' not in st.session_state:
     st.session_state.competitor_response = None
 if 'sentiment_response' not in st.session_state:
@@ -211,302 +120,524 @@ if 'sentiment_response' not in st.session_state:
 if 'metrics_response' not in st.session_state:
     st.session_state.metrics_response = None
 
-# Create agents only if API keys are provided
-if openai_key and firecrawl_key:
-    launch_analyst = Agent(
-        name="Product Launch Analyst",
-        description=dedent("""
-        You are a senior Go-To-Market strategist who evaluates competitor product launches with a critical, evidence-driven lens.
-        
-        Your objective is to uncover:
-        â€¢ How the product is positioned in the market
-        â€¢ Which launch tactics drove success (strengths)  
-        â€¢ Where execution fell short (weaknesses)
-        â€¢ Actionable learnings competitors can leverage
-        
-        Always cite observable signals (messaging, pricing actions, channel mix, timing, engagement metrics). Maintain a crisp, executive tone and focus on strategic value.
-        
-        IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
-        """),
-        model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[FirecrawlTools(search=True, crawl=True, poll_interval=10)],
-        show_tool_calls=True,
-        markdown=True,
-        exponential_backoff=True,
-        delay_between_retries=2,
-    )
+# Agents are cached per credential fingerprint and leased per analysis, so a rerun builds nothing; bundles
+# for keys a session has replaced stay available to other sessions until they age out
+keys_entered = bool(openai_key and firecrawl_key)
+# External workers run analyses with their own keys; this process only queues jobs and renders results
+agents_ready = keys_entered or EXTERNAL_WORKERS
 
-    sentiment_analyst = Agent(
-        name="Market Sentiment Specialist",
-        description=dedent("""
-        You are a market research expert specializing in sentiment analysis and consumer perception tracking.
-        
-        Your expertise includes:
-        â€¢ Analyzing social media sentiment and customer feedback
-        â€¢ Identifying positive and negative sentiment drivers
-        â€¢ Tracking brand perception trends across platforms  
-        â€¢ Monitoring customer satisfaction and review patterns
-        â€¢ Providing actionable insights on market reception
-        
-        Focus on extracting sentiment signals from social platforms, review sites, forums, and customer feedback channels.
-        
-        IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
-        """),
-        model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[FirecrawlTools(search=True, crawl=True, poll_interval=10)],
-        show_tool_calls=True,
-        markdown=True,
-        exponential_backoff=True,
-        delay_between_retries=2,
-    )
+JOB_POLL_SECONDS = 1.0
 
-    metrics_analyst = Agent(
-        name="Launch Metrics Specialist",
-        description=dedent("""
-        You are a product launch performance analyst who specializes in tracking and analyzing launch KPIs.
-        
-        Your focus areas include:
-        â€¢ User adoption and engagement metrics
-        â€¢ Revenue and business performance indicators
-        â€¢ Market penetration and growth rates
-        â€¢ Press coverage and media attention analysis
-        â€¢ Social media traction and viral coefficient tracking
-        â€¢ Competitive market share analysis
-        
-        Always provide quantitative insights with context and benchmark against industry standards when possible.
-        
-        IMPORTANT: Conclude your report with a 'Sources:' section, listing all URLs of websites you crawled or searched for this analysis.
-        """),
-        model=OpenAIChat(id="gpt-4o-mini"),
-        tools=[FirecrawlTools(search=True, crawl=True, poll_interval=10)],
-        show_tool_calls=True,
-        markdown=True,
-        exponential_backoff=True,
-        delay_between_retries=2,
-    )
-else:
-    launch_analyst = None
-    sentiment_analyst = None
-    metrics_analyst = None
-
-def expand_competitor_report(bullet_text: str, competitor: str) -> str:
-    if not launch_analyst:
-        st.error("âš ï¸ Please enter both API keys in the sidebar first.")
-        return ""
-    
-    prompt = (
-        f"Transform the insight bullets below into a professional launch review for product managers analysing {competitor}.\n\n"
-        f"Produce well-structured **Markdown** with a mix of tables, call-outs and concise bullet points --- avoid long paragraphs.\n\n"
-        f"=== FORMAT SPECIFICATION ===\n"
-        f"# {competitor} -- Launch Review\n\n"
-        f"## 1. Market & Product Positioning\n"
-        f"â€¢ Bullet point summary of how the product is positioned (max 6 bullets).\n\n"
-        f"## 2. Launch Strengths\n"
-        f"| Strength | Evidence / Rationale |\n|---|---|\n| ... | ... | (add 4-6 rows)\n\n"
-        f"## 3. Launch Weaknesses\n"
-        f"| Weakness | Evidence / Rationale |\n|---|---|\n| ... | ... | (add 4-6 rows)\n\n"
-        f"## 4. Strategic Takeaways for Competitors\n"
-        f"1. ... (max 5 numbered recommendations)\n\n"
-        f"=== SOURCE BULLETS ===\n{bullet_text}\n\n"
-        f"Guidelines:\n"
-        f"â€¢ Populate the tables with specific points derived from the bullets.\n"
-        f"â€¢ Only include rows that contain meaningful data; omit any blank entries."
-    )
-    
-    resp = launch_analyst.run(prompt)
-    return resp.content if hasattr(resp, "content") else str(resp)
+def load_cached_report(kind: str) -> bool:
+    if force_refresh:
+        return False
+    entry = get_cached_report(company_name, kind, shared_research)
+    if entry is None:
+        return False
+    keep_report(kind, entry.value.decode("utf-8"), {"source": "cache", "created_at": entry.created_at})
+    st.session_state[f"{kind}_error"] = None
+    return True
 
-def expand_sentiment_report(bullet_text: str, competitor: str) -> str:
-    if not sentiment_analyst:
-        st.error("âš ï¸ Please enter both API keys in the sidebar first.")
-        return ""
-    
-    prompt = (
-        f"Transform the sentiment bullets below into a comprehensive market sentiment report for {competitor}.\n\n"
-        f"Create well-structured **Markdown** with tables, metrics, and clear insights.\n\n"
-        f"=== SOURCE BULLETS ===\n{bullet_text}"
-    )
-    
-    resp = sentiment_analyst.run(prompt)
-    return resp.content if hasattr(resp, "content") else str(resp)
+def keep_report(kind: str, report: str, meta: dict) -> None:
+    """Hand the report to the shared store and keep only its handle in the session."""
+    st.session_state[f"{kind}_response"] = report_store().put(report)
+    st.session_state[f"{kind}_meta"] = {**meta, "company": company_name, "shared_research": shared_research}
 
-def expand_metrics_report(bullet_text: str, competitor: str) -> str:
-    if not metrics_analyst:
-        st.error("âš ï¸ Please enter both API keys in the sidebar first.")
-        return ""
-    
-    prompt = (
-        f"Transform the metrics bullets below into a detailed launch performance report for {competitor}.\n\n"
-        f"Create well-structured **Markdown** with KPI tables, trend analysis, and benchmarks.\n\n"
-        f"=== SOURCE BULLETS ===\n{bullet_text}"
-    )
-    
-    resp = metrics_analyst.run(prompt)
-    return resp.content if hasattr(resp, "content") else str(resp)
+def report_text(kind: str) -> Optional[str]:
+    """Decompress the session's report for rendering, reloading it from the report cache if it was evicted."""
+    report = report_store().get(st.session_state[f"{kind}_response"])
+    if report is None:
+        meta = st.session_state.get(f"{kind}_meta") or {}
+        entry = get_cached_report(meta.get("company", company_name), kind, meta.get("shared_research", shared_research))
+        if entry is None:
+            st.session_state[f"{kind}_response"] = None
+            st.session_state[f"{kind}_error"] = "The report was evicted from memory and has expired; please run it again"
+            return None
+        report = entry.value.decode("utf-8")
+        st.session_state[f"{kind}_response"] = report_store().put(report)
+    return report
+
+def remember_jobs() -> None:
+    """Mirror active job IDs into the URL so a page reload can reattach to them."""
+    active = {kind: st.session_state.get(f"{kind}_job") for kind in ANALYSIS_KINDS}
+    active = {kind: job_id for kind, job_id in active.items() if job_id}
+    if active:
+        st.query_params["jobs"] = ",".join(f"{kind}:{job_id}" for kind, job_id in active.items())
+        st.query_params["company"] = company_name
+    else:
+        for param in ("jobs", "company"):
+            if param in st.query_params:
+                del st.query_params[param]
+
+def submit_job(kind: str) -> str:
+    job_id = job_manager().submit(company_name, kind, openai_key, firecrawl_key, shared_research, force_refresh)
+    st.session_state[f"{kind}_job"] = job_id
+    st.session_state[f"{kind}_error"] = None
+    remember_jobs()
+    return job_id
+
+def collect_job(kind: str):
+    """Fold a finished job into session state; return the job only while it is still queued or running."""
+    job_id = st.session_state.get(f"{kind}_job")
+    if not job_id:
+        return None
+    job = job_manager().get(job_id)
+    if job is not None and job.active:
+        return job
+    st.session_state[f"{kind}_job"] = None
+    if job is None:
+        st.session_state[f"{kind}_error"] = "The analysis job expired before it finished"
+    elif job.status == DONE:
+        keep_report(kind, job.result, {"source": "fresh", "created_at": job.finished_at, "ttft": job.ttft})
+        if job.ttft is not None:
+            record_ttft(st.session_state, kind, job.ttft)
+    else:
+        st.session_state[f"{kind}_error"] = job.error
+    remember_jobs()
+    return None
+
+def any_job_active() -> bool:
+    return any(st.session_state.get(f"{kind}_job") for kind in ANALYSIS_KINDS)
+
+def poll_every(active: bool) -> Optional[float]:
+    """Fragments poll their jobs with ``run_every`` only while something is running."""
+    return JOB_POLL_SECONDS if active else None
+
+def record_fragment_rerun(name: str, started: float) -> None:
+    """Time a fragment's own reruns; as part of a full rerun it is already covered by the script timing."""
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        record_rerun(st.session_state, time.perf_counter() - started, fragment=name)
+
+def render_report(kind: str, slot) -> None:
+    report = report_text(kind)
+    if report is None:
+        slot.error(f"❌ Error: {st.session_state[f'{kind}_error']}")
+        return
+    with slot.container():
+        meta = st.session_state.get(f"{kind}_meta")
+        if meta:
+            age = format_age(time.time() - meta["created_at"])
+            if meta["source"] == "cache":
+                st.caption(f"📦 Cache hit · report generated {age}")
+            else:
+                details = [f"🆕 Cache miss · fresh report generated {age}"]
+                if meta.get("ttft") is not None:
+                    details.append(f"first token after {meta['ttft']:.1f}s")
+                packed = last_compaction(company_name, kind)
+                if packed and packed.tokens_before:
+                    details.append(
+                        f"context {packed.tokens_before / 1000:.1f}k → {packed.tokens_after / 1000:.1f}k tokens"
+                    )
+                refreshed = last_refresh(company_name, kind) if shared_research else None
+                if refreshed and (refreshed.fetches_skipped or refreshed.bullets_reused):
+                    details.append(
+                        f"{refreshed.fetches_skipped} fetches and {refreshed.tokens_skipped / 1000:.1f}k tokens skipped"
+                    )
+                st.caption(" · ".join(details))
+        st.markdown(report)
+
+# Reattach to jobs started before a page reload
+if not st.session_state.get("jobs_restored"):
+    st.session_state.jobs_restored = True
+    for item in st.query_params.get("jobs", "").split(","):
+        kind, _, job_id = item.partition(":")
+        if kind in ANALYSIS_KINDS and job_id:
+            st.session_state[f"{kind}_job"] = job_id
 
 # Company input section
 st.subheader("🏢 Company Analysis")
+# Seeded from the URL once: the widget keeps its identity when the query params change later
+if "company_input" not in st.session_state:
+    st.session_state.company_input = st.query_params.get("company", "")
 with st.container():
     col1, col2 = st.columns([3, 1])
     with col1:
         company_name = st.text_input(
             label="Company Name",
+            key="company_input",
             placeholder="Enter company name (e.g., OpenAI, Tesla, Spotify)",
             help="This company will be analyzed by all three specialized agents",
             label_visibility="collapsed"
         )
     with col2:
         if company_name:
-            st.success(f"âœ“ Ready to analyze **{company_name}**")
+            st.success(f"✓ Ready to analyze **{company_name}**")
 
-# Create tabs for analysis types
-analysis_tabs = st.tabs(["🔍 Competitor Analysis", "💬 Market Sentiment", "📈 Launch Metrics"])
+# Speculative research for the entered company; a new name cancels the previous prefetch
+script_ctx = get_script_run_ctx()
+prefetch_slot = script_ctx.session_id if script_ctx is not None else "local"
+if prefetch_enabled and shared_research and keys_entered and company_name and (
+    force_refresh or not all(get_cached_report(company_name, kind, shared_research) for kind in ANALYSIS_KINDS)
+):
+    prefetcher().schedule(prefetch_slot, company_name, openai_key, firecrawl_key)
+else:
+    prefetcher().cancel(prefetch_slot)
 
-# Competitor Analysis Tab
-with analysis_tabs[0]:
-    if company_name:
-        analyze_btn = st.button(
-            "ðŸš€ Analyze Competitor Strategy",
-            key="competitor_btn",
-            type="primary",
-            use_container_width=True
+def analyze_all_progress() -> None:
+    """Progress of the last "Analyze All" batch; a fragment, so polling it does not rerun the reports."""
+    started = time.perf_counter()
+    batch = st.session_state.get("analyze_all_jobs")
+    if batch:
+        batch_jobs = [job_manager().get(job_id) for job_id in batch.values()]
+        batch_jobs = [job for job in batch_jobs if job is not None]
+        finished = [job for job in batch_jobs if not job.active]
+        if len(finished) < len(batch_jobs):
+            st.progress(len(finished) / len(batch_jobs), text=f"{len(finished)}/{len(batch_jobs)} analyses finished")
+        else:
+            st.session_state.analyze_all_jobs = None
+            done_jobs = [job for job in finished if job.status == DONE]
+            if done_jobs:
+                # Overlapping job times are no serial baseline; bench_pipeline.py --serial measures that
+                st.session_state.parallel_timing = {
+                    "wall": max(job.finished_at for job in done_jobs) - min(job.created_at for job in done_jobs),
+                    "longest": max(job.finished_at - job.started_at for job in done_jobs),
+                    "jobs": len(done_jobs),
+                }
+    if st.session_state.get("parallel_timing"):
+        timing = st.session_state.parallel_timing
+        st.caption(
+            f"Last parallel run: {timing['jobs']} analyses in {timing['wall']:.1f}s wall-clock; "
+            f"the longest took {timing['longest']:.1f}s"
         )
-        
-        if analyze_btn:
-            if not launch_analyst:
-                st.error("âš ï¸ Please enter both API keys in the sidebar first.")
-            else:
-                with st.spinner("ðŸ” Launch Analyst gathering competitive intelligence..."):
-                    try:
-                        bullets = launch_analyst.run(
-                            f"Generate up to 16 evidence-based insight bullets about {company_name}'s most recent product launches.\n"
-                            f"Format requirements:\n"
-                            f"â€¢ Start every bullet with exactly one tag: Positioning | Strength | Weakness | Learning\n"
-                            f"â€¢ Follow the tag with a concise statement (max 30 words) referencing concrete observations: messaging, differentiation, pricing, channel selection, timing, engagement metrics, or customer feedback."
-                        )
-                        
-                        long_text = expand_competitor_report(
-                            bullets.content if hasattr(bullets, "content") else str(bullets),
-                            company_name
-                        )
-                        st.session_state.competitor_response = long_text
-                        st.success("âœ… Competitor analysis ready")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"âŒ Error: {e}")
-    
-    # Display results
-    if st.session_state.competitor_response:
-        st.markdown(st.session_state.competitor_response)
+    record_fragment_rerun("analyze_all", started)
+
+# Analyze-all submits the three pipelines as parallel jobs and each tab fills as its job finishes
+if company_name:
+    analyze_all_btn = st.button(
+        "⚡ Analyze All (parallel)",
+        key="analyze_all_btn",
+        use_container_width=True
+    )
+    if analyze_all_btn:
+        if not agents_ready:
+            st.error("⚠️ Please enter both API keys in the sidebar first.")
+        else:
+            batch = {}
+            for kind in ANALYSIS_KINDS:
+                if st.session_state.get(f"{kind}_job"):
+                    batch[kind] = st.session_state[f"{kind}_job"]
+                elif not load_cached_report(kind):
+                    batch[kind] = submit_job(kind)
+            st.session_state.analyze_all_jobs = batch
+    st.fragment(analyze_all_progress, run_every=poll_every(bool(st.session_state.get("analyze_all_jobs"))))()
+else:
+    analyze_all_btn = False
 
-# Market Sentiment Tab
-with analysis_tabs[1]:
+ANALYSIS_TABS = [
+    ("competitor", "🔍 Competitor Analysis", "🚀 Analyze Competitor Strategy",
+     "🔍 Launch Analyst gathering competitive intelligence..."),
+    ("sentiment", "💬 Market Sentiment", "💬 Analyze Market Sentiment",
+     "💬 Sentiment Specialist analyzing market perception..."),
+    ("metrics", "📈 Launch Metrics", "📈 Analyze Launch Metrics",
+     "📈 Metrics Specialist tracking launch performance..."),
+]
+
+def analysis_tab(kind: str, button_label: str, running_text: str) -> None:
+    """One analysis tab. It runs as a fragment, so its button, job polling and report rerun only this tab."""
+    started = time.perf_counter()
+    was_running = bool(st.session_state.get(f"{kind}_job"))
+    job = collect_job(kind)
+    if was_running and job is None and not any_job_active():
+        # The session's last job just finished: one full rerun refreshes the sidebar and stops every poller
+        st.rerun()
     if company_name:
         analyze_btn = st.button(
-            "ðŸ’¬ Analyze Market Sentiment",
-            key="sentiment_btn",
+            button_label,
+            key=f"{kind}_btn",
             type="primary",
-            use_container_width=True
+            use_container_width=True,
+            disabled=job is not None
         )
-        
+
         if analyze_btn:
-            if not sentiment_analyst:
-                st.error("âš ï¸ Please enter both API keys in the sidebar first.")
+            if not agents_ready:
+                st.error("⚠️ Please enter both API keys in the sidebar first.")
             else:
-                with st.spinner("ðŸ’¬ Sentiment Specialist analyzing market perception..."):
-                    try:
-                        bullets = sentiment_analyst.run(
-                            f"Analyze market sentiment for {company_name} across social media, reviews, and customer feedback channels. "
-                            f"Provide specific sentiment signals, positive/negative drivers, and actionable insights."
-                        )
-                        
-                        long_text = expand_sentiment_report(
-                            bullets.content if hasattr(bullets, "content") else str(bullets),
-                            company_name
-                        )
-                        st.session_state.sentiment_response = long_text
-                        st.success("âœ… Sentiment analysis ready")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"âŒ Error: {e}")
-    
-    # Display results
-    if st.session_state.sentiment_response:
-        st.markdown(st.session_state.sentiment_response)
+                had_report = bool(st.session_state[f"{kind}_response"])
+                if not load_cached_report(kind):
+                    submit_job(kind)
+                    st.rerun()  # Full rerun so this tab starts polling and the sidebar shows the job
+                elif not had_report:
+                    st.rerun()  # The sidebar's analysis status changes
 
-# Launch Metrics Tab
-with analysis_tabs[2]:
-    if company_name:
-        analyze_btn = st.button(
-            "ðŸ“ˆ Analyze Launch Metrics",
-            key="metrics_btn",
-            type="primary",
-            use_container_width=True
-        )
-        
-        if analyze_btn:
-            if not metrics_analyst:
-                st.error("âš ï¸ Please enter both API keys in the sidebar first.")
+    # Display job progress or results
+    if job is not None:
+        st.info(f"{running_text} ({job.status}, {time.time() - job.created_at:.0f}s)")
+    elif st.session_state.get(f"{kind}_error"):
+        st.error(f"❌ Error: {st.session_state[f'{kind}_error']}")
+    result_slot = st.empty()
+    if job is not None:
+        if stream_reports and job.partial:
+            result_slot.markdown(job.partial + " ▌")
+    elif st.session_state[f"{kind}_response"]:
+        render_report(kind, result_slot)
+    record_fragment_rerun(kind, started)
+
+# Create tabs for analysis types
+*analysis_tabs, compare_tab = st.tabs([tab_label for _, tab_label, _, _ in ANALYSIS_TABS] + ["⚖️ Compare Competitors"])
+
+for tab, (kind, _, button_label, running_text) in zip(analysis_tabs, ANALYSIS_TABS):
+    with tab:
+        running = bool(st.session_state.get(f"{kind}_job"))
+        st.fragment(analysis_tab, run_every=poll_every(running))(kind, button_label, running_text)
+
+def compare_active() -> bool:
+    jobs = st.session_state.get("compare_jobs") or {}
+    return any(job is not None and job.active for job in map(job_manager().get, filter(None, jobs.values())))
+
+def comparison_tab() -> None:
+    """Several competitors side by side. A fragment, so polling their jobs only reruns this tab."""
+    started = time.perf_counter()
+    if st.session_state.get("compare_running") and not compare_active():
+        # The comparison's last job just finished: one full rerun stops this tab's polling
+        st.session_state.compare_running = False
+        st.rerun()
+    st.markdown(
+        f"Compare up to {COMPARE_MAX_COMPANIES} competitors. Each gets a competitor analysis, run in parallel "
+        "within the job limit, and the matrix fills in as each one finishes."
+    )
+    companies_text = st.text_area(
+        "Companies to compare",
+        key="compare_input",
+        placeholder="Notion, Coda, Confluence",
+        help="Comma- or newline-separated company names",
+        height=80
+    )
+    compare_btn = st.button(
+        "⚖️ Compare",
+        key="compare_btn",
+        type="primary",
+        use_container_width=True,
+        disabled=compare_active()
+    )
+    if compare_btn:
+        companies = parse_companies(companies_text)
+        if not agents_ready:
+            st.error("⚠️ Please enter both API keys in the sidebar first.")
+        elif len(companies) < 2:
+            st.error("⚠️ Enter at least two companies to compare.")
+        elif len(companies) > COMPARE_MAX_COMPANIES:
+            st.error(f"⚠️ Compare at most {COMPARE_MAX_COMPANIES} companies at a time.")
+        else:
+            # Companies with a cached analysis need no job; the rest share the global job limit
+            st.session_state.compare_jobs = {
+                company: None if not force_refresh and cached_matrix_row(company, shared_research) is not None
+                else job_manager().submit(company, "competitor", openai_key, firecrawl_key, shared_research, force_refresh)
+                for company in companies
+            }
+            st.session_state.compare_shared_research = shared_research
+            st.session_state.compare_running = any(st.session_state.compare_jobs.values())
+            st.rerun()  # Full rerun so this tab starts polling
+
+    jobs = st.session_state.get("compare_jobs") or {}
+    if jobs:
+        rows, progress, done_jobs = {}, [], []
+        for company, job_id in jobs.items():
+            job = job_manager().get(job_id) if job_id else None
+            if job is not None and job.active:
+                rows[company] = None
+                progress.append(f"⏳ {company} ({job.status}, {time.time() - job.created_at:.0f}s)")
+            elif job is not None and job.status == FAILED:
+                progress.append(f"❌ {company}: {job.error}")
             else:
-                with st.spinner("ðŸ“ˆ Metrics Specialist tracking launch performance..."):
-                    try:
-                        bullets = metrics_analyst.run(
-                            f"Track and analyze launch performance metrics for {company_name}. "
-                            f"Focus on adoption rates, engagement metrics, press coverage, and competitive benchmarks."
-                        )
-                        
-                        long_text = expand_metrics_report(
-                            bullets.content if hasattr(bullets, "content") else str(bullets),
-                            company_name
-                        )
-                        st.session_state.metrics_response = long_text
-                        st.success("âœ… Metrics analysis ready")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"âŒ Error: {e}")
-    
-    # Display results
-    if st.session_state.metrics_response:
-        st.markdown(st.session_state.metrics_response)
+                rows[company] = cached_matrix_row(company, st.session_state.get("compare_shared_research", False))
+                if rows[company] is None:
+                    del rows[company]
+                    progress.append(f"❌ {company}: the analysis expired before it was shown")
+                elif job is not None:
+                    done_jobs.append(job)
+                    progress.append(f"✅ {company} ({job.finished_at - job.created_at:.0f}s)")
+                else:
+                    progress.append(f"📦 {company} (cached)")
+        finished = sum(1 for item in progress if not item.startswith("⏳"))
+        st.progress(finished / len(jobs), text=f"{finished} of {len(jobs)} companies analysed")
+        st.caption(" · ".join(progress))
+        if finished == len(jobs) and len(done_jobs) > 1:
+            wall = max(job.finished_at for job in done_jobs) - min(job.created_at for job in done_jobs)
+            longest = max(job.finished_at - job.started_at for job in done_jobs)
+            st.caption(f"{len(done_jobs)} analyses in {wall:.1f}s wall-clock; the longest took {longest:.1f}s")
+        if rows:
+            matrix = render_matrix(rows)
+            st.markdown(matrix, unsafe_allow_html=True)
+            if finished == len(jobs):
+                st.download_button(
+                    "📥 Download comparison (Markdown)",
+                    matrix.replace("<br>", " "),
+                    file_name="competitor_comparison.md",
+                    mime="text/markdown"
+                )
+    record_fragment_rerun("compare", started)
+
+with compare_tab:
+    st.fragment(comparison_tab, run_every=poll_every(compare_active()))()
 
 # Sidebar status
-with st.sidebar.container():
-    st.markdown("### 🤖 System Status")
-    if openai_key and firecrawl_key:
-        st.success("✅ All agents ready")
-    else:
-        st.error("âŒ API keys required")
+def sidebar_status() -> None:
+    """System and analysis status. A fragment, so it can poll while jobs run without rerunning the reports."""
+    started = time.perf_counter()
+    with st.container():
+        st.markdown("### 🤖 System Status")
+        job_stats = job_manager().stats()
+        if EXTERNAL_WORKERS:
+            if job_stats["workers"]:
+                st.success(f"✅ {job_stats['workers']} analysis workers connected")
+            else:
+                st.warning("⚠️ No analysis workers running; jobs stay queued until one starts")
+        elif agents_ready:
+            st.success("✅ All agents ready")
+        else:
+            st.error("❌ API keys required")
+        st.caption(
+            f"🧵 Jobs: {job_stats['running']} running · {job_stats['queued']} queued "
+            f"(limit {job_stats['limit']} concurrent)"
+        )
+        flights = analysis_flights.summary()
+        if flights["coalesced"]:
+            st.caption(
+                f"🔗 Coalesced: {flights['coalesced']} requests joined an identical analysis in flight "
+                f"instead of running their own · {flights['following']} waiting now"
+            )
+        ttft = ttft_summary(st.session_state)
+        if ttft:
+            st.caption(
+                f"✍️ First report token: last {ttft['last_s']:.1f}s · median {ttft['median_s']:.1f}s ({ttft['count']} reports)"
+            )
+        crawl_stats = page_cache_stats()
+        if crawl_stats["calls_made"] or crawl_stats["calls_saved"]:
+            st.caption(
+                f"🗂️ Firecrawl cache: {crawl_stats['calls_saved']} of "
+                f"{crawl_stats['calls_saved'] + crawl_stats['calls_made']} calls saved"
+                + (f" ({crawl_stats['calls_shared']} shared in flight)" if crawl_stats["calls_shared"] else "")
+                + " · "
+                f"{crawl_stats['bytes_saved'] / 1_048_576:.1f} MB not re-fetched"
+            )
+        connections = connection_stats()
+        if any(api["requests"] for api in connections.values()):
+            st.caption(
+                "🔌 Connections reused: " + " · ".join(
+                    f"{name} {api['reuse_rate']:.0%} of {api['requests']}"
+                    for name, api in (("OpenAI", connections["openai"]), ("Firecrawl", connections["firecrawl"]))
+                    if api["requests"]
+                ) + f" · {sum(api['seconds_saved'] for api in connections.values()):.1f}s of handshakes saved"
+            )
+        prefetch = prefetcher().summary()
+        if prefetch["scheduled"]:
+            st.caption(
+                f"🔮 Prefetch: {prefetch['calls_used']} of {prefetch['calls_used'] + prefetch['calls_wasted']} "
+                f"prefetched searches used ({prefetch['hit_rate']:.0%}) · {prefetch['seconds_wasted']:.1f}s of Firecrawl "
+                f"time wasted · {prefetch['outstanding']} pending · {prefetch['cancelled']} cancelled"
+            )
+        watched = watchlist().companies()
+        if watched:
+            refreshes = watchlist().refreshes(limit=1)
+            last = (
+                f"last refresh {format_age(time.time() - refreshes[0].started_at)} ({refreshes[0].seconds:.0f}s)"
+                if refreshes else "no refreshes yet"
+            )
+            st.caption(f"📅 Watchlist: {len(watched)} companies refreshed {WATCHLIST_WINDOW} · {last}")
+        traces = [(kind, last_trace(company_name, kind)) for kind in ANALYSIS_KINDS] if company_name else []
+        traces = [(kind, trace) for kind, trace in traces if trace and not trace.cached]
+        percentiles = latency_percentiles()
+        if traces or percentiles:
+            with st.expander("📐 Stage breakdown"):
+                for kind, trace in traces:
+                    parts = []
+                    for item in trace.stages:
+                        detail = f"{item.name} {item.seconds:.1f}s"
+                        extras = []
+                        if item.tool_calls:
+                            extras.append(f"{len(item.tool_calls)} tools {item.tool_seconds:.1f}s")
+                        if item.model_calls:
+                            extras.append(f"{item.prompt_tokens / 1000:.1f}k→{item.completion_tokens / 1000:.1f}k tok")
+                        if item.cached_tokens:
+                            extras.append(f"{item.cached_tokens / item.prompt_tokens:.0%} cached")
+                        if item.retries:
+                            extras.append(f"{item.retries} retries")
+                        parts.append(detail + (f" ({', '.join(extras)})" if extras else ""))
+                    st.caption(f"**{kind.title()}** {trace.seconds:.1f}s: " + " · ".join(parts))
+                for kind, stats in percentiles.items():
+                    st.caption(f"{kind.title()} p50 {stats['p50']:.1f}s · p95 {stats['p95']:.1f}s ({stats['count']} runs)")
+                for kind, ratios in prompt_cache_ratios().items():
+                    st.caption(
+                        f"{kind.title()} prompt cache: " + " · ".join(f"{name} {ratio:.0%}" for name, ratio in ratios.items())
+                    )
+        packing = compaction_summary()
+        if packing["runs"]:
+            st.caption(
+                f"🧹 Context packing: {packing['tokens_before'] / 1000:.1f}k → {packing['tokens_after'] / 1000:.1f}k "
+                f"tokens over {packing['runs']} runs"
+            )
+        store = report_store().usage()
+        if store["entries"]:
+            st.caption(
+                f"🗜️ Report store: {store['entries']} reports · {store['compressed_bytes'] / 1_048_576:.1f} of "
+                f"{store['max_bytes'] / 1_048_576:.0f} MB ({store['raw_bytes'] / max(store['compressed_bytes'], 1):.1f}x "
+                f"compressed) · {store['evictions']} evicted"
+            )
+        limits = limiter_stats()
+        waiting = sum(bucket["waiting"] for bucket in limits.values())
+        throttled = sum(bucket["waits"] for bucket in limits.values())
+        if waiting or throttled:
+            slowest = max(limits.values(), key=lambda bucket: bucket["last_wait"])
+            st.caption(
+                f"🚦 Rate limits: {limits['openai_requests']['waiting'] + limits['openai_tokens']['waiting']} waiting on OpenAI · "
+                f"{limits['firecrawl_jobs']['waiting']} on Firecrawl · last wait {slowest['last_wait']:.1f}s · "
+                f"{sum(bucket['wait_seconds'] for bucket in limits.values()):.0f}s queued in total"
+            )
 
-# Analysis status
-if company_name:
-    with st.sidebar.container():
-        st.markdown("### 📊 Analysis Status")
-        st.markdown(f"**Company:** {company_name}")
+    if company_name:
+        with st.container():
+            st.markdown("### 📊 Analysis Status")
+            st.markdown(f"**Company:** {company_name}")
+            if watchlist().contains(company_name):
+                st.button(
+                    "⭐ On the watchlist · remove", key="watchlist_remove",
+                    on_click=watchlist().remove, args=(company_name,),
+                    help=f"Its reports are refreshed off-peak ({WATCHLIST_WINDOW}) so they are ready when opened",
+                )
+            else:
+                st.button(
+                    "☆ Add to watchlist", key="watchlist_add",
+                    on_click=watchlist().add, args=(company_name, shared_research),
+                    help=f"Refresh this company's reports off-peak ({WATCHLIST_WINDOW}) so they are ready when opened",
+                )
         
-        status_items = [
-            ("ðŸ”", "Competitor Analysis", st.session_state.get('competitor_response')),
-            ("ðŸ’¬", "Sentiment Analysis", st.session_state.get('sentiment_response')),
-            ("ðŸ“ˆ", "Metrics Analysis", st.session_state.get('metrics_response'))
-        ]
+            status_items = [
+                ("🔍", "Competitor Analysis", st.session_state.get('competitor_response')),
+                ("💬", "Sentiment Analysis", st.session_state.get('sentiment_response')),
+                ("📈", "Metrics Analysis", st.session_state.get('metrics_response'))
+            ]
         
-        for icon, name, status in status_items:
-            if status:
-                st.success(f"{icon} {name} âœ“")
-            else:
-                st.info(f"{icon} {name} â³")
+            for icon, name, status in status_items:
+                if status:
+                    st.success(f"{icon} {name} ✓")
+                else:
+                    st.info(f"{icon} {name} ⏳")
+    record_fragment_rerun("sidebar", started)
+
+with st.sidebar:
+    st.fragment(sidebar_status, run_every=poll_every(any_job_active()))()
+rerun_slot = st.sidebar.empty()
 
 # Footer
 st.markdown("---")
 st.markdown("""
 <div style='text-align: center; color: #94a3b8; padding: 20px;'>
-    <p>Powered by <strong>AI Business Intelligence</strong> â€¢ AI-Led Innovation â€¢ Engineering Excellence</p>
+    <p>Powered by <strong>AI Business Intelligence</strong> • AI-Led Innovation • Engineering Excellence</p>
     <p><a href='https://linkedin.com/in/pradeepkumarpacha' target='_blank' style='color: #00d4ff;'>LinkedIn</a> | 
     <a href='mailto:pradeep.pacha@gmail.com' style='color: #00d4ff;'>Contact</a></p>
 </div>
 """, unsafe_allow_html=True)
 
-
-
-
-
-
+# Rerun latency is recorded last so it covers the whole script, imports included
+record_rerun(st.session_state, time.perf_counter() - _rerun_started)
+timings = rerun_summary(st.session_state)
+caption = (
+    f"⏱️ Rerun {timings['last_ms']:.0f} ms · median {timings['median_ms']:.0f} ms · "
+    f"p95 {timings['p95_ms']:.0f} ms ({timings['count']} runs)"
+)
+fragment_timings = rerun_summary(st.session_state, fragments=True)
+if fragment_timings:
+    caption += f" · fragments median {fragment_timings['median_ms']:.0f} ms ({fragment_timings['count']} runs)"
+rerun_slot.caption(caption)
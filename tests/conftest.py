@@ -0,0 +1,13 @@
+"""Offline unit tests: no network, no API keys, caches in a throwaway directory."""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# launch_intel reads its configuration at import, so this must happen first
+os.environ["BI_CACHE_DIR"] = tempfile.mkdtemp(prefix="bi-tests-")
+os.environ["BI_TELEMETRY_FILE"] = ""
+for limit in ("BI_OPENAI_RPM", "BI_OPENAI_TPM", "BI_FIRECRAWL_JOBS_PER_MIN"):
+    os.environ[limit] = "0"
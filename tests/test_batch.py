@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from launch_intel import batch
+from launch_intel.batch import CHECKPOINT_FILE, SUMMARY_FILE, load_checkpoint, read_companies, report_filename, run_batch
+
+
+def _csv(tmp_path, text):
+    path = tmp_path / "companies.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("text", [
+    "Company Name,Website\nAcme,acme.example\nGlobex,globex.example\n",
+    "id,name,company\n1,Acme Inc.,Acme\n2,Globex Corp.,Globex\n",
+    "website,COMPANY\nacme.example,Acme\n,Globex\n",
+    "Acme\nGlobex\n",
+])
+def test_read_companies_finds_the_company_column(tmp_path, text):
+    assert read_companies(_csv(tmp_path, text)) == ["Acme", "Globex"]
+
+
+def test_read_companies_skips_blanks_and_duplicates(tmp_path):
+    assert read_companies(_csv(tmp_path, "company\nAcme\n\n  acme \nGlobex  Corp\n")) == ["Acme", "Globex  Corp"]
+
+
+def test_report_filenames_are_stable_and_do_not_collide():
+    assert report_filename("A.B") != report_filename("A-B")
+    assert report_filename("Acme Inc") == report_filename("  acme   inc ")
+    assert report_filename("Acme Inc").startswith("acme-inc-")
+    assert report_filename("日本").startswith("company-")
+
+
+def _fake_analysis(failing=()):
+    calls = []
+
+    def run(company, kind, openai_key, firecrawl_key, shared_research, force):
+        calls.append((company, kind))
+        if company in failing:
+            raise RuntimeError("boom")
+        return f"{kind} report for {company}", False
+
+    return run, calls
+
+
+def test_finished_companies_are_checkpointed_and_skipped_next_time(tmp_path, monkeypatch):
+    run, calls = _fake_analysis(failing={"Globex"})
+    monkeypatch.setattr(batch, "run_cached_analysis", run)
+    out = str(tmp_path / "out")
+    summary = run_batch(["Acme", "Globex"], out, "sk", "fc", kinds=["competitor", "metrics"], workers=2)
+    assert (summary["done"], summary["failed"]) == (1, 1)
+    report = (tmp_path / "out" / report_filename("Acme")).read_text(encoding="utf-8")
+    assert "competitor report for Acme" in report and "metrics report for Acme" in report
+    assert set(load_checkpoint(out)) == {"acme"}
+
+    run, calls = _fake_analysis()
+    monkeypatch.setattr(batch, "run_cached_analysis", run)
+    summary = run_batch(["Acme", "Globex"], out, "sk", "fc", kinds=["competitor", "metrics"], workers=2)
+    assert sorted(calls) == [("Globex", "competitor"), ("Globex", "metrics")]
+    assert (summary["done"], summary["skipped"]) == (1, 1)
+    assert json.loads((tmp_path / "out" / SUMMARY_FILE).read_text())["companies"]["Acme"]["status"] == "skipped"
+
+
+def test_checkpoint_ignores_torn_lines_and_missing_reports(tmp_path):
+    (tmp_path / "acme.md").write_text("report", encoding="utf-8")
+    (tmp_path / CHECKPOINT_FILE).write_text(
+        json.dumps({"company": "Acme", "file": "acme.md", "analyses": ["competitor"]}) + "\n"
+        + json.dumps({"company": "Globex", "file": "gone.md", "analyses": ["competitor"]}) + "\n"
+        + '{"company": "Init',
+        encoding="utf-8",
+    )
+    assert set(load_checkpoint(str(tmp_path))) == {"acme"}
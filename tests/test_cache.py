@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from launch_intel import cache
+from launch_intel.cache import SqliteCache, sqlite_connection
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setattr(cache, "CACHE_DIR", str(path))
+    return path
+
+
+def _age(store, key, seconds):
+    with sqlite_connection(store.path) as conn:
+        conn.execute(f"UPDATE {store.table} SET created_at = created_at - ? WHERE key = ?", (seconds, key))
+
+
+def test_nothing_touches_the_disk_before_first_use(cache_dir):
+    store = SqliteCache("lazy.sqlite3", ttl_seconds=60)
+    assert not cache_dir.exists()
+    assert store.get("missing") is None
+    assert (cache_dir / "lazy.sqlite3").exists()
+
+
+def test_round_trip_and_stats():
+    store = SqliteCache("round.sqlite3", ttl_seconds=60)
+    store.set("k", b"value")
+    entry = store.get("k")
+    assert entry.value == b"value" and entry.age_seconds < 5
+    store.delete("k")
+    assert store.get("k") is None
+    assert store.stats == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+
+
+def test_expired_entries_are_misses_and_are_dropped():
+    store = SqliteCache("ttl.sqlite3", ttl_seconds=60)
+    store.set("old", b"x")
+    _age(store, "old", 61)
+    assert store.get("old") is None
+    assert store.usage() == {"entries": 0, "bytes": 0}
+
+
+def test_writes_sweep_expired_entries():
+    store = SqliteCache("sweep.sqlite3", ttl_seconds=60)
+    store.set("old", b"x")
+    _age(store, "old", 61)
+    store.set("new", b"y")
+    assert store.usage()["entries"] == 1
+    assert store.stats["evictions"] == 1
+
+
+def test_max_entries_evicts_the_least_recently_used():
+    store = SqliteCache("lru.sqlite3", ttl_seconds=60, max_entries=2)
+    store.set("a", b"1")
+    time.sleep(0.01)
+    store.set("b", b"2")
+    time.sleep(0.01)
+    store.get("a")
+    time.sleep(0.01)
+    store.set("c", b"3")
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+
+
+def test_max_bytes_evicts_oldest_until_under_the_cap():
+    store = SqliteCache("bytes.sqlite3", ttl_seconds=60, max_bytes=10)
+    for key in "abc":
+        store.set(key, b"xxxx")
+        time.sleep(0.01)
+    assert store.usage() == {"entries": 2, "bytes": 8}
+    assert store.get("a") is None
@@ -0,0 +1,67 @@
+from launch_intel.compare import matrix_from_bullets, matrix_from_report, parse_companies, render_matrix
+
+
+def test_parse_companies_splits_and_deduplicates():
+    assert parse_companies("Acme, Globex\n acme \n\nInitech,  Globex  Corp") == ["Acme", "Globex", "Initech", "Globex Corp"]
+
+
+def test_matrix_from_tagged_bullets():
+    cells = matrix_from_bullets(
+        "• Positioning: Premium tier [1]\n"
+        "- **Strength** | Fast onboarding [2, 3]\n"
+        "1. Weaknesses — Pricing confusion\n"
+        "• Learning: Ship docs early\n"
+        "An untagged line"
+    )
+    assert cells == {"positioning": ["Premium tier"], "strength": ["Fast onboarding"], "weakness": ["Pricing confusion"]}
+
+
+def test_matrix_from_report_sections_and_tables():
+    report = (
+        "# Acme launch review\n"
+        "## 1. Market & Product Positioning\n"
+        "- Developer-first workspace [1]\n"
+        "## Launch Strengths\n"
+        "| Strength | Evidence |\n"
+        "|---|---|\n"
+        "| **Viral waitlist** | 50k signups [2] |\n"
+        "## Launch Weaknesses\n"
+        "* Thin enterprise story\n"
+        "## Sources\n"
+        "- https://example.com\n"
+    )
+    assert matrix_from_report(report) == {
+        "positioning": ["Developer-first workspace"],
+        "strength": ["Viral waitlist"],
+        "weakness": ["Thin enterprise story"],
+    }
+
+
+def test_matrix_from_report_falls_back_to_tagged_bullets():
+    assert matrix_from_report("Strength: Brand")["strength"] == ["Brand"]
+
+
+def test_render_matrix_marks_pending_rows_and_truncates_cells():
+    table = render_matrix({
+        "Acme": {"positioning": ["a", "b", "c", "d"], "strength": [], "weakness": ["w"]},
+        "Globex": None,
+    })
+    lines = table.splitlines()
+    assert lines[0] == "| Company | Positioning | Strengths | Weaknesses |"
+    assert "• a<br>• b<br>• c<br>*+1 more*" in lines[2]
+    assert "| – |" in lines[2]
+    assert lines[3] == "| **Globex** | ⏳ | ⏳ | ⏳ |"
+
+
+def test_render_matrix_escapes_html_links_and_cell_breaks():
+    table = render_matrix({
+        "<b>Evil|Co</b>": {
+            "positioning": ['<img src=x onerror="alert(1)"> [click](https://evil.example)'],
+            "strength": [],
+            "weakness": [],
+        },
+    })
+    row = table.splitlines()[2]
+    assert "<img" not in row and "<b>" not in row
+    assert "&lt;img" in row and "&lt;b&gt;Evil/Co&lt;/b&gt;" in row
+    assert "](" not in row.replace("\\]", "")
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+
+from launch_intel.crawl import CrawlTimeout, PollSchedule, crawl, poll_crawl
+
+
+class FakeApp:
+    """Reports a crawl job as scraping for ``checks_until_done`` status checks, then completed."""
+
+    def __init__(self, checks_until_done):
+        self.checks_until_done = checks_until_done
+        self.checks = 0
+        self.started = []
+
+    def start_crawl(self, url, **params):
+        self.started.append((url, params))
+        return SimpleNamespace(id="job-1")
+
+    def get_crawl_status(self, job_id):
+        self.checks += 1
+        done = self.checks >= self.checks_until_done
+        return SimpleNamespace(id=job_id, status="completed" if done else "scraping")
+
+
+def test_intervals_grow_geometrically_up_to_the_cap():
+    intervals = PollSchedule(first=0.5, factor=2, cap=3, deadline=60).intervals()
+    assert [next(intervals) for _ in range(5)] == [0.5, 1, 2, 3, 3]
+
+
+def test_poll_crawl_returns_the_terminal_status():
+    app = FakeApp(checks_until_done=3)
+    status = poll_crawl(app, "job-1", PollSchedule(first=0.001, factor=1, cap=0.001, deadline=5))
+    assert status.status == "completed"
+    assert app.checks == 3
+
+
+def test_crawl_starts_the_job_with_its_params():
+    app = FakeApp(checks_until_done=1)
+    crawl(app, "https://example.com", PollSchedule(first=0.001, cap=0.001, deadline=5), limit=5)
+    assert app.started == [("https://example.com", {"limit": 5})]
+
+
+def test_poll_crawl_gives_up_at_the_deadline():
+    app = FakeApp(checks_until_done=10**6)
+    with pytest.raises(CrawlTimeout, match="job-1"):
+        poll_crawl(app, "job-1", PollSchedule(first=0.01, factor=1, cap=0.01, deadline=0.05))
+    assert 1 <= app.checks <= 6
@@ -0,0 +1,28 @@
+import sqlite3
+
+from launch_intel import firecrawl_cache
+from launch_intel.firecrawl_cache import cached_call
+from launch_intel.singleflight import Flight
+
+
+def test_a_failed_store_is_a_miss_and_still_lands_the_flight(monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(firecrawl_cache.page_bodies, "set", locked)
+    assert cached_call("scrape", "acme.example/launch", {}, lambda: "Acme launched Widgets.") == "Acme launched Widgets."
+    assert firecrawl_cache._page_flights.summary()["in_flight"] == 0
+    assert cached_call("scrape", "acme.example/launch", {}, lambda: "Acme launched Widgets 2.") == "Acme launched Widgets 2."
+
+
+def test_a_follower_fetches_for_itself_when_the_leader_is_lost(monkeypatch):
+    monkeypatch.setattr(firecrawl_cache, "PAGE_FOLLOW_TIMEOUT_SECONDS", 0.05)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return "Globex cut prices."
+
+    monkeypatch.setattr(firecrawl_cache._page_flights, "join", lambda key: (Flight(), False))
+    assert cached_call("scrape", "globex.example/news", {}, fetch) == "Globex cut prices."
+    assert calls == [1]
@@ -0,0 +1,136 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from launch_intel import jobs
+from launch_intel.cache import sqlite_connection
+from launch_intel.jobs import FAILED, QUEUED, RUNNING, WORKER_LEASE_SECONDS, JobManager
+from launch_intel.report_cache import report_key
+from launch_intel.singleflight import analysis_flights
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "CACHE_DIR", str(tmp_path))
+
+
+@pytest.fixture
+def queue():
+    return JobManager(external=True)
+
+
+@pytest.fixture
+def managers():
+    """In-process managers created by a test; shut down afterwards so their heartbeat threads stop."""
+    created = []
+    yield lambda **kwargs: created.append(JobManager(**kwargs)) or created[-1]
+    for manager in created:
+        manager.shutdown()
+
+
+def _insert(manager, status=QUEUED, owner=None, heartbeat_at=None, company="Acme", worker=None):
+    job_id = uuid.uuid4().hex[:12]
+    now = time.time()
+    with sqlite_connection(manager.path) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, company_name, kind, shared_research, status, created_at, report_key,"
+            " owner, heartbeat_at, worker) VALUES (?, ?, 'competitor', 0, ?, ?, ?, ?, ?, ?)",
+            (job_id, company, status, now, company.lower(), owner, now if heartbeat_at is None else heartbeat_at, worker),
+        )
+    return job_id
+
+
+def test_claim_takes_the_oldest_queued_job(queue):
+    first = queue.submit("Acme", "competitor", "", "")
+    queue.submit("Globex", "competitor", "", "")
+    job = queue.claim("worker-1")
+    assert job.id == first
+    assert job.status == RUNNING and job.worker == "worker-1"
+
+
+def test_claim_skips_reports_already_being_produced(queue):
+    queue.submit("Acme", "competitor", "", "")
+    duplicate = queue.submit("Acme", "competitor", "", "")
+    other = queue.submit("Globex", "competitor", "", "")
+    queue.claim("worker-1")
+    assert queue.claim("worker-2").id == other
+    assert queue.claim("worker-3") is None
+    assert queue.get(duplicate).status == QUEUED
+
+
+def test_claim_leaves_in_process_jobs_alone(queue):
+    _insert(queue, owner="app-host-1234")
+    assert queue.claim("worker-1") is None
+
+
+def test_heartbeat_fails_jobs_of_stopped_workers(queue):
+    stale = _insert(queue, status=RUNNING, worker="gone", heartbeat_at=time.time() - WORKER_LEASE_SECONDS - 1)
+    queue.submit("Globex", "competitor", "", "")
+    live = queue.claim("worker-1")
+    assert queue.heartbeat("worker-1", threads=4) == 1
+    assert queue.get(stale).status == FAILED
+    assert queue.get(live.id).status == RUNNING
+    assert queue.stats() == {"queued": 0, "running": 1, "limit": 4, "workers": 1}
+    queue.retire("worker-1")
+    assert queue.stats()["workers"] == 0
+
+
+def test_startup_recovery_only_fails_dead_in_process_jobs(queue, managers):
+    mine = _insert(queue, status=RUNNING, owner=jobs._process_id())
+    stale = _insert(queue, status=RUNNING, owner="other-app", heartbeat_at=time.time() - WORKER_LEASE_SECONDS - 1)
+    alive = _insert(queue, status=RUNNING, owner="other-app")
+    external = _insert(queue)
+    managers(max_workers=1)
+    assert queue.get(mine).status == FAILED
+    assert queue.get(stale).status == FAILED
+    assert queue.get(alive).status == RUNNING
+    assert queue.get(external).status == QUEUED
+
+
+def test_a_job_deleted_before_it_runs_is_skipped(queue):
+    job_id = queue.submit("Acme", "competitor", "", "")
+    with sqlite_connection(queue.path) as conn:
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    queue._run(job_id, "Acme", "competitor", "", "", shared_research=False, force=False)
+    assert queue.get(job_id) is None
+
+
+def _wait_until_finished(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while manager.get(job_id).active and time.time() < deadline:
+        time.sleep(0.02)
+    return manager.get(job_id)
+
+
+def test_job_submitted_during_a_run_follows_it_without_a_slot(managers):
+    manager = managers(max_workers=1)
+    key = report_key("Follow Co", "competitor")
+    flight, _ = analysis_flights.join(key)
+    # The only pool slot is busy, so anything that needed it would never finish
+    release = threading.Event()
+    manager._pool.submit(release.wait)
+    job_id = manager.submit("Follow Co", "competitor", "", "")
+    flight.publish("Hello ")
+    flight.publish("world")
+    analysis_flights.land(key, flight, "Hello world")
+    job = _wait_until_finished(manager, job_id)
+    release.set()
+    assert (job.status, job.result) == (jobs.DONE, "Hello world")
+    assert job.ttft is not None
+
+
+def test_queued_job_follows_a_run_that_started_while_it_waited(managers):
+    manager = managers(max_workers=1)
+    release = threading.Event()
+    manager._pool.submit(release.wait)
+    job_id = manager.submit("Queued Co", "competitor", "", "")
+    key = report_key("Queued Co", "competitor")
+    flight, _ = analysis_flights.join(key)
+    release.set()
+    time.sleep(0.1)
+    assert manager.get(job_id).status == RUNNING
+    analysis_flights.land(key, flight, error=RuntimeError("leader failed"))
+    job = _wait_until_finished(manager, job_id)
+    assert (job.status, job.error) == (FAILED, "leader failed")
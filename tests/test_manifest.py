@@ -0,0 +1,77 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from launch_intel.manifest import (
+    Bullet, OriginCheck, StoredBullets, _PublicRedirects, check_origin, is_public_http_url, parse_bullets, plan_bullets,
+)
+from launch_intel.research import Source
+
+
+def _source(ref, content_hash):
+    return Source("press", f"https://example.com/{ref}", f"Page {ref}", "...", ref=ref, content_hash=content_hash)
+
+
+def _stored(bullets, sources):
+    return StoredBullets(bullets, sources, updated_at=0.0)
+
+
+def test_parse_bullets_keeps_citations():
+    bullets = parse_bullets("## Evidence\n- Strong launch [1, 3]\n2. Weak pricing [2]\nUncited line")
+    assert bullets == [
+        Bullet("• Strong launch [1, 3]", (1, 3)),
+        Bullet("• Weak pricing [2]", (2,)),
+        Bullet("Uncited line", ()),
+    ]
+
+
+def test_first_run_extracts_every_source():
+    sources = [_source(1, "a"), _source(2, "b")]
+    assert plan_bullets(None, sources) == ([], sources)
+
+
+def test_unchanged_sources_reuse_every_bullet():
+    bullets = [Bullet("• One [1]", (1,)), Bullet("• Two [2]", (2,))]
+    stored = _stored(bullets, {1: "a", 2: "b"})
+    assert plan_bullets(stored, [_source(1, "a"), _source(2, "b")]) == (bullets, [])
+
+
+def test_changed_source_drops_only_the_bullets_citing_it():
+    keep, stale, both = Bullet("• One [1]", (1,)), Bullet("• Two [2]", (2,)), Bullet("• Both [1, 2]", (1, 2))
+    stored = _stored([keep, stale, both], {1: "a", 2: "b"})
+    changed = _source(2, "b2")
+    assert plan_bullets(stored, [_source(1, "a"), changed]) == ([keep], [changed])
+
+
+def test_vanished_source_drops_its_bullets():
+    keep, gone = Bullet("• One [1]", (1,)), Bullet("• Two [2]", (2,))
+    stored = _stored([keep, gone], {1: "a", 2: "b"})
+    assert plan_bullets(stored, [_source(1, "a")]) == ([keep], [])
+
+
+def test_uncited_bullets_force_a_full_extraction_once_anything_changed():
+    stored = _stored([Bullet("• Uncited", ())], {1: "a"})
+    sources = [_source(1, "a2")]
+    assert plan_bullets(stored, sources) == ([], sources)
+
+
+@pytest.mark.parametrize("url", [
+    "file:///etc/passwd",
+    "ftp://example.com/",
+    "http://localhost:8501/",
+    "http://127.0.0.1/",
+    "http://10.0.0.5/admin",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/",
+    "https:///no-host",
+])
+def test_source_checks_never_leave_for_non_public_origins(url):
+    assert not is_public_http_url(url)
+    assert check_origin(url, etag='"v1"') == OriginCheck(False, None, None)
+
+
+def test_redirects_to_non_public_addresses_are_refused():
+    request = urllib.request.Request("https://example.com/", method="HEAD")
+    with pytest.raises(urllib.error.HTTPError, match="non-public"):
+        _PublicRedirects().redirect_request(request, None, 302, "Found", {}, "http://127.0.0.1:8501/")
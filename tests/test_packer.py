@@ -0,0 +1,79 @@
+import json
+
+from launch_intel.packer import (
+    compact_tool_result, compaction_run, count_tokens, last_compaction, pack, split_passages, strip_boilerplate,
+)
+from launch_intel.telemetry import last_trace, trace_analysis
+
+Q3_RESULTS = """# Acme Q3 results
+Acme grew its market share on mobile to 31%.
+The new checkout design increased conversion by 18%.
+The blog integration shipped in August.
+Subscribers reached 2.1 million.
+Churn fell.
+"""
+
+
+def test_evidence_lines_survive_boilerplate_stripping():
+    assert strip_boilerplate(Q3_RESULTS) == Q3_RESULTS.strip()
+
+
+def test_navigation_banners_and_share_widgets_are_dropped():
+    page = "\n".join([
+        "[Home](/) [Pricing](/pricing) [Blog](/blog)",
+        "Home > Products > Widgets",
+        "Sign in",
+        "Subscribe to our newsletter",
+        "Share on Twitter",
+        "We use cookies to improve your experience.",
+        "© 2024 Acme Inc. All rights reserved.",
+        "![logo](/logo.png)",
+        "Acme launched [Widgets 2](https://acme.example/w2) for enterprise teams.",
+    ])
+    assert strip_boilerplate(page) == "Acme launched Widgets 2 for enterprise teams."
+
+
+def test_headings_and_table_rows_are_kept():
+    page = "## [Launch notes](/notes)\n| Metric | Value |\n| Users | 2.1M |"
+    assert strip_boilerplate(page) == "## Launch notes\n| Metric | Value |\n| Users | 2.1M |"
+
+
+def test_lines_repeated_across_pages_are_kept_once():
+    seen = set()
+    footer = "Acme builds widgets for teams everywhere."
+    assert strip_boilerplate(f"Page one.\n{footer}", seen) == f"Page one.\n{footer}"
+    assert strip_boilerplate(f"Page two.\n{footer}", seen) == "Page two."
+
+
+def test_split_passages_attaches_headings_and_cuts_long_paragraphs():
+    sentence = "Acme shipped a feature to every enterprise customer this quarter. "
+    text = "# Launch\n\nShort paragraph.\n\n" + sentence * 30
+    passages = split_passages(text)
+    assert passages[0] == "# Launch\nShort paragraph."
+    assert len(passages) > 2
+    assert all(count_tokens(passage) <= 200 for passage in passages[1:])
+
+
+def test_pack_keeps_relevant_passages_in_order_under_budget():
+    documents = [
+        "Acme revenue grew 40% to $2 million.\n\nThe weather was nice.",
+        "Unrelated filler about gardening and hobbies.\n\nAcme users doubled to 1 million.",
+    ]
+    packed, stats = pack(documents, budget=20, company_name="Acme", kind="metrics", record=False)
+    assert packed == ["Acme revenue grew 40% to $2 million.", "Acme users doubled to 1 million."]
+    assert stats.tokens_after <= 20 < stats.tokens_before
+    assert stats.passages_kept == 2 and stats.passages_dropped == 2
+
+
+def test_compact_tool_result_drops_heavy_fields_and_passes_text_through():
+    raw = json.dumps({"data": [{"url": "u", "markdown": "Sign in\n\nAcme launched Widgets.", "html": "<p>", "links": []}]})
+    page = json.loads(compact_tool_result(raw, budget=100))["data"][0]
+    assert page == {"url": "u", "markdown": "Acme launched Widgets."}
+    assert compact_tool_result("Error: rate limited") == "Error: rate limited"
+
+
+def test_runs_are_looked_up_by_the_shared_company_key():
+    with compaction_run("Acme   Robotics", "metrics") as run, trace_analysis("Acme   Robotics", "metrics"):
+        pass
+    assert last_compaction(" acme robotics", "metrics") is run
+    assert last_trace("ACME\tRobotics", "metrics").company_name == "Acme   Robotics"
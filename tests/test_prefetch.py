@@ -0,0 +1,63 @@
+import threading
+import time
+
+from launch_intel.prefetch import CANCELLED, PENDING, Prefetcher, _current_task
+
+
+def _prefetcher(debounce_seconds=0.05, ttl_seconds=600):
+    """A prefetcher whose runs only record the company instead of searching."""
+    prefetcher = Prefetcher(max_active=1, debounce_seconds=debounce_seconds, ttl_seconds=ttl_seconds)
+    prefetcher.ran = []
+    prefetcher.done = threading.Event()
+
+    def run(task, openai_key, firecrawl_key):
+        prefetcher.ran.append(task.company_name)
+        prefetcher.done.set()
+
+    prefetcher._run = run
+    return prefetcher
+
+
+def test_only_the_last_name_of_a_quick_edit_is_prefetched():
+    prefetcher = _prefetcher()
+    first = prefetcher.schedule("session", "Acm", "sk", "fc")
+    second = prefetcher.schedule("session", "Acme", "sk", "fc")
+    assert first.status == CANCELLED and second.status == PENDING
+    assert prefetcher.done.wait(2)
+    time.sleep(0.1)
+    assert prefetcher.ran == ["Acme"]
+    assert prefetcher.stats["scheduled"] == 2 and prefetcher.stats["cancelled"] == 1
+
+
+def test_rescheduling_the_same_company_keeps_the_pending_task():
+    prefetcher = _prefetcher(debounce_seconds=5)
+    task = prefetcher.schedule("session", "Acme", "sk", "fc")
+    assert prefetcher.schedule("session", " acme ", "sk", "fc") is task
+    assert prefetcher.stats["scheduled"] == 1
+
+
+def test_cancel_stops_a_pending_prefetch():
+    prefetcher = _prefetcher()
+    task = prefetcher.schedule("session", "Acme", "sk", "fc")
+    prefetcher.cancel("session")
+    time.sleep(0.15)
+    assert task.status == CANCELLED and prefetcher.ran == []
+    assert prefetcher.status("session") is None
+
+
+def test_prefetched_searches_count_as_used_or_wasted():
+    prefetcher = _prefetcher(ttl_seconds=0.05)
+    task = prefetcher.schedule("session", "Acme", "sk", "fc")
+    token = _current_task.set(task)
+    try:
+        prefetcher._on_call("search:used", False, 1.5)
+        prefetcher._on_call("search:unused", False, 2.0)
+    finally:
+        _current_task.reset(token)
+    prefetcher._on_call("search:used", True, 0.0)
+    time.sleep(0.1)
+    summary = prefetcher.summary()
+    assert summary["calls_made"] == 2
+    assert (summary["calls_used"], summary["seconds_used"]) == (1, 1.5)
+    assert (summary["calls_wasted"], summary["seconds_wasted"]) == (1, 2.0)
+    assert summary["hit_rate"] == 0.5 and summary["outstanding"] == 0
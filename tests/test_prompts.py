@@ -0,0 +1,29 @@
+from launch_intel.pipeline import ANALYSIS_KINDS
+from launch_intel.prompts import BULLET_TEMPLATES, CHANGED_SOURCES_INSTRUCTIONS, CORPUS_INSTRUCTIONS, REPORT_TEMPLATES
+
+
+def _shared_prefix(first: str, second: str) -> str:
+    length = 0
+    while length < min(len(first), len(second)) and first[length] == second[length]:
+        length += 1
+    return first[:length]
+
+
+def test_bullet_prompts_for_two_companies_share_the_whole_static_prefix():
+    for kind in ANALYSIS_KINDS:
+        for instructions in (CORPUS_INSTRUCTIONS, CHANGED_SOURCES_INSTRUCTIONS):
+            template = BULLET_TEMPLATES[kind].then(instructions)
+            acme = template.render(company_name="Acme", corpus="[1] Acme shipped Widgets.")
+            globex = template.render(company_name="Globex", corpus="[1] Globex cut prices.")
+            assert _shared_prefix(acme, globex).startswith(template.prefix)
+            assert template.prefix.endswith(instructions.prefix)
+            assert "Acme" not in template.prefix and acme.endswith("[1] Acme shipped Widgets.")
+
+
+def test_report_prompts_keep_the_format_specification_ahead_of_the_company():
+    for kind in ANALYSIS_KINDS:
+        template = REPORT_TEMPLATES[kind]
+        acme = template.render(competitor="Acme", bullet_text="• Strength: fast")
+        globex = template.render(competitor="Globex", bullet_text="• Weakness: slow")
+        assert _shared_prefix(acme, globex).startswith(template.prefix)
+    assert "=== FORMAT SPECIFICATION ===" in REPORT_TEMPLATES["competitor"].prefix
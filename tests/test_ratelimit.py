@@ -0,0 +1,39 @@
+from launch_intel.ratelimit import TokenBucket
+
+
+def test_zero_rate_disables_the_bucket():
+    bucket = TokenBucket("test", 0)
+    assert bucket.acquire(1_000_000) == 0.0
+    assert bucket.stats()["acquired"] == 0
+
+
+def test_full_bucket_grants_its_capacity_at_once():
+    bucket = TokenBucket("test", 6000)
+    assert bucket.acquire(6000) < 0.01
+
+
+def test_empty_bucket_waits_for_the_refill():
+    bucket = TokenBucket("test", 6000)  # 100 tokens a second
+    bucket.acquire(6000)
+    waited = bucket.acquire(5)
+    assert 0.03 < waited < 1
+    assert bucket.stats()["waits"] == 1
+
+
+def test_requests_larger_than_capacity_are_clamped():
+    bucket = TokenBucket("test", 6000)
+    assert bucket.acquire(10 * 6000) < 0.01
+
+
+def test_adjust_refunds_overestimated_usage():
+    bucket = TokenBucket("test", 6000)
+    bucket.acquire(6000)
+    bucket.adjust(-3000)
+    assert bucket.acquire(3000) < 0.01
+
+
+def test_pause_holds_callers_for_retry_after():
+    bucket = TokenBucket("test", 6000)
+    bucket.pause(0.2)
+    assert bucket.acquire(1) >= 0.19
+    assert bucket.stats()["retry_after"] == 1
@@ -0,0 +1,44 @@
+from launch_intel.report_store import ReportStore
+
+
+def _report(seed: int, size: int = 20_000) -> str:
+    # Varied enough that zlib cannot shrink it to nothing
+    return "".join(f"{seed}:{i * 7919 % 10007} " for i in range(size // 8))
+
+
+def test_round_trip_is_compressed_and_deduplicated():
+    store = ReportStore(max_bytes=10**6)
+    report = "Acme launched Widgets. " * 1000
+    handle = store.put(report)
+    assert store.put(report) == handle
+    assert store.get(handle) == report
+    usage = store.usage()
+    assert usage["entries"] == 1 and usage["puts"] == 2 and usage["hits"] == 1
+    assert usage["compressed_bytes"] < usage["raw_bytes"] / 10
+
+
+def test_unknown_handle_is_a_miss():
+    store = ReportStore()
+    assert store.get("missing") is None
+    assert store.usage()["misses"] == 1
+
+
+def test_least_recently_viewed_is_evicted_first():
+    probe = ReportStore()
+    probe.put(_report(0))
+    one_report = probe.usage()["compressed_bytes"]
+    store = ReportStore(max_bytes=int(one_report * 2.5))
+    first, second = store.put(_report(1)), store.put(_report(2))
+    store.get(first)
+    third = store.put(_report(3))
+    assert store.get(second) is None
+    assert store.get(first) == _report(1) and store.get(third) == _report(3)
+    assert store.usage()["evictions"] == 1
+
+
+def test_a_report_larger_than_the_cap_is_still_kept():
+    store = ReportStore(max_bytes=10)
+    old = store.put(_report(1))
+    new = store.put(_report(2))
+    assert store.get(old) is None
+    assert store.get(new) == _report(2)
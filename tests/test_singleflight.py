@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from launch_intel.singleflight import FlightGroup
+
+
+def test_first_caller_leads_and_later_ones_follow():
+    group = FlightGroup()
+    flight, leader = group.join("acme")
+    same, follower_leads = group.join("acme")
+    assert leader and not follower_leads
+    assert same is flight
+    assert group.summary() == {"led": 1, "coalesced": 1, "in_flight": 1, "following": 1}
+
+
+def test_follower_gets_the_stream_and_the_result():
+    group = FlightGroup()
+    flight, _ = group.join("acme")
+    follower, _ = group.join("acme")
+    flight.publish("Hello ")
+    deltas, result = [], {}
+    thread = threading.Thread(target=lambda: result.update(report=follower.follow(deltas.append)))
+    thread.start()
+    flight.publish("world")
+    group.land("acme", flight, "Hello world")
+    thread.join(5)
+    assert result["report"] == "Hello world"
+    assert "".join(deltas) == "Hello world"
+    assert not group.in_flight("acme")
+
+
+def test_leader_error_is_raised_in_followers():
+    group = FlightGroup()
+    flight, _ = group.join("acme")
+    follower, _ = group.join("acme")
+    group.land("acme", flight, error=RuntimeError("boom"))
+    with pytest.raises(RuntimeError, match="boom"):
+        follower.follow()
+
+
+def test_follow_existing_never_leads():
+    group = FlightGroup()
+    assert group.follow_existing("acme") is None
+    assert not group.in_flight("acme")
+    flight, _ = group.join("acme")
+    assert group.follow_existing("acme") is flight
+    group.land("acme", flight, "report")
+    # A follower that joined before the landing is still served by it
+    assert flight.follow() == "report"
+
+
+def test_landed_key_starts_a_new_flight():
+    group = FlightGroup()
+    flight, _ = group.join("acme")
+    group.land("acme", flight, "old")
+    fresh, leader = group.join("acme")
+    assert leader and fresh is not flight
+
+
+def test_follow_gives_up_on_a_leader_that_never_lands():
+    group = FlightGroup()
+    group.join("acme")
+    follower, _ = group.join("acme")
+    with pytest.raises(TimeoutError):
+        follower.follow(timeout=0.05)
@@ -0,0 +1,50 @@
+import json
+import socket
+import urllib.request
+
+from launch_intel import telemetry
+from launch_intel.telemetry import (
+    last_trace, prometheus_text, record_model_call, record_tool_call, register_gauges, stage, trace_analysis,
+)
+
+
+def test_traces_are_exported_as_prometheus_metrics():
+    with trace_analysis("Telemetry Co", "metrics"):
+        with stage("bullets"):
+            record_model_call(100, 20, cached_tokens=64)
+            record_tool_call("search", 0.3, cached=False)
+    trace = last_trace(" telemetry co ", "metrics")
+    assert trace.stage("bullets").prompt_tokens == 100
+    text = prometheus_text()
+    assert 'bi_analysis_runs_total{kind="metrics",outcome="fresh"}' in text
+    assert 'bi_tokens_total{kind="metrics",stage="bullets",type="cached"}' in text
+    assert 'bi_tool_calls_total{cached="false",tool="search"}' in text
+    assert 'bi_stage_seconds_bucket{kind="metrics",stage="bullets",le="+Inf"}' in text
+
+
+def test_registered_gauges_are_read_at_scrape_time():
+    values = {"bi_test_widgets": 1}
+    register_gauges(lambda: dict(values), {"bi_test_widgets": ("gauge", "Widgets")})
+    values["bi_test_widgets"] = 7
+    assert "# TYPE bi_test_widgets gauge\nbi_test_widgets 7\n" in prometheus_text()
+
+
+def test_telemetry_file_rotates_at_its_size_cap(tmp_path, monkeypatch):
+    path = tmp_path / "telemetry.jsonl"
+    monkeypatch.setattr(telemetry, "TELEMETRY_FILE", str(path))
+    monkeypatch.setattr(telemetry, "TELEMETRY_MAX_BYTES", 100)
+    for run in range(5):
+        telemetry._append_record({"run": run, "padding": "x" * 20})
+    rotated = tmp_path / "telemetry.jsonl.1"
+    assert [json.loads(line)["run"] for line in path.read_text().splitlines()] == [4]
+    assert [json.loads(line)["run"] for line in rotated.read_text().splitlines()] == [2, 3]
+
+
+def test_metrics_server_binds_loopback_by_default():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    assert telemetry.start_metrics_server(port) == port
+    assert telemetry._server.server_address[0] == "127.0.0.1"
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        assert b"# TYPE bi_analysis_runs_total counter" in response.read()
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from launch_intel.cache import sqlite_connection
+from launch_intel.pipeline import ANALYSIS_KINDS
+from launch_intel.report_cache import report_cache, report_key, store_report
+from launch_intel.watchlist import OffPeakWindow, WatchedCompany, due_refreshes
+
+
+def _at(hour, minute=0):
+    return datetime(2026, 3, 2, hour, minute)
+
+
+def test_parse_rejects_malformed_windows():
+    assert OffPeakWindow.parse(" 02:00 - 06:30 ") == OffPeakWindow(120, 390)
+    with pytest.raises(ValueError, match="02:00-06:00"):
+        OffPeakWindow.parse("2am to 6am")
+
+
+def test_window_contains_its_start_but_not_its_end():
+    window = OffPeakWindow.parse("02:00-06:00")
+    assert window.contains(_at(2)) and window.contains(_at(5, 59))
+    assert not window.contains(_at(6)) and not window.contains(_at(1, 59))
+
+
+def test_window_may_wrap_past_midnight():
+    window = OffPeakWindow.parse("22:00-04:00")
+    assert window.contains(_at(23)) and window.contains(_at(3))
+    assert not window.contains(_at(12))
+    assert window.closes_at(_at(23)) == datetime(2026, 3, 3, 4, 0)
+    assert window.next_opening(_at(23)) == datetime(2026, 3, 3, 22, 0)
+    assert window.next_opening(_at(12)) == _at(22)
+
+
+def _age(company, kind, seconds):
+    with sqlite_connection(report_cache.path) as conn:
+        conn.execute(
+            f"UPDATE {report_cache.table} SET created_at = created_at - ? WHERE key = ?",
+            (seconds, report_key(company, kind)),
+        )
+
+
+def test_due_refreshes_lists_missing_then_stalest_reports():
+    fresh, stale = WatchedCompany("Fresh Co", False, 0.0), WatchedCompany("Stale Co", False, 0.0)
+    for company in (fresh, stale):
+        for kind in ANALYSIS_KINDS:
+            store_report(company.name, kind, "report")
+    first, second, *_ = ANALYSIS_KINDS
+    _age(stale.name, first, 7200)
+    _age(stale.name, second, 3600)
+    missing = WatchedCompany(f"Missing {time.time()}", False, 0.0)
+
+    due = due_refreshes([fresh, stale, missing], refresh_after=1800)
+    assert [(company.name, kind) for company, kind, _ in due] == (
+        [(missing.name, kind) for kind in ANALYSIS_KINDS] + [(stale.name, first), (stale.name, second)]
+    )
+    assert due[0][2] is None and due[-1][2] >= 3600
+
+
+def test_due_refreshes_skips_recently_failed_pairs():
+    company = WatchedCompany(f"Failing {time.time()}", False, 0.0)
+    skip = {(company.name.casefold(), kind) for kind in ANALYSIS_KINDS[1:]}
+    assert [kind for _, kind, _ in due_refreshes([company], skip=skip)] == list(ANALYSIS_KINDS[:1])
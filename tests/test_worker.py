@@ -0,0 +1,26 @@
+import sqlite3
+from types import SimpleNamespace
+
+from launch_intel.worker import Worker
+
+
+def test_a_failed_claim_or_a_purged_job_does_not_stop_the_worker_thread(monkeypatch):
+    worker = Worker("sk", "fc", threads=1)
+    calls = []
+
+    def claim(worker_id):
+        calls.append(worker_id)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        if len(calls) == 2:
+            return SimpleNamespace(id="job-1", company_name="Acme", kind="competitor")
+        worker.stopping.set()
+        return None
+
+    monkeypatch.setattr("launch_intel.worker.POLL_SECONDS", 0)
+    monkeypatch.setattr(worker.manager, "claim", claim)
+    monkeypatch.setattr(worker.manager, "run", lambda job, openai_key, firecrawl_key: None)
+    monkeypatch.setattr(worker.manager, "get", lambda job_id: None)
+    worker._work()
+    assert len(calls) == 3
+    assert worker.stats == {"done": 0, "failed": 0}